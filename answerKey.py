@@ -0,0 +1,202 @@
+import os
+import re
+import csv
+from iosCanonical import default_canonicalizer
+from configReader import read_config_lines
+from groupSpec import group_spec
+
+
+def group_values(group_number):
+    """Every group-specific number the grade_task_* methods derive from the group number."""
+    return group_spec(group_number).values()
+
+
+# (pattern, families). The named group "n" is a single number, "list" is a comma/dash VLAN list.
+# A number is only rewritten when it equals the answer key's value for one of the listed families.
+SUBSTITUTION_RULES = [
+    (re.compile(r"\b172\.16\.8[4-9]\.(?P<n>\d+)\b"), ["group"]),
+    (re.compile(r"\b172\.16\.(?P<n>\d+)\."), ["group", "octet_1xx", "octet_2xx"]),
+    (re.compile(r"\b(?:199\.212\.32|209\.165\.200|198\.51\.100)\.(?P<n>\d+)\b"), ["group"]),
+    (re.compile(r"\b10\.1\.(?P<n>\d+)\."), ["group"]),
+    (re.compile(r"\bvlan (?:add )?(?P<list>\d+(?:\s*[,-]\s*\d+)+)", re.IGNORECASE), ["vlan_2xx", "vlan_3xx"]),
+    (re.compile(r"\bvlan ?(?P<n>\d+)\b", re.IGNORECASE), ["vlan_2xx", "vlan_3xx"]),
+    (re.compile(r"^\s*standby (?P<n>\d+)\b"), ["hsrp_10", "hsrp_2xx", "hsrp_3xx"]),
+    (re.compile(r"\btrack (?P<n>\d+)\b"), ["hsrp_2xx"]),
+    (re.compile(r"\btunnel key (?P<n>\d+)\b"), ["tunnel_key"]),
+    (re.compile(r"^\s*delay (?P<n>\d+)\b"), ["delay"]),
+    (re.compile(r"\bcost (?P<n>\d+)\b"), ["stp_cost"]),
+    (re.compile(r"\bnetwork-id (?P<n>\d+)\b"), ["group"]),
+    (re.compile(r"\bisakmp policy (?P<n>\d+)\b"), ["group"]),
+    (re.compile(r"\bautonomous-system (?P<n>\d+)\b"), ["group"]),
+    (re.compile(r"\bOntarioTech0?(?P<n>\d+)\b"), ["group"])
+]
+
+# Lines that differ between any two saved configs without meaning anything for the grade
+IGNORED_LINES = re.compile(r"^(?:!.*|end|Building configuration.*|Current configuration.*|version .*|"
+                           r"ntp clock-period .*|Last configuration change.*)$")
+
+# How many missing/extra lines are spelled out per rubric item before summarising the rest
+MAX_LISTED_LINES = 5
+
+
+def substitute_line(line, key_values, new_values):
+    """Rewrites the group-specific numbers on one line from key_values to new_values (see group_values)."""
+    replacements = {}  # start offset -> (end offset, new text)
+
+    for pattern, families in SUBSTITUTION_RULES:
+        old_to_new = {str(key_values[family]): str(new_values[family]) for family in families}
+        for match in pattern.finditer(line):
+            if match.groupdict().get("list") is not None:
+                spans = [(match.start("list") + m.start(), match.start("list") + m.end())
+                         for m in re.finditer(r"\d+", match.group("list"))]
+            else:
+                spans = [match.span("n")]
+            for start, end in spans:
+                if any(start < claimed_end and claimed_start < end
+                       for claimed_start, (claimed_end, _) in replacements.items()):
+                    continue  # An earlier rule already owns this number
+                number = line[start:end]
+                if number in old_to_new:
+                    replacements[start] = (end, old_to_new[number])
+
+    for start in sorted(replacements, reverse=True):
+        end, text = replacements[start]
+        line = line[:start] + text + line[end:]
+    return line
+
+
+def config_sections(lines):
+    """Splits config lines into {top-level line: frozenset of normalized child lines}."""
+    sections = {}
+    header = None
+    for line in lines:
+        text = default_canonicalizer.canonicalize(line).strip()
+        if not text or IGNORED_LINES.match(text):
+            if not line[:1].isspace():
+                header = None  # A '!' closes the current block
+            continue
+        if line[:1].isspace() and header is not None:
+            sections[header].add(text)
+        else:
+            header = text
+            sections.setdefault(header, set())
+    return {header: frozenset(children) for header, children in sections.items()}
+
+
+class AnswerKey:
+    """One answer key, re-numbered per group on first use and kept as per-section line sets."""
+
+    def __init__(self, answer_key_dir, key_group_number, device_files):
+        self.answer_key_dir = answer_key_dir
+        self.key_group_number = key_group_number
+        self.key_values = group_values(key_group_number)
+        self.group_sections = {}  # group number -> {device: sections}
+
+        # A key whose derived values collide would make substitution ambiguous (e.g. group 10 vs VLAN 10)
+        for _, families in SUBSTITUTION_RULES:
+            values = [self.key_values[family] for family in families]
+            if len(set(values)) != len(values):
+                raise ValueError(f"Answer key group {key_group_number} has ambiguous derived values for {families}")
+
+        self.key_configs = {}
+        for device, filepath in device_files.items():
+            with open(filepath, 'r') as file:
+                self.key_configs[device] = file.read().splitlines()
+        self.rubric = None  # Loaded on first grade() so corpus generation doesn't need one
+        print(f"[INFO] Loaded answer key for group {key_group_number}: {sorted(self.key_configs)}")
+
+    def load_rubric(self, rubric_path):
+        """Reads rubric.csv (Task Name, Device, Section, Points), or scores one item per device by line count."""
+        if not os.path.isfile(rubric_path):
+            rubric = []
+            for device, lines in self.key_configs.items():
+                sections = config_sections(lines)
+                points = sum(1 + len(children) for children in sections.values())
+                rubric.append({"task": device, "device": device, "section": re.compile(""), "points": points})
+            print(f"[INFO] No rubric.csv in {self.answer_key_dir}; scoring one point per key line on each device.")
+            return rubric
+
+        rubric = []
+        with open(rubric_path, newline='') as csvfile:
+            for row in csv.DictReader(csvfile):
+                rubric.append({
+                    "task": row["Task Name"].strip(),
+                    "device": row.get("Device", "").strip() or "*",
+                    "section": re.compile(row.get("Section", "").strip()),
+                    "points": float(row["Points"])
+                })
+        return rubric
+
+    def substitute(self, group_number):
+        """Returns the key's raw config lines re-numbered for group_number."""
+        new_values = group_values(group_number)
+        return {
+            device: [substitute_line(line, self.key_values, new_values) for line in lines]
+            for device, lines in self.key_configs.items()
+        }
+
+    def sections_for(self, group_number):
+        """Returns {device: sections} of the key for group_number, building it only once per group number."""
+        sections = self.group_sections.get(group_number)
+        if sections is None:
+            sections = {device: config_sections(lines) for device, lines in self.substitute(group_number).items()}
+            self.group_sections[group_number] = sections
+        return sections
+
+    def total_points(self):
+        """Returns the points available across the whole rubric."""
+        if self.rubric is None:
+            self.rubric = self.load_rubric(os.path.join(self.answer_key_dir, "rubric.csv"))
+        return sum(item["points"] for item in self.rubric)
+
+    def grade(self, device_files, group_number):
+        """Grades a group's configs by set difference against the key; returns results per rubric task."""
+        if self.rubric is None:
+            self.rubric = self.load_rubric(os.path.join(self.answer_key_dir, "rubric.csv"))
+        key = self.sections_for(group_number)
+        submitted = {}
+        for device, filepath in device_files.items():
+            try:
+                submitted[device] = config_sections(read_config_lines(filepath))
+            except Exception as e:
+                print(f"[ERROR] Failed to open {filepath}: {e}")
+
+        results = {}
+        for item in self.rubric:
+            devices = sorted(key) if item["device"] == "*" else [item["device"]]
+            expected, found = set(), set()
+            for device in devices:
+                for sections, lines in ((key.get(device, {}), expected), (submitted.get(device, {}), found)):
+                    for header, children in sections.items():
+                        if item["section"].search(header):
+                            lines.add((device, header, None))
+                            lines.update((device, header, child) for child in children)
+
+            missing = expected - found
+            extra = found - expected
+            union = len(expected) + len(extra)
+            grade = item["points"] * (len(expected) - len(missing)) / union if union else item["points"]
+
+            comments = []
+            if missing:
+                comments.append(self.describe("Missing", missing))
+            if extra:
+                comments.append(self.describe("Extra", extra))
+            task = results.setdefault(item["task"], {"grade": 0, "comments": []})
+            task["grade"] += grade
+            task["comments"].extend(comments)
+
+        return {
+            task: {"grade": round(task_results["grade"], 2),
+                   "comments": " | ".join(task_results["comments"]) or "Matches the answer key"}
+            for task, task_results in results.items()
+        }
+
+    def describe(self, label, lines):
+        """Summarises a set of (device, header, child) lines for a comment."""
+        listed = [f"{device}: {header}" + (f" > {child}" if child is not None else "")
+                  for device, header, child in sorted(lines, key=lambda line: (line[0], line[1], line[2] or ""))]
+        text = "; ".join(listed[:MAX_LISTED_LINES])
+        if len(listed) > MAX_LISTED_LINES:
+            text += f"; ... and {len(listed) - MAX_LISTED_LINES} more"
+        return f"{label} ({len(listed)}): {text}"
@@ -2,22 +2,158 @@ import os
 import requests
 import csv
 import time
-from collections import defaultdict
+import argparse
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import filedialog
+from canvasStore import CanvasStore
+
+# Replace 'YOUR_API_TOKEN' with your actual Canvas LMS API token
+API_TOKEN = 'YOUR_API_TOKEN'
+BASE_URL = 'https://learn.ontariotechu.ca/api/v1/'
+
+
+class RateLimitExceeded(requests.HTTPError):
+    """Canvas kept throttling a request after every retry; carries the last (403) response."""
+
+
+class RequestScheduler:
+    """Decides how many Canvas requests may be in flight from the rate-limit headers on every response.
+
+    The limit grows by one per window of responses with headroom left and halves (once per window) when
+    X-Rate-Limit-Remaining drops below low_watermark of the bucket (the largest Remaining seen so far) or a request
+    is throttled. The pause after a decrease only grows while Remaining keeps falling. Waiting requests take turns
+    between metadata calls and attachment downloads so neither kind starves the other.
+    """
+    KINDS = ("metadata", "download")
+
+    def __init__(self, max_in_flight=16, low_watermark=0.15):
+        self.max_in_flight = max_in_flight
+        self.low_watermark = low_watermark  # Fraction of the bucket; Canvas buckets differ in size between instances
+        self.bucket_size = 0.0
+        self.last_remaining = None
+        self.limit = 2.0
+        self.in_flight = 0
+        self.waiting = {kind: deque() for kind in self.KINDS}
+        self.turn = 0  # Index of the kind that goes first when both are waiting
+        self.sequence = 0
+        self.window_end = 0  # Responses to requests started before this don't cause another decrease
+        self.backoff = 0.0
+        self.pause_until = 0.0
+        self.condition = threading.Condition()
+        self.stats = {"requests": 0, "throttled": 0, "decreases": 0, "peak_limit": self.limit}
+
+    def next_ticket(self):
+        for offset in range(len(self.KINDS)):
+            waiting = self.waiting[self.KINDS[(self.turn + offset) % len(self.KINDS)]]
+            if waiting:
+                return waiting[0]
+        return None
+
+    def acquire(self, kind):
+        """Blocks until a request of this kind may start; returns the ticket to pass to release()."""
+        ticket = object()
+        with self.condition:
+            self.waiting[kind].append(ticket)
+            while True:
+                pause = self.pause_until - time.time()
+                if pause <= 0 and self.in_flight < int(self.limit) and self.next_ticket() is ticket:
+                    break
+                self.condition.wait(pause if pause > 0 else None)
+            self.waiting[kind].popleft()
+            self.turn = (self.KINDS.index(kind) + 1) % len(self.KINDS)
+            self.in_flight += 1
+            self.sequence += 1
+            self.stats["requests"] += 1
+            return self.sequence
+
+    def release(self, ticket, response):
+        """Frees the slot and adjusts the limit from the response's headers; returns True if it was throttled."""
+        throttled = response is not None and response.status_code == 403 and "rate limit" in response.text.lower()
+        remaining, cost = None, 0.0
+        if response is not None and "X-Rate-Limit-Remaining" in response.headers:
+            remaining = float(response.headers["X-Rate-Limit-Remaining"])
+            cost = float(response.headers.get("X-Request-Cost", 0))
+        with self.condition:
+            self.in_flight -= 1
+            if remaining is not None:
+                self.bucket_size = max(self.bucket_size, remaining)
+                if not throttled and (self.last_remaining is None or remaining >= self.last_remaining):
+                    self.backoff = 0.0  # The bucket has stopped filling up; start over from the shortest pause
+                self.last_remaining = remaining
+                remaining -= cost * self.in_flight  # Requests still in flight will be charged about as much
+            if throttled:
+                self.stats["throttled"] += 1
+            # A connection error (no response) says nothing about the rate limit
+            pressure = throttled or (remaining is not None and remaining < self.low_watermark * self.bucket_size)
+            if response is not None and pressure and ticket > self.window_end:
+                self.limit = max(1.0, self.limit / 2)
+                self.backoff = min(5.0, self.backoff * 2 or 0.25)  # Let the bucket drain before the next start
+                self.pause_until = time.time() + self.backoff
+                self.window_end = self.sequence
+                self.stats["decreases"] += 1
+            elif response is not None and not pressure:
+                self.limit = min(float(self.max_in_flight), self.limit + 1 / self.limit)
+                self.backoff = 0.0
+                self.stats["peak_limit"] = max(self.stats["peak_limit"], self.limit)
+            self.condition.notify_all()
+        return throttled
 
 
 class CanvasAPI:
-    def __init__(self, api_token, base_url):
+    def __init__(self, api_token, base_url, store=None, roster_max_age=3600):
         self.api_token = api_token
         self.base_url = base_url
         self.headers = {'Authorization': f'Bearer {self.api_token}'}
         self.course_id = None
+        # One session for every call so connections are reused across courses and assignments
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=16))
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=16))
+        self.scheduler = RequestScheduler(max_in_flight=16)  # Matches the connection pool size
+        self.max_throttle_retries = 5
+        self.download_pool = ThreadPoolExecutor(max_workers=16)  # Attachments of a submission download together
+        self.store = store  # Optional CanvasStore that every fetched list is written to
+        self.roster_max_age = roster_max_age  # Seconds a stored roster is used before it is fetched again
+        self.roster_cache = {}  # course_id -> (student_names, group_names, group_members)
+        self.roster_locks = {}
+        self.roster_lock = threading.Lock()
+
+    def close(self):
+        """Stops the attachment download threads and closes the HTTP session."""
+        self.download_pool.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def request(self, url, kind="metadata", method="GET", data=None):
+        """Sends one request once the scheduler allows it, retrying requests Canvas throttled.
+
+        Raises RateLimitExceeded if Canvas is still throttling after max_throttle_retries retries.
+        """
+        for _ in range(self.max_throttle_retries + 1):
+            ticket = self.scheduler.acquire(kind)
+            response = None
+            try:
+                response = self.session.request(method, url, data=data)
+            finally:
+                throttled = self.scheduler.release(ticket, response)
+            if not throttled:
+                return response
+        raise RateLimitExceeded(f"Canvas rate limit still exceeded after {self.max_throttle_retries} retries: "
+                                f"{method} {url}", response=response)
 
     def fetch_all_pages(self, url):
         data = []
         while url:
-            response = requests.get(url, headers=self.headers)
+            response = self.request(url)
             response.raise_for_status()
             data.extend(response.json())
             url = response.links.get('next', {}).get('url')
@@ -29,7 +165,7 @@ class CanvasAPI:
     """
     def get_course_by_id(self, course_id):
         url = f'{self.base_url}courses/{course_id}'
-        response = requests.get(url, headers=self.headers)
+        response = self.request(url)
         response.raise_for_status()
         return response.json()
     
@@ -38,6 +174,8 @@ class CanvasAPI:
         params = {'enrollment_state': enrollment_state}
         url = f'{self.base_url}courses'
         courses = self.fetch_all_pages(url)
+        if self.store is not None:
+            self.store.save_courses(courses)
 
         # Filter dynamically for courses that are not concluded or deleted
         current_courses = [
@@ -50,17 +188,26 @@ class CanvasAPI:
 
     def get_assignments(self, course_id):
         url = f'{self.base_url}courses/{course_id}/assignments'
-        return self.fetch_all_pages(url)
+        assignments = self.fetch_all_pages(url)
+        if self.store is not None:
+            self.store.save_assignments(course_id, assignments)
+        return assignments
 
     def get_assignment_details(self, course_id, assignment_id):
         url = f'{self.base_url}courses/{course_id}/assignments/{assignment_id}'
-        response = requests.get(url, headers=self.headers)
+        response = self.request(url)
         response.raise_for_status()
-        return response.json()
+        details = response.json()
+        if self.store is not None:
+            self.store.save_assignments(course_id, [details])
+        return details
 
     def get_submissions(self, course_id, assignment_id):
         url = f'{self.base_url}courses/{course_id}/assignments/{assignment_id}/submissions'
-        return self.fetch_all_pages(url)
+        submissions = self.fetch_all_pages(url)
+        if self.store is not None:
+            self.store.save_submissions(assignment_id, submissions)
+        return submissions
 
     def get_groups(self, course_id):
         url = f'{self.base_url}courses/{course_id}/groups'
@@ -76,18 +223,13 @@ class CanvasAPI:
             print(f"'{csv_path}' already exists. Skipping download of groups and members.")
             return
 
-        groups = self.get_groups(course_id)
+        student_names, group_names, group_members = self.get_roster(course_id)
         with open(csv_path, 'w', newline='') as csvfile:
             csvwriter = csv.writer(csvfile)
             csvwriter.writerow(['Group Name', 'Group ID', 'Member Name', 'Member ID'])
-            for group in groups:
-                group_id = group['id']
-                group_name = group['name']
-                members = self.get_group_members(group_id)
-                for member in members:
-                    member_name = member['name']
-                    member_id = member['id']
-                    csvwriter.writerow([group_name, group_id, member_name, member_id])
+            for group_id, members in group_members.items():
+                for member_id in members:
+                    csvwriter.writerow([group_names[group_id], group_id, student_names[member_id], member_id])
         print(f"Groups and members have been written to '{csv_path}'.")
 
 
@@ -124,32 +266,181 @@ class CanvasAPI:
                 return
             time.sleep(1)
 
-    def download_submission(self, submission_url, dest_path):
-        response = requests.get(submission_url, headers=self.headers)
+    def download_submission(self, submission_url, dest_path, wait=True):
+        response = self.request(submission_url, kind="download")
         response.raise_for_status()
         os.makedirs(os.path.dirname(dest_path), exist_ok=True)
         with open(dest_path, 'wb') as file:
             file.write(response.content)
-        self.wait_for_downloads(os.path.dirname(dest_path), os.path.basename(dest_path))
+        if wait:
+            self.wait_for_downloads(os.path.dirname(dest_path), os.path.basename(dest_path))
+
+    def update_grades(self, course_id, assignment_id, grade_data):
+        """Posts grades and comments for many students in one call; returns Canvas's progress object.
+
+        grade_data maps student ID -> {'posted_grade': ..., 'text_comment': ...} (either key may be left out).
+        """
+        url = f'{self.base_url}courses/{course_id}/assignments/{assignment_id}/submissions/update_grades'
+        form = {}
+        for student_id, fields in grade_data.items():
+            for field, value in fields.items():
+                form[f'grade_data[{student_id}][{field}]'] = value
+        response = self.request(url, method="POST", data=form)
+        response.raise_for_status()
+        return response.json()
+
+    def wait_for_progress(self, progress, interval=1.0, timeout=600):
+        """Polls a progress object until Canvas finishes the job; returns the final progress."""
+        started = time.time()
+        while progress.get('workflow_state') not in ('completed', 'failed'):
+            if time.time() - started > timeout:
+                print(f"Timeout waiting for progress {progress.get('id')}")
+                break
+            time.sleep(interval)
+            response = self.request(progress.get('url') or f"{self.base_url}progress/{progress['id']}")
+            response.raise_for_status()
+            progress = response.json()
+            print(f"Progress {progress.get('id')}: {progress.get('workflow_state')} ({progress.get('completion', 0)}%)")
+        return progress
+
+    def get_roster(self, course_id):
+        """Returns (student_names, group_names, group_members) for a course, fetched once per session."""
+        with self.roster_lock:
+            course_lock = self.roster_locks.setdefault(course_id, threading.Lock())
+        with course_lock:
+            if course_id not in self.roster_cache:
+                if self.store is not None and self.store.is_fresh(f"roster:{course_id}", self.roster_max_age):
+                    self.roster_cache[course_id] = self.store.roster(course_id)
+                    return self.roster_cache[course_id]
+                groups = self.get_groups(course_id)
+                members_by_group = {group['id']: self.get_group_members(group['id']) for group in groups}
+                if self.store is not None:
+                    self.store.save_roster(course_id, groups, members_by_group)
+                student_names = {}
+                group_names = {}
+                group_members = {}
+                for group in groups:
+                    group_id = str(group['id'])
+                    members = members_by_group[group['id']]
+                    if not members:
+                        continue
+                    group_names[group_id] = group['name']
+                    group_members[group_id] = []
+                    for member in members:
+                        student_names[str(member['id'])] = member['name']
+                        group_members[group_id].append(str(member['id']))
+                self.roster_cache[course_id] = (student_names, group_names, group_members)
+            return self.roster_cache[course_id]
+
+    def download_attachments(self, submission, folder):
+        """Downloads every attachment of a submission into folder and returns how many are there.
+
+        With a store, attachments already saved to the same path are not downloaded again.
+        """
+        downloads = []
+        saved = 0
+        for attachment in submission.get('attachments', []):
+            submission_url = attachment.get('url')
+            original_filename = attachment.get('filename')
+            if submission_url and original_filename:
+                dest_path = os.path.join(folder, original_filename)
+                if self.store is not None and 'id' in attachment and self.store.downloaded(attachment['id'], dest_path):
+                    saved += 1
+                    continue
+                # The file is closed before we return, so there is nothing to wait for
+                downloads.append((attachment, dest_path, self.download_pool.submit(
+                    self.download_submission, submission_url, dest_path, wait=False)))
+        for attachment, dest_path, download in downloads:
+            download.result()
+            if self.store is not None and 'id' in attachment:
+                self.store.mark_downloaded(attachment, dest_path)
+        return saved + len(downloads)
+
+    def iter_group_downloads(self, course_id, assignment_id, destination_folder):
+        """Downloads group submissions one group at a time, yielding (group_name, group_folder) as each finishes."""
+        student_names, group_names, group_members = self.get_roster(course_id)
+        submissions = self.get_submissions(course_id, assignment_id)
+        submissions_by_user = {}
+        for submission in submissions:
+            submissions_by_user.setdefault(str(submission['user_id']), submission)
 
+        for group_id in sorted(group_names.keys(), key=lambda x: int(x)):
+            group_name = group_names[group_id]
+            # Use the first member of the group to fetch the submission
+            submission = submissions_by_user.get(group_members[group_id][0])
+            if not submission or submission['workflow_state'] == 'unsubmitted':
+                print(f"No submissions found for group {group_name}")
+                continue
 
-def main():
-    # Replace 'YOUR_API_TOKEN' with your actual Canvas LMS API token 
-    API_TOKEN = 'YOUR_API_TOKEN' 
-    BASE_URL = 'https://learn.ontariotechu.ca/api/v1/'
-    
-    # Setup tkinter root window (hidden)
-    root = tk.Tk()
-    root.withdraw()  # Hide the main tkinter window
+            group_folder = os.path.join(destination_folder, group_name)
+            downloaded = self.download_attachments(submission, group_folder)
+            if not downloaded:
+                print(f"No attachments found for group {group_name}")
+                continue
 
-    # Fetch only active courses
+            print(f"Downloaded {downloaded} submission files for {group_name}")
+            yield group_name, group_folder
+
+    def batch_fetch(self, targets, destination_root, max_workers=4):
+        """Fetches several (course_id, assignment_id) pairs in one run.
+
+        Metadata for every target is fetched concurrently, then submissions are laid out as
+        destination_root/<course_id>/<assignment_id>/<group or student name>/<file>, ready for the grader.
+        Returns {(course_id, assignment_id): folder} for the targets that were fetched.
+        """
+        def fetch_metadata(target):
+            course_id, assignment_id = target
+            try:
+                details = self.get_assignment_details(course_id, assignment_id)
+                roster = self.get_roster(course_id)
+                submissions = self.get_submissions(course_id, assignment_id)
+                return details, roster, submissions
+            except Exception as e:
+                print(f"[ERROR] Could not fetch course {course_id} assignment {assignment_id}: {e}")
+                return None
+
+        print(f"Fetching metadata for {len(targets)} assignments...")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            metadata = list(executor.map(fetch_metadata, targets))
+
+        fetched = {}
+        for (course_id, assignment_id), result in zip(targets, metadata):
+            if result is None:
+                continue
+            details, (student_names, group_names, group_members), submissions = result
+            folder = os.path.join(destination_root, str(course_id), str(assignment_id))
+            os.makedirs(folder, exist_ok=True)
+            submissions_by_user = {}
+            for submission in submissions:
+                submissions_by_user.setdefault(str(submission['user_id']), submission)
+
+            if details.get('group_category_id') is not None:
+                # Group assignment: one folder per group, using the first member's submission
+                owners = [(group_names[group_id], group_members[group_id][0])
+                          for group_id in sorted(group_names.keys(), key=lambda x: int(x))]
+            else:
+                owners = [(student_names.get(user_id, f"Student {user_id}"), user_id) for user_id in submissions_by_user]
+
+            downloaded = 0
+            for owner_name, user_id in owners:
+                submission = submissions_by_user.get(user_id)
+                if submission and submission['workflow_state'] != 'unsubmitted':
+                    if self.download_attachments(submission, os.path.join(folder, owner_name)):
+                        downloaded += 1
+            print(f"Course {course_id} assignment {details.get('name', assignment_id)}: "
+                  f"{downloaded} submissions saved to {folder}")
+            fetched[(course_id, assignment_id)] = folder
+        return fetched
+
+
+def select_course(canvas_api):
+    """Lists the active courses and returns the (id, name) of the one the user picks, or None."""
     print("Fetching active courses...")
-    canvas_api = CanvasAPI(API_TOKEN, BASE_URL)
     active_courses = canvas_api.get_active_courses()
 
     if not active_courses:
         print("No active courses found.")
-        return
+        return None
 
     # Display a list of active courses
     print("Active Courses with names:")
@@ -164,6 +455,54 @@ def main():
     selected_course_id = active_courses[int(selected_course) - 1]["id"]
     selected_course_name = active_courses[int(selected_course) - 1].get("name", "Unnamed Course")
     print(f"Using course: {selected_course_name} (ID: {selected_course_id})")
+    return selected_course_id, selected_course_name
+
+
+def select_assignment(canvas_api, course_id):
+    """Lists the course's assignments and returns the id of the one the user picks."""
+    assignments = canvas_api.get_assignments(course_id)
+
+    # Display available assignments
+    print("Assignments:")
+    for index, assignment in enumerate(assignments, start=1):
+        print(f'{index}. {assignment["name"]} (ID: {assignment["id"]})')
+
+    selected_assignment = input("Enter the number of the assignment you want to inspect: ")
+    return assignments[int(selected_assignment) - 1]["id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch Canvas submissions.")
+    parser.add_argument("--batch", nargs="+", metavar="COURSE:ASSIGNMENT",
+                        help="Fetch these course/assignment pairs without prompting")
+    parser.add_argument("--dest", default="submissions", help="Root folder for --batch downloads")
+    args = parser.parse_args()
+    if args.batch:
+        targets = []
+        for target in args.batch:
+            course_id, _, assignment_id = target.partition(":")
+            if not course_id.isdigit() or not assignment_id.isdigit():
+                parser.error(f"Expected COURSE:ASSIGNMENT ids, got '{target}'")
+            targets.append((int(course_id), int(assignment_id)))
+        with CanvasAPI(API_TOKEN, BASE_URL, store=CanvasStore()) as canvas_api:
+            canvas_api.batch_fetch(targets, args.dest)
+        return
+
+    # Setup tkinter root window (hidden)
+    root = tk.Tk()
+    root.withdraw()  # Hide the main tkinter window
+
+    with CanvasAPI(API_TOKEN, BASE_URL, store=CanvasStore()) as canvas_api:
+        fetch_interactively(canvas_api)
+
+
+def fetch_interactively(canvas_api):
+    """Prompts for a course, assignment and folder, then reports (and optionally downloads) its submissions."""
+    # Fetch only active courses
+    selected_course = select_course(canvas_api)
+    if not selected_course:
+        return
+    selected_course_id, selected_course_name = selected_course
 
     # Prompt user to select a destination folder
     print("Select a destination folder to save submissions...")
@@ -174,19 +513,9 @@ def main():
     print(f"Selected destination folder: {destination_folder}")
 
     # Fetch groups and assignments
-    canvas_api.write_groups_to_csv(selected_course_id)
-    print("Groups and members have been written to 'groups_and_members.csv'.")
-    
-    student_names, group_names, group_members = canvas_api.load_names_from_csv()
-    assignments = canvas_api.get_assignments(selected_course_id)
-
-    # Display available assignments
-    print("Assignments:")
-    for index, assignment in enumerate(assignments, start=1):
-        print(f'{index}. {assignment["name"]} (ID: {assignment["id"]})')
-
-    selected_assignment = input("Enter the number of the assignment you want to inspect: ")
-    selected_assignment_id = assignments[int(selected_assignment) - 1]["id"]
+    canvas_api.write_groups_to_csv(selected_course_id)  # Kept for the TAs' records; the roster comes from the store
+    student_names, group_names, group_members = canvas_api.get_roster(selected_course_id)
+    selected_assignment_id = select_assignment(canvas_api, selected_course_id)
 
     # Determine if the assignment is group-based
     assignment_details = canvas_api.get_assignment_details(selected_course_id, selected_assignment_id)
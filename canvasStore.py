@@ -0,0 +1,123 @@
+import os
+import time
+import sqlite3
+import threading
+
+
+class CanvasStore:
+    """Local SQLite copy of the Canvas metadata we use: courses, assignments, groups, members, submissions, files.
+
+    CanvasAPI writes every list it fetches here, so rosters and attachment lookups are indexed queries and
+    unchanged attachments are not downloaded twice.
+    """
+
+    def __init__(self, db_path="canvas_metadata.db"):
+        self.db_path = db_path
+        # CanvasAPI fetches from several threads; one connection behind a lock keeps writes ordered
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS courses (id INTEGER PRIMARY KEY, name TEXT, workflow_state TEXT, end_at TEXT);
+            CREATE TABLE IF NOT EXISTS assignments (
+                id INTEGER PRIMARY KEY, course_id INTEGER, name TEXT, group_category_id INTEGER, points_possible REAL);
+            CREATE TABLE IF NOT EXISTS course_groups (id INTEGER PRIMARY KEY, course_id INTEGER, name TEXT);
+            CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, name TEXT);
+            CREATE TABLE IF NOT EXISTS memberships (
+                group_id INTEGER, user_id INTEGER, position INTEGER, PRIMARY KEY (group_id, user_id));
+            CREATE TABLE IF NOT EXISTS submissions (
+                assignment_id INTEGER, user_id INTEGER, workflow_state TEXT, submitted_at TEXT,
+                PRIMARY KEY (assignment_id, user_id));
+            CREATE TABLE IF NOT EXISTS attachments (
+                id INTEGER PRIMARY KEY, assignment_id INTEGER, user_id INTEGER, filename TEXT, url TEXT,
+                size INTEGER, updated_at TEXT, path TEXT);
+            CREATE TABLE IF NOT EXISTS refreshes (what TEXT PRIMARY KEY, refreshed_at REAL);
+            CREATE INDEX IF NOT EXISTS assignments_course ON assignments (course_id);
+            CREATE INDEX IF NOT EXISTS groups_course ON course_groups (course_id);
+            CREATE INDEX IF NOT EXISTS memberships_user ON memberships (user_id);
+            CREATE INDEX IF NOT EXISTS submissions_user ON submissions (user_id);
+            CREATE INDEX IF NOT EXISTS attachments_owner ON attachments (assignment_id, user_id);
+        """)
+
+    def write(self, statements):
+        """Runs [(sql, rows), ...] with executemany in one transaction."""
+        with self.lock, self.connection:
+            for sql, rows in statements:
+                self.connection.executemany(sql, rows)
+
+    def query(self, sql, parameters=()):
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def is_fresh(self, what, max_age):
+        """True if what was refreshed less than max_age seconds ago."""
+        row = self.query("SELECT refreshed_at FROM refreshes WHERE what = ?", (what,))
+        return bool(row) and time.time() - row[0][0] < max_age
+
+    def save_courses(self, courses):
+        self.write([("INSERT OR REPLACE INTO courses VALUES (?, ?, ?, ?)",
+                     [(c['id'], c.get('name'), c.get('workflow_state'), c.get('end_at')) for c in courses])])
+
+    def save_assignments(self, course_id, assignments):
+        self.write([("INSERT OR REPLACE INTO assignments VALUES (?, ?, ?, ?, ?)",
+                     [(a['id'], course_id, a.get('name'), a.get('group_category_id'), a.get('points_possible'))
+                      for a in assignments])])
+
+    def save_roster(self, course_id, groups, members):
+        """Replaces a course's groups and memberships; members maps group ID -> the group's users in order."""
+        self.write([
+            ("DELETE FROM memberships WHERE group_id IN (SELECT id FROM course_groups WHERE course_id = ?)",
+             [(course_id,)]),
+            ("DELETE FROM course_groups WHERE course_id = ?", [(course_id,)]),
+            ("INSERT OR REPLACE INTO course_groups VALUES (?, ?, ?)",
+             [(group['id'], course_id, group['name']) for group in groups]),
+            ("INSERT OR REPLACE INTO users VALUES (?, ?)",
+             [(user['id'], user['name']) for users in members.values() for user in users]),
+            ("INSERT OR REPLACE INTO memberships VALUES (?, ?, ?)",
+             [(group_id, user['id'], position) for group_id, users in members.items()
+              for position, user in enumerate(users)]),
+            ("INSERT OR REPLACE INTO refreshes VALUES (?, ?)", [(f"roster:{course_id}", time.time())])
+        ])
+
+    def save_submissions(self, assignment_id, submissions):
+        """Upserts submissions and their attachments; download paths already recorded are kept."""
+        attachments = [(a['id'], assignment_id, s['user_id'], a.get('filename'), a.get('url'), a.get('size'),
+                        a.get('updated_at'))
+                       for s in submissions for a in s.get('attachments', [])]
+        self.write([
+            ("INSERT OR REPLACE INTO submissions VALUES (?, ?, ?, ?)",
+             [(assignment_id, s['user_id'], s.get('workflow_state'), s.get('submitted_at')) for s in submissions]),
+            ("INSERT INTO attachments (id, assignment_id, user_id, filename, url, size, updated_at) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET url = excluded.url", attachments)
+        ])
+
+    def roster(self, course_id):
+        """Returns (student_names, group_names, group_members) in the same shape as CanvasAPI.get_roster."""
+        student_names, group_names, group_members = {}, {}, {}
+        for group_id, group_name, user_id, user_name in self.query(
+                "SELECT g.id, g.name, u.id, u.name FROM course_groups g "
+                "JOIN memberships m ON m.group_id = g.id JOIN users u ON u.id = m.user_id "
+                "WHERE g.course_id = ? ORDER BY g.id, m.position", (course_id,)):
+            group_names[str(group_id)] = group_name
+            group_members.setdefault(str(group_id), []).append(str(user_id))
+            student_names[str(user_id)] = user_name
+        return student_names, group_names, group_members
+
+    def members(self, group_id):
+        """Returns [(user ID, name), ...] for a group in roster order."""
+        return self.query("SELECT u.id, u.name FROM memberships m JOIN users u ON u.id = m.user_id "
+                          "WHERE m.group_id = ? ORDER BY m.position", (group_id,))
+
+    def attachments_for(self, assignment_id, user_id):
+        """Returns [(attachment ID, filename, local path or None), ...] of a user's submission."""
+        return self.query("SELECT id, filename, path FROM attachments WHERE assignment_id = ? AND user_id = ? "
+                          "ORDER BY id", (assignment_id, user_id))
+
+    def downloaded(self, attachment_id, path):
+        """True if this attachment was already saved to path and the file is still there."""
+        row = self.query("SELECT path FROM attachments WHERE id = ?", (attachment_id,))
+        return bool(row) and row[0][0] == path and os.path.isfile(path)
+
+    def mark_downloaded(self, attachment, path):
+        self.write([("INSERT INTO attachments (id, filename, url, path) VALUES (?, ?, ?, ?) "
+                     "ON CONFLICT (id) DO UPDATE SET path = excluded.path",
+                     [(attachment['id'], attachment.get('filename'), attachment.get('url'), path)])])
@@ -0,0 +1,197 @@
+import os
+import csv
+import sqlite3
+import argparse
+
+
+class TaskGrade:
+    """Collects one task's comments and the outcome of every check it evaluates under a stable check ID."""
+
+    def __init__(self, task_name, full_marks):
+        self.task_name = task_name
+        self.full_marks = full_marks
+        self.comments = []
+        # (check ID, device, points, weight, comment index, passed); points < 0 for deductions, 0 for passes
+        self.outcomes = []
+
+    def check(self, check_id, device, passed, amount, comment, weight=None):
+        """Records a check's outcome, with comment if it failed; returns the points lost for grade -= task.check(...).
+
+        weight is the check's points before any split across interfaces or devices (defaults to amount).
+        """
+        weight = amount if weight is None else weight
+        if passed:
+            self.outcomes.append((check_id, device, 0.0, weight, None, True))
+            return 0.0
+        self.comments.append(comment)
+        self.outcomes.append((check_id, device, -amount, weight, len(self.comments) - 1, False))
+        return amount
+
+    def deduct(self, check_id, device, amount, comment, weight=None):
+        """Records a failed check; same as check(..., False, ...)."""
+        return self.check(check_id, device, False, amount, comment, weight)
+
+    def note(self, check_id, device, comment):
+        """Records a failure that costs nothing in this rubric (a parse error); a weight table can still price it."""
+        return self.check(check_id, device, False, 0.0, comment)
+
+    def bonus(self, check_id, device, earned, amount):
+        """Records whether a bonus was earned; returns the points awarded for grade += task.bonus(...)."""
+        self.outcomes.append((check_id, device, amount if earned else 0.0, amount, None, bool(earned)))
+        return amount if earned else 0.0
+
+    def result(self, grade):
+        """The task result in the shape grade_group returns, with the recorded outcomes attached."""
+        return {
+            "grade": grade,
+            "comments": " | ".join(self.comments),
+            "full_marks": self.full_marks,
+            "notes": list(self.comments),
+            "checks": list(self.outcomes)
+        }
+
+
+class OutcomeStore:
+    """SQLite file of every group's check outcomes, so grades can be recomputed without the configs."""
+
+    def __init__(self, db_path="check_outcomes.db"):
+        self.db_path = db_path
+        # Opened on first use; the watcher and pipeline record from a single thread at a time
+        self.connection = None
+
+    def connect(self):
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    group_name TEXT, task_name TEXT, position INTEGER, full_marks REAL,
+                    PRIMARY KEY (group_name, task_name));
+                CREATE TABLE IF NOT EXISTS notes (
+                    group_name TEXT, task_name TEXT, position INTEGER, comment TEXT);
+                CREATE TABLE IF NOT EXISTS outcomes (
+                    group_name TEXT, task_name TEXT, position INTEGER, check_id TEXT, device TEXT,
+                    points REAL, weight REAL, note INTEGER, passed INTEGER);
+                CREATE INDEX IF NOT EXISTS outcomes_group ON outcomes (group_name, task_name);
+                CREATE INDEX IF NOT EXISTS notes_group ON notes (group_name, task_name);
+                CREATE INDEX IF NOT EXISTS outcomes_check ON outcomes (check_id);
+            """)
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(outcomes)")]
+            if "passed" not in columns:
+                # Stores written before passes were recorded only hold failures and awarded bonuses
+                with self.connection:
+                    self.connection.execute("ALTER TABLE outcomes ADD COLUMN passed INTEGER")
+                    self.connection.execute("UPDATE outcomes SET passed = points > 0")
+        return self.connection
+
+    def record_group(self, group_name, results):
+        """Replaces everything stored for group_name with the outcomes in results."""
+        connection = self.connect()
+        with connection:
+            for table in ("tasks", "notes", "outcomes"):
+                connection.execute(f"DELETE FROM {table} WHERE group_name = ?", (group_name,))
+            for task_position, (task_name, task_results) in enumerate(results.items()):
+                if "checks" not in task_results:
+                    continue  # Answer-key results have no per-check outcomes
+                connection.execute("INSERT INTO tasks VALUES (?, ?, ?, ?)",
+                                   (group_name, task_name, task_position, task_results["full_marks"]))
+                connection.executemany("INSERT INTO notes VALUES (?, ?, ?, ?)",
+                                       [(group_name, task_name, position, comment)
+                                        for position, comment in enumerate(task_results["notes"])])
+                connection.executemany("INSERT INTO outcomes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                       [(group_name, task_name, position) + tuple(outcome)
+                                        for position, outcome in enumerate(task_results["checks"])])
+
+    def checks(self):
+        """Returns (check ID, base weight, times passed, times failed) for every check that has been evaluated."""
+        return self.connect().execute(
+            "SELECT check_id, MAX(weight), SUM(passed), COUNT(*) - SUM(passed) FROM outcomes "
+            "GROUP BY check_id ORDER BY check_id").fetchall()
+
+    def rescore(self, weights):
+        """Recomputes every stored group's task grades and comments with weights ({check ID: points}).
+
+        Task totals can be overridden with '<Task Name>' keys. Comments of checks re-weighted to 0 are dropped;
+        a check that cost nothing when graded (a parse error note) costs its new weight each time it failed.
+        """
+        connection = self.connect()
+        notes = {}
+        for group_name, task_name, comment in connection.execute(
+                "SELECT group_name, task_name, comment FROM notes ORDER BY group_name, task_name, position"):
+            notes.setdefault((group_name, task_name), []).append(comment)
+        outcomes = {}
+        for group_name, task_name, check_id, points, weight, note, passed in connection.execute(
+                "SELECT group_name, task_name, check_id, points, weight, note, passed FROM outcomes "
+                "ORDER BY group_name, task_name, position"):
+            outcomes.setdefault((group_name, task_name), []).append((check_id, points, weight, note, passed))
+
+        results = {}
+        for group_name, task_name, full_marks in connection.execute(
+                "SELECT group_name, task_name, full_marks FROM tasks ORDER BY rowid"):
+            grade = weights.get(task_name, full_marks)
+            task_notes = notes.get((group_name, task_name), [])
+            dropped = set()
+            for check_id, points, weight, note, passed in outcomes.get((group_name, task_name), []):
+                new_weight = weights.get(check_id, weight)
+                if new_weight != weight:
+                    if weight:
+                        points = points * new_weight / weight
+                    elif not passed:
+                        points = -new_weight
+                grade += points  # Same order as the original run, so unchanged weights reproduce the same float
+                if new_weight == 0 and weight and note is not None:
+                    dropped.add(note)
+            comments = [comment for position, comment in enumerate(task_notes) if position not in dropped]
+            results.setdefault(group_name, {})[task_name] = {"grade": max(0, grade), "comments": " | ".join(comments)}
+        return results
+
+
+def load_weights(weights_csv):
+    """Reads a 'Check ID,Weight' CSV (as written by export_weights) into a dict."""
+    with open(weights_csv, newline='') as csvfile:
+        return {row["Check ID"]: float(row["Weight"]) for row in csv.DictReader(csvfile) if row["Weight"].strip()}
+
+
+def export_weights(store, weights_csv):
+    """Writes the current weight of every stored check as a template for rescore."""
+    with open(weights_csv, 'w', newline='') as csvfile:
+        csv_writer = csv.writer(csvfile)
+        csv_writer.writerow(["Check ID", "Weight", "Passed", "Failed"])
+        for check_id, weight, passed, failed in store.checks():
+            csv_writer.writerow([check_id, weight, passed, failed])
+    print(f"[INFO] Wrote the weights of {len(store.checks())} checks to {weights_csv}")
+
+
+def write_results(results, output_csv):
+    """Writes rescored results in the grading_results.csv layout."""
+    with open(output_csv, 'w', newline='') as csvfile:
+        csv_writer = csv.writer(csvfile)
+        csv_writer.writerow(["Group Name", "Task Name", "Grade", "Comments"])
+        for group_name, tasks in results.items():
+            for task_name, task_results in tasks.items():
+                csv_writer.writerow([group_name, task_name, task_results["grade"], task_results["comments"]])
+    print(f"[INFO] Wrote rescored grades for {len(results)} groups to {output_csv}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore stored check outcomes with a new weight table.")
+    parser.add_argument("--db", default="check_outcomes.db", help="Outcome store written while grading")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Write the stored checks and their weights to a CSV")
+    export_parser.add_argument("weights_csv")
+    rescore_parser = subparsers.add_parser("rescore", help="Regenerate grades from a weights CSV")
+    rescore_parser.add_argument("weights_csv")
+    rescore_parser.add_argument("--output", default="grading_results.csv", help="CSV to write the new grades to")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.db):
+        print(f"[ERROR] No outcome store at {args.db}; grade the cohort first.")
+        return
+    store = OutcomeStore(args.db)
+    if args.command == "export":
+        export_weights(store, args.weights_csv)
+    else:
+        write_results(store.rescore(load_weights(args.weights_csv)), args.output)
+
+
+if __name__ == '__main__':
+    main()
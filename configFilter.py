@@ -0,0 +1,79 @@
+import os
+from iosCanonical import default_canonicalizer
+
+
+def uses_sections(*sections):
+    """Decorator for a grading method: declares the top-level config sections (leading keywords) it reads."""
+    def decorate(method):
+        method.sections = tuple(sections)
+        return method
+    return decorate
+
+
+def declared_sections(grader):
+    """Collects every section declared with @uses_sections on the grader's methods."""
+    sections = set()
+    for name in dir(type(grader)):
+        sections.update(getattr(getattr(type(grader), name), "sections", ()))
+    return sorted(sections)
+
+
+class SectionFilter:
+    """Keeps only the top-level blocks whose leading keywords one of the checks reads, before anything is parsed.
+
+    Top-level lines are canonicalized first, so 'int gi1/0/1' still counts as an interface block.
+    """
+
+    def __init__(self, sections, canonicalizer=default_canonicalizer):
+        self.sections = {tuple(section.split()) for section in sections}
+        self.lengths = sorted({len(section) for section in self.sections})
+        self.canonicalizer = canonicalizer
+
+    def wanted(self, words):
+        return any(tuple(words[:length]) in self.sections for length in self.lengths)
+
+    def filter(self, lines):
+        """Returns (kept lines, {leading keywords: dropped line count}) for one config's lines."""
+        kept = []
+        dropped = {}
+        keep = False
+        label = None
+        banner_end = None  # Delimiter that closes the multi-line banner being skipped
+        for line in lines:
+            if banner_end is not None:
+                dropped[label] += 1
+                if banner_end in line:
+                    banner_end = None
+                continue
+            if line[:1].isspace():
+                if keep:
+                    kept.append(line)
+                elif label is not None:
+                    dropped[label] += 1
+                continue
+
+            text = self.canonicalizer.canonicalize(line) if self.canonicalizer else line
+            words = text.split()
+            if not words or words[0].startswith("!"):
+                keep, label = False, None
+                continue
+            keep = self.wanted(words)
+            if keep:
+                kept.append(line)
+                continue
+            label = " ".join(words[:2])
+            dropped[label] = dropped.get(label, 0) + 1
+            if words[0] == "banner" and len(words) > 2:
+                # Banner text is not indented; skip everything up to the closing delimiter
+                body = text.split(None, 2)[2]
+                delimiter = "^C" if body.startswith("^C") else body[0]
+                if delimiter not in body[len(delimiter):]:
+                    banner_end = delimiter
+        return kept, dropped
+
+    def report(self, filepath, total, dropped):
+        if dropped:
+            removed = sum(dropped.values())
+            largest = sorted(dropped.items(), key=lambda item: -item[1])[:5]
+            summary = ", ".join(f"{label}: {count}" for label, count in largest)
+            print(f"[INFO] {os.path.basename(filepath)}: prefilter dropped {removed} of {total} lines ({summary})")
@@ -0,0 +1,232 @@
+import os
+import re
+import gc
+import sys
+import weakref
+import threading
+from collections import OrderedDict
+from ciscoconfparse import CiscoConfParse
+from iosCanonical import default_canonicalizer
+from configReader import read_config_lines
+from ipAddressing import interface_addresses
+
+INTERFACE_LINE = re.compile(r"^interface (?!range )(\S+)")
+INTERFACE_RANGE_LINE = re.compile(r"^interface range (.+)$")
+RANGE_ITEM = re.compile(r"^([A-Za-z-]*?)((?:\d+/)*)(\d+)(?:\s*-\s*(\d+))?$")
+
+
+def expand_interface_range(spec):
+    """Lists the interfaces an 'interface range' spec covers, e.g. 'Gi1/0/1 - 3, Gi1/0/5' (type may carry over)."""
+    names = []
+    interface_type, slot = "", ""
+    for item in spec.split(","):
+        match = RANGE_ITEM.match(item.strip())
+        if not match:
+            continue
+        if match.group(1):
+            interface_type, slot = match.group(1), match.group(2)
+        elif match.group(2):
+            slot = match.group(2)
+        if not interface_type:
+            continue
+        first = int(match.group(3))
+        last = int(match.group(4)) if match.group(4) else first
+        names.extend(f"{interface_type}{slot}{port}" for port in range(first, last + 1))
+    return names
+
+
+class ConfigOutOfMemory(BaseException):
+    """A config ran out of memory while parsing; not an Exception, so per-device handlers in the graders let it through."""
+
+
+class ConfigLine:
+    """Compact stand-in for a parsed IOS line: its text and a tuple of its children, nothing else."""
+    __slots__ = ("text", "children", "__weakref__")
+
+    def __init__(self, text, children=()):
+        self.text = text
+        self.children = children
+
+    def re_search_children(self, regex):
+        """Returns the direct children whose text matches regex (same as CiscoConfParse)."""
+        return [child for child in self.children if re.search(regex, child.text)]
+
+    def __repr__(self):
+        return f"<ConfigLine {self.text!r} ({len(self.children)} children)>"
+
+
+class LinePool:
+    """Shares identical lines (same text and same children) across every device and group in the process."""
+
+    def __init__(self):
+        self.lines = weakref.WeakValueDictionary()
+        self.lock = threading.Lock()  # Devices of one group are parsed on several threads
+
+    def intern(self, text, children=()):
+        text = sys.intern(text)
+        key = (text, children)
+        with self.lock:
+            line = self.lines.get(key)
+            if line is None:
+                line = ConfigLine(text, children)
+                self.lines[key] = line
+        return line
+
+
+class ConfigIndex:
+    """Read-only view of one device config with the subset of the CiscoConfParse API the graders use."""
+    __slots__ = ("filepath", "lines", "interfaces", "address_table")
+
+    def __init__(self, filepath, lines, interfaces=None):
+        self.filepath = filepath
+        self.lines = lines  # Every line in file order; shared lines can appear more than once
+        self.interfaces = interfaces or {}  # Interface name -> its (merged) interface line
+        self.address_table = None
+
+    @property
+    def addresses(self):
+        """Interface name -> its 'ip address' lines as InterfaceAddress integers, built once per config."""
+        if self.address_table is None:
+            self.address_table = interface_addresses(self.interfaces)
+        return self.address_table
+
+    @property
+    def ioscfg(self):
+        return [line.text for line in self.lines]
+
+    def find_objects(self, regex):
+        """Returns every line whose text matches regex, in file order."""
+        pattern = re.compile(regex)
+        return [line for line in self.lines if pattern.search(line.text)]
+
+    def find_interface(self, name):
+        """Returns [interface line] for exactly this interface name, or [] (same shape as find_objects)."""
+        line = self.interfaces.get(name)
+        return [line] if line is not None else []
+
+
+class ConfigCache:
+    """Holds at most max_resident parsed configs; least recently used configs are dropped first."""
+
+    def __init__(self, max_resident=16, canonicalizer=default_canonicalizer, section_filter=None):
+        self.max_resident = max_resident
+        self.canonicalizer = canonicalizer  # Expands abbreviations once per file; None keeps lines as written
+        self.section_filter = section_filter  # Drops sections no check reads before parsing; None keeps everything
+        self.memory_errors_fatal = False  # Isolated workers fail the whole group instead of noting a parse error
+        self.pool = LinePool()
+        self.configs = OrderedDict()
+        self.lock = threading.RLock()  # Guards configs and loading; parsing itself runs outside it
+        self.loading = {}  # filepath -> Event set when the thread parsing it is done
+        self.on_load = None  # on_load(filepath, cached), called by the loading thread (see GroupScheduler)
+
+    def load(self, filepath):
+        """Returns the compact index for filepath, parsing it only if it is not resident or has changed on disk."""
+        stat = os.stat(filepath)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        while True:
+            with self.lock:
+                cached = self.configs.get(filepath)
+                if cached is not None and cached[0] == stamp:
+                    self.configs.move_to_end(filepath)
+                    config = cached[1]
+                    break
+                loading = self.loading.get(filepath)
+                if loading is None:
+                    self.loading[filepath] = threading.Event()
+                    config = None
+                    break
+            loading.wait()  # Another thread is parsing this file; use its result (or parse it here if it failed)
+
+        resident = config is not None
+        if not resident:
+            try:
+                config = self.parse(filepath, stamp)
+            finally:
+                with self.lock:
+                    self.loading.pop(filepath).set()
+        if self.on_load is not None:
+            self.on_load(filepath, resident)
+        return config
+
+    def parse(self, filepath, stamp):
+        try:
+            lines = read_config_lines(filepath)
+            if self.section_filter is not None:
+                total = len(lines)
+                lines, dropped = self.section_filter.filter(lines)
+                self.section_filter.report(filepath, total, dropped)
+            parse = CiscoConfParse(lines)
+            config = self.compact(filepath, parse)
+        except MemoryError:
+            if not self.memory_errors_fatal:
+                raise
+            raise ConfigOutOfMemory(f"{os.path.basename(filepath)} ran out of memory while parsing") from None
+        del parse  # The full object tree is only needed to find parent/child relationships
+
+        with self.lock:
+            self.configs[filepath] = (stamp, config)
+            self.configs.move_to_end(filepath)
+            while len(self.configs) > self.max_resident:
+                self.configs.popitem(last=False)
+        return config
+
+    def compact(self, filepath, parse):
+        """Converts a CiscoConfParse object tree into pooled ConfigLine records."""
+        built = {}
+        canonicalize = self.canonicalizer.canonicalize if self.canonicalizer else str
+        # Children always come after their parent, so walking backwards builds them first
+        for obj in reversed(parse.ConfigObjs):
+            children = tuple(built[child.linenum] for child in obj.children)
+            built[obj.linenum] = self.pool.intern(canonicalize(obj.text), children)
+        lines, interfaces = self.expand_interfaces([built[obj.linenum] for obj in parse.ConfigObjs])
+        return ConfigIndex(filepath, lines, interfaces)
+
+    def expand_interfaces(self, lines):
+        """Gives every interface one entry, expanding 'interface range' blocks and merging repeated blocks.
+
+        Expanded and merged entries share the original child line objects instead of copying them.
+        """
+        sources = {}  # Interface name -> [(index of the block that first names it, children), ...]
+        for index, line in enumerate(lines):
+            match = INTERFACE_LINE.match(line.text)
+            if match:
+                names = [match.group(1)]
+            else:
+                match = INTERFACE_RANGE_LINE.match(line.text)
+                if not match:
+                    continue
+                names = expand_interface_range(match.group(1))
+            for name in names:
+                sources.setdefault(name, []).append((index, line))
+
+        interfaces = {}
+        placed = {}  # Index of a block -> interface entries to emit there
+        for name, blocks in sources.items():
+            first_index, first_line = blocks[0]
+            if len(blocks) == 1 and INTERFACE_LINE.match(first_line.text):
+                entry = first_line  # The common case: one plain block, used as is
+            else:
+                children = []
+                for _, line in blocks:
+                    children.extend(child for child in line.children if child not in children)
+                entry = self.pool.intern(f"interface {name}", tuple(children))
+            interfaces[name] = entry
+            placed.setdefault(first_index, []).append(entry)
+
+        expanded = []
+        for index, line in enumerate(lines):
+            if INTERFACE_LINE.match(line.text):
+                expanded.extend(placed.get(index, []))  # Nothing if an earlier block already owns this interface
+                continue
+            expanded.append(line)
+            expanded.extend(placed.get(index, []))
+        return tuple(expanded), interfaces
+
+    def release_group(self, group_path):
+        """Drops every resident config under group_path once the group's results are written."""
+        group_path = os.path.normpath(group_path)
+        with self.lock:
+            for filepath in [path for path in self.configs if os.path.dirname(os.path.normpath(path)) == group_path]:
+                del self.configs[filepath]
+        # CiscoConfParse trees are full of parent/child cycles; reclaim them now instead of whenever gc gets to it
+        gc.collect()
@@ -0,0 +1,69 @@
+import re
+import mmap
+import os
+
+# Files at least this big are treated as possible 'show tech-support' style dumps and read through mmap
+LARGE_FILE_BYTES = 1024 * 1024
+
+SHOW_BANNER = re.compile(rb"^-{5,} show (?P<command>[^\r\n]*?) -{5,}[ \t]*\r?$", re.MULTILINE)
+CONFIG_START = re.compile(rb"^(?:Building configuration\.\.\.|Current configuration :)[^\n]*\n", re.MULTILINE)
+CONFIG_END = re.compile(rb"^end[ \t]*\r?$", re.MULTILINE)
+HOSTNAME = re.compile(rb"^[ \t]*hostname[ \t]+(\S+)", re.MULTILINE | re.IGNORECASE)
+
+
+def next_banner(data, position):
+    """Finds the next 'show' banner line at or after position; memchr-speed find() does the scanning."""
+    while True:
+        position = data.find(b"-----", position)
+        if position < 0:
+            return None
+        line_start = data.rfind(b"\n", 0, position) + 1
+        banner = SHOW_BANNER.match(data, line_start)
+        if banner:
+            return banner
+        line_end = data.find(b"\n", position)
+        if line_end < 0:
+            return None
+        position = line_end + 1
+
+
+def config_bounds(data):
+    """Returns the (start, end) byte offsets of the running config inside a dump, or the whole buffer."""
+    position = data.find(b" show running-config")
+    while position >= 0:
+        banner = next_banner(data, data.rfind(b"\n", 0, position) + 1)
+        if banner and banner.group("command").startswith(b"running-config"):
+            following = next_banner(data, banner.end())
+            return banner.end(), following.start() if following else len(data)
+        position = data.find(b" show running-config", position + 1)
+
+    start = CONFIG_START.search(data)
+    if start:
+        end = CONFIG_END.search(data, start.end())
+        return start.start(), end.end() if end else len(data)
+    return 0, len(data)
+
+
+def read_config_lines(filepath):
+    """Returns the config's lines; big dumps are mapped and only their running-config section is decoded."""
+    size = os.path.getsize(filepath)
+    if size < LARGE_FILE_BYTES:
+        with open(filepath, 'r', errors='replace') as file:
+            return file.read().splitlines()
+
+    with open(filepath, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start, end = config_bounds(data)
+        section = data[start:end]
+    print(f"[INFO] {os.path.basename(filepath)}: using {len(section)} of {size} bytes (running-config section)")
+    return section.decode(errors='replace').splitlines()
+
+
+def find_hostname(filepath):
+    """Returns the hostname configured in filepath, or None; big dumps are searched without decoding them."""
+    size = os.path.getsize(filepath)
+    if size == 0:
+        return None
+    with open(filepath, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start, end = config_bounds(data) if size >= LARGE_FILE_BYTES else (0, size)
+        match = HOSTNAME.search(data, start, end)
+        return match.group(1).decode(errors='replace') if match else None
@@ -0,0 +1,317 @@
+import os
+import re
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from urllib.parse import urlparse, parse_qs, urlencode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from canvasFetch import CanvasAPI
+
+DEVICE_FILES = ["Toronto", "ISP", "Ottawa", "Oshawa", "TOR-A1", "TOR-A2", "TOR-D1", "TOR-D2"]
+
+
+class FakeCanvas:
+    """In-memory Canvas section: one course, one group assignment, groups, members and attachments."""
+
+    def __init__(self, num_groups=30, members_per_group=4, attachment_size=8192, per_page=10,
+                 latency=0.0, jitter=0.0, failure_rate=0.0, bucket_size=700.0, leak_rate=10.0,
+                 request_cost=1.0, seed=None):
+        self.per_page = per_page
+        self.latency = latency  # Seconds added to every response
+        self.jitter = jitter  # Random extra latency, up to this many seconds
+        self.failure_rate = failure_rate  # Fraction of requests answered with a 500
+        self.bucket_size = bucket_size  # Canvas-style leaky bucket for X-Rate-Limit-Remaining
+        self.leak_rate = leak_rate  # Units drained from the bucket per second
+        self.request_cost = request_cost
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.bucket = 0.0
+        self.bucket_updated = time.time()
+        self.stats = {"requests": 0, "throttled": 0, "failed": 0, "bytes": 0}
+        self.grades = {}  # (assignment ID, user ID) -> {'posted_grade': ..., 'text_comment': ...} from update_grades
+        self.progress = {}  # Progress ID -> [progress object, time it completes]
+        self.progress_delay = 0.5  # Seconds a bulk grade update stays 'running' before it completes
+        self.base_url = None  # Set once the server is bound
+
+        self.course_id = 1001
+        self.assignment_id = 5001
+        self.courses = [
+            {"id": self.course_id, "name": "AN2 Case Study", "workflow_state": "available", "end_at": None},
+            {"id": 1002, "name": "Old Section", "workflow_state": "completed", "end_at": "2020-04-30T00:00:00Z"}
+        ]
+        self.assignments = [
+            {"id": self.assignment_id, "name": "Case Study Configs", "group_category_id": 77, "points_possible": 139},
+            {"id": 5002, "name": "Lab 1", "group_category_id": None, "points_possible": 10}
+        ]
+
+        self.groups = []
+        self.members = {}
+        self.submissions = []
+        self.files = {}
+        user_id, file_id = 20000, 90000
+        for number in range(1, num_groups + 1):
+            group_id = 3000 + number
+            self.groups.append({"id": group_id, "name": f"Case Study Group {number}"})
+            self.members[group_id] = []
+            attachments = []
+            for device in DEVICE_FILES:
+                file_id += 1
+                filler = f"hostname {device}\n!\n".encode()
+                self.files[file_id] = filler + b"!" * max(0, attachment_size - len(filler))
+                attachments.append({"id": file_id, "filename": f"{device}.txt", "url": None})
+            for _ in range(members_per_group):
+                user_id += 1
+                self.members[group_id].append({"id": user_id, "name": f"Student {user_id}"})
+                # Canvas returns one submission per member of a group assignment, all sharing the files
+                self.submissions.append({"user_id": user_id, "workflow_state": "submitted",
+                                         "attachments": attachments})
+
+    def charge(self):
+        """Drains and refills the rate-limit bucket; returns (allowed, remaining, cost)."""
+        with self.lock:
+            now = time.time()
+            self.bucket = max(0.0, self.bucket - (now - self.bucket_updated) * self.leak_rate)
+            self.bucket_updated = now
+            self.stats["requests"] += 1
+            if self.bucket + self.request_cost > self.bucket_size:
+                self.stats["throttled"] += 1
+                return False, self.bucket_size - self.bucket, self.request_cost
+            self.bucket += self.request_cost
+            return True, self.bucket_size - self.bucket, self.request_cost
+
+    def route(self, path):
+        """Maps an API path to its JSON payload (a list is paginated), raw bytes, or None for 404."""
+        patterns = [
+            (r"^courses$", lambda: self.courses),
+            (r"^courses/(\d+)$", lambda c: next((x for x in self.courses if x["id"] == int(c)), None)),
+            (r"^courses/(\d+)/assignments$", lambda c: self.assignments),
+            (r"^courses/(\d+)/assignments/(\d+)$",
+             lambda c, a: next((x for x in self.assignments if x["id"] == int(a)), None)),
+            (r"^courses/(\d+)/assignments/(\d+)/submissions$",
+             lambda c, a: self.submissions if int(a) == self.assignment_id else []),
+            (r"^courses/(\d+)/groups$", lambda c: self.groups),
+            (r"^groups/(\d+)/users$", lambda g: self.members.get(int(g))),
+            (r"^files/(\d+)/download$", lambda f: self.files.get(int(f))),
+            (r"^progress/(\d+)$", lambda p: self.get_progress(int(p)))
+        ]
+        for pattern, handler in patterns:
+            match = re.match(pattern, path)
+            if match:
+                return handler(*match.groups())
+        return None
+
+    def get_progress(self, progress_id):
+        with self.lock:
+            if progress_id not in self.progress:
+                return None
+            progress, completes_at = self.progress[progress_id]
+            if time.time() >= completes_at:
+                progress.update(workflow_state="completed", completion=100)
+            elif progress["workflow_state"] == "queued":
+                progress.update(workflow_state="running", completion=50)
+            return dict(progress)
+
+    def update_grades(self, course_id, assignment_id, form):
+        """Applies a bulk update_grades form and returns the progress object Canvas would."""
+        users = {member["id"] for members in self.members.values() for member in members}
+        updates = {}
+        for key, values in form.items():
+            match = re.match(r"^grade_data\[(\d+)\]\[(posted_grade|text_comment)\]$", key)
+            if not match or int(match.group(1)) not in users:
+                return None
+            updates.setdefault(int(match.group(1)), {})[match.group(2)] = values[-1]
+        with self.lock:
+            for user_id, fields in updates.items():
+                self.grades.setdefault((assignment_id, user_id), {}).update(fields)
+            progress_id = 7000 + len(self.progress) + 1
+            progress = {"id": progress_id, "context_type": "Course", "context_id": course_id,
+                        "tag": "submissions_update", "workflow_state": "queued", "completion": 0,
+                        "url": f"{self.base_url}progress/{progress_id}"}
+            self.progress[progress_id] = [progress, time.time() + self.progress_delay]
+        return dict(progress)
+
+    def attachment_url(self, file_id):
+        return f"{self.base_url}files/{file_id}/download"
+
+
+class FakeCanvasHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Allow keep-alive so client sessions can reuse connections
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes; don't wait for delayed ACKs
+    canvas = None  # Set by start_server()
+
+    def send_body(self, status, body, content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.canvas.lock:
+            self.canvas.stats["bytes"] += len(body)
+
+    def do_GET(self):
+        canvas = self.canvas
+        if canvas.latency or canvas.jitter:
+            time.sleep(canvas.latency + canvas.rng.uniform(0, canvas.jitter))
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self.send_body(401, b'{"errors": [{"message": "user authorization required"}]}')
+            return
+
+        allowed, remaining, cost = canvas.charge()
+        rate_headers = {"X-Rate-Limit-Remaining": f"{remaining:.3f}", "X-Request-Cost": f"{cost:.3f}"}
+        if not allowed:
+            self.send_body(403, b"403 Forbidden (Rate Limit Exceeded)", "text/plain", rate_headers)
+            return
+        if canvas.failure_rate and canvas.rng.random() < canvas.failure_rate:
+            with canvas.lock:
+                canvas.stats["failed"] += 1
+            self.send_body(500, b'{"errors": [{"message": "injected failure"}]}', headers=rate_headers)
+            return
+
+        url = urlparse(self.path)
+        path = url.path.split("/api/v1/", 1)[-1].strip("/")
+        payload = canvas.route(path)
+        if payload is None:
+            self.send_body(404, b'{"errors": [{"message": "The specified resource does not exist."}]}',
+                           headers=rate_headers)
+            return
+        if isinstance(payload, bytes):
+            self.send_body(200, payload, "application/octet-stream", rate_headers)
+            return
+        if not isinstance(payload, list):
+            self.send_body(200, json.dumps(payload).encode(), headers=rate_headers)
+            return
+
+        # Canvas-style pagination with a Link header
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        per_page = int(query.get("per_page", canvas.per_page))
+        page = int(query.get("page", 1))
+        last_page = max(1, -(-len(payload) // per_page))
+        items = payload[(page - 1) * per_page:page * per_page]
+        if path.endswith("/submissions"):
+            items = [dict(item, attachments=[dict(a, url=canvas.attachment_url(a["id"])) for a in item["attachments"]])
+                     for item in items]
+
+        def page_url(number):
+            return f"{canvas.base_url}{path}?{urlencode(dict(query, page=number, per_page=per_page))}"
+
+        links = [f'<{page_url(page)}>; rel="current"', f'<{page_url(1)}>; rel="first"',
+                 f'<{page_url(last_page)}>; rel="last"']
+        if page < last_page:
+            links.insert(0, f'<{page_url(page + 1)}>; rel="next"')
+        self.send_body(200, json.dumps(items).encode(), headers=dict(rate_headers, Link=", ".join(links)))
+
+    def do_POST(self):
+        canvas = self.canvas
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self.send_body(401, b'{"errors": [{"message": "user authorization required"}]}')
+            return
+        allowed, remaining, cost = canvas.charge()
+        rate_headers = {"X-Rate-Limit-Remaining": f"{remaining:.3f}", "X-Request-Cost": f"{cost:.3f}"}
+        if not allowed:
+            self.send_body(403, b"403 Forbidden (Rate Limit Exceeded)", "text/plain", rate_headers)
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        path = urlparse(self.path).path.split("/api/v1/", 1)[-1].strip("/")
+        match = re.match(r"^courses/(\d+)/assignments/(\d+)/submissions/update_grades$", path)
+        progress = canvas.update_grades(int(match.group(1)), int(match.group(2)), parse_qs(body)) if match else None
+        if progress is None:
+            self.send_body(404, b'{"errors": [{"message": "The specified resource does not exist."}]}',
+                           headers=rate_headers)
+            return
+        self.send_body(200, json.dumps(progress).encode(), headers=rate_headers)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(canvas, port=0):
+    """Starts the fake Canvas API on localhost in a background thread and returns the server."""
+    handler = type("BoundFakeCanvasHandler", (FakeCanvasHandler,), {"canvas": canvas})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    canvas.base_url = f"http://127.0.0.1:{server.server_address[1]}/api/v1/"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_harness(canvas):
+    """Runs the group download flow against canvas and reports request rate and wall time."""
+    server = start_server(canvas)
+    work_dir = tempfile.mkdtemp(prefix="fake_canvas_")
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)  # Keep anything the fetch writes relative to the cwd out of the repo
+    canvas_api = CanvasAPI("fake-token", canvas.base_url)
+    groups_done = 0
+    error = None
+    started = time.time()
+    try:
+        courses = canvas_api.get_active_courses()
+        course_id = courses[0]["id"]
+        assignments = canvas_api.get_assignments(course_id)
+        assignment_id = next(a["id"] for a in assignments if a.get("group_category_id"))
+        canvas_api.get_assignment_details(course_id, assignment_id)
+        for _ in canvas_api.iter_group_downloads(course_id, assignment_id, os.path.join(work_dir, "submissions")):
+            groups_done += 1
+    except Exception as e:
+        error = e
+    finally:
+        elapsed = time.time() - started
+        os.chdir(previous_dir)
+        canvas_api.close()
+        server.shutdown()
+
+    stats = canvas.stats
+    print(f"[RESULT] Groups downloaded: {groups_done}/{len(canvas.groups)}")
+    print(f"[RESULT] Requests: {stats['requests']} ({stats['throttled']} throttled, {stats['failed']} failed)")
+    print(f"[RESULT] Bytes served: {stats['bytes']}")
+    print(f"[RESULT] Wall time: {elapsed:.2f}s")
+    print(f"[RESULT] Requests per second: {stats['requests'] / elapsed:.1f}")
+    scheduler = canvas_api.scheduler.stats
+    print(f"[RESULT] Client concurrency: peak {scheduler['peak_limit']:.1f} in flight, "
+          f"{scheduler['decreases']} decreases, {scheduler['throttled']} throttled retries")
+    if error:
+        print(f"[ERROR] Fetch stopped early - {error}")
+    return {"groups": groups_done, "elapsed": elapsed, "error": error, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Canvas API server and fetch throughput harness.")
+    parser.add_argument("--groups", type=int, default=30, help="Groups in the simulated section")
+    parser.add_argument("--members", type=int, default=4, help="Students per group")
+    parser.add_argument("--attachment-size", type=int, default=8192, help="Bytes per config attachment")
+    parser.add_argument("--per-page", type=int, default=10, help="Default page size for list endpoints")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency up to this many seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests that return 500")
+    parser.add_argument("--bucket-size", type=float, default=700.0, help="Rate-limit bucket size")
+    parser.add_argument("--leak-rate", type=float, default=10.0, help="Rate-limit units restored per second")
+    parser.add_argument("--request-cost", type=float, default=1.0, help="Rate-limit units charged per request")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for latency jitter and failures")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Only run the fake server on this port")
+    args = parser.parse_args()
+
+    canvas = FakeCanvas(num_groups=args.groups, members_per_group=args.members, attachment_size=args.attachment_size,
+                        per_page=args.per_page, latency=args.latency, jitter=args.jitter,
+                        failure_rate=args.failure_rate, bucket_size=args.bucket_size, leak_rate=args.leak_rate,
+                        request_cost=args.request_cost, seed=args.seed)
+    if args.serve is not None:
+        server = start_server(canvas, args.serve)
+        print(f"[INFO] Fake Canvas API at {canvas.base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+    run_harness(canvas)
+
+
+if __name__ == '__main__':
+    main()
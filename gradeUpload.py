@@ -0,0 +1,95 @@
+import argparse
+from canvasFetch import CanvasAPI, API_TOKEN, BASE_URL
+from canvasStore import CanvasStore
+from rosterJoin import RosterIndex, load_results
+
+
+class GradeUploader:
+    """Turns grading_results.csv into one bulk update_grades call per assignment, one entry per group member."""
+
+    def __init__(self, canvas_api, course_id, assignment_id, total_points=139, include_comments=False, percent=False):
+        self.canvas_api = canvas_api
+        self.course_id = course_id
+        self.assignment_id = assignment_id
+        self.total_points = total_points
+        self.include_comments = include_comments
+        self.percent = percent  # Post "NN.NN%" so Canvas scales to the assignment's points instead of raw points
+
+    def posted_grade(self, total):
+        if self.percent:
+            return f"{total / self.total_points * 100:.2f}%"
+        return f"{total:g}"
+
+    def comment(self, tasks):
+        lines = ["Automated grading results:"]
+        for task_name, grade, comments in tasks:
+            lines.append(f"{task_name}: {grade:g}" + (f" - {comments}" if comments else ""))
+        return "\n".join(lines)
+
+    def build_grade_data(self, results, roster):
+        """Maps every group's total (and comment) to its members; returns (grade_data, unmatched folder names)."""
+        index = RosterIndex(roster)
+        matched, unmatched = index.join(results)
+        grade_data = {}
+        for group, group_id in matched.items():
+            tasks = results[group]
+            fields = {"posted_grade": self.posted_grade(sum(grade for _, grade, _ in tasks))}
+            if self.include_comments:
+                fields["text_comment"] = self.comment(tasks)
+            for student_id in index.group_members[group_id]:
+                grade_data[student_id] = fields
+        return grade_data, unmatched
+
+    def upload(self, results, roster, dry_run=False):
+        """Uploads results (or only prints what would be sent); returns the final progress object or None."""
+        student_names = roster[0]
+        grade_data, unmatched = self.build_grade_data(results, roster)
+        if unmatched:
+            print(f"[WARNING] {len(unmatched)} folders did not match exactly one roster group; "
+                  f"their grades were not uploaded.")
+        if not grade_data:
+            print("[ERROR] Nothing to upload.")
+            return None
+
+        print(f"[INFO] {len(grade_data)} students in {len(results) - len(unmatched)} groups "
+              f"for course {self.course_id} assignment {self.assignment_id}.")
+        if dry_run:
+            for student_id, fields in grade_data.items():
+                print(f"[DRY RUN] {student_names.get(student_id, student_id)} ({student_id}): {fields['posted_grade']}")
+            print("[INFO] Dry run: nothing was sent to Canvas.")
+            return None
+
+        progress = self.canvas_api.update_grades(self.course_id, self.assignment_id, grade_data)
+        progress = self.canvas_api.wait_for_progress(progress)
+        if progress.get('workflow_state') == 'completed':
+            print(f"[INFO] Canvas updated {len(grade_data)} grades.")
+        else:
+            print(f"[ERROR] Canvas did not finish the upload: {progress.get('workflow_state')} {progress.get('message') or ''}")
+        return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload grading_results.csv to the Canvas gradebook in one bulk call.")
+    parser.add_argument("course_id", type=int)
+    parser.add_argument("assignment_id", type=int)
+    parser.add_argument("--results", default="grading_results.csv", help="Results CSV written by the grader")
+    parser.add_argument("--roster", help="Use this groups_and_members.csv instead of the metadata store")
+    parser.add_argument("--store", default="canvas_metadata.db", help="Canvas metadata store")
+    parser.add_argument("--comments", action="store_true", help="Also post each group's per-task comments")
+    parser.add_argument("--percent", action="store_true", help="Post percentages of --total-points")
+    parser.add_argument("--total-points", type=float, default=139, help="Points the results are out of")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be uploaded without sending it")
+    args = parser.parse_args()
+
+    with CanvasAPI(API_TOKEN, BASE_URL, store=CanvasStore(args.store)) as canvas_api:
+        if args.roster:
+            roster = canvas_api.load_names_from_csv(args.roster)
+        else:
+            roster = canvas_api.get_roster(args.course_id)  # From the store unless it is stale
+        uploader = GradeUploader(canvas_api, args.course_id, args.assignment_id, args.total_points,
+                                 args.comments, args.percent)
+        uploader.upload(load_results(args.results), roster, dry_run=args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import zipfile
+import tempfile
+import argparse
+import threading
+import socketserver
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from main import CaseStudyGrader
+from taskGraph import JobOutput, STDOUT_LOCK
+
+
+class GradingService:
+    """Keeps one warm CaseStudyGrader (parsed configs, line pool, compiled patterns) for every request."""
+
+    def __init__(self, max_resident=64):
+        self.grader = CaseStudyGrader()
+        self.grader.config_cache.max_resident = max_resident
+        self.lock = threading.Lock()  # The grader and its cache are not thread-safe
+        self.requests_served = 0
+
+    def output(self):
+        """The JobOutput standing in for sys.stdout, installed on first use and left in place for the service."""
+        with STDOUT_LOCK:  # Wait out any GroupScheduler that has swapped sys.stdout right now
+            if not isinstance(sys.stdout, JobOutput):
+                sys.stdout = JobOutput(sys.stdout)
+            return sys.stdout
+
+    def grade_directory(self, group_path, group_number=None, group_name=None):
+        """Grades the configs in group_path and returns the per-task results as a JSON-ready dict."""
+        if not os.path.isdir(group_path):
+            raise ValueError(f"{group_path} is not a directory")
+        group_name = group_name or os.path.basename(os.path.normpath(group_path))
+        if group_number is None:
+            digits = "".join(filter(str.isdigit, group_name))
+            if not digits:
+                raise ValueError(f"Could not extract group number from {group_name}; pass 'group'")
+            group_number = int(digits)
+
+        started = time.time()
+        output = self.output()
+        with self.lock:
+            # The graders narrate every check; keep the service log to one line per request. Only this thread's
+            # prints are dropped; other requests and the server keep logging while it grades.
+            results, _ = output.capture(
+                lambda: self.grader.grade_group(group_name, group_path, group_number=int(group_number)))
+            self.requests_served += 1
+        if results is None:
+            raise ValueError(f"Not enough device configs found in {group_path}")
+
+        total_grade = sum(task_results["grade"] for task_results in results.values())
+        elapsed = time.time() - started
+        print(f"[INFO] Graded {group_name} (group {group_number}): {total_grade}/{self.grader.total_points} in {elapsed:.3f}s")
+        return {
+            "group": group_name,
+            "group_number": int(group_number),
+            "tasks": results,
+            "total": total_grade,
+            "elapsed": round(elapsed, 4)
+        }
+
+    def grade_bundle(self, data, group_number=None, group_name=None):
+        """Grades a zip of config files uploaded in the request body."""
+        if group_number is None and not group_name:
+            raise ValueError("Pass ?group=N (or ?name=...) with an uploaded bundle")
+        bundle_dir = tempfile.mkdtemp(prefix="grading_bundle_")
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as bundle:
+                for member in bundle.infolist():
+                    if member.is_dir():
+                        continue
+                    # Flatten the archive; map_files_to_devices only looks at top-level files anyway
+                    filename = os.path.basename(member.filename)
+                    if not filename:
+                        continue
+                    with bundle.open(member) as source, open(os.path.join(bundle_dir, filename), 'wb') as target:
+                        shutil.copyfileobj(source, target)
+            return self.grade_directory(bundle_dir, group_number, group_name or f"Group {group_number}")
+        finally:
+            self.grader.config_cache.release_group(bundle_dir)
+            shutil.rmtree(bundle_dir, ignore_errors=True)
+
+
+class GradingRequestHandler(BaseHTTPRequestHandler):
+    service = None  # Set by serve()
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) pair
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self.send_json(404, {"error": "Not found"})
+            return
+        self.send_json(200, {
+            "status": "ok",
+            "requests_served": self.service.requests_served,
+            "resident_configs": len(self.service.grader.config_cache.configs)
+        })
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/grade":
+            self.send_json(404, {"error": "Not found"})
+            return
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        try:
+            if self.headers.get("Content-Type", "").startswith("application/zip"):
+                result = self.service.grade_bundle(body, query.get("group"), query.get("name"))
+            else:
+                payload = json.loads(body or b"{}")
+                payload.update(query)
+                if "path" not in payload:
+                    raise ValueError("Send JSON with a 'path' to a group folder, or a zip bundle")
+                result = self.service.grade_directory(payload["path"], payload.get("group"), payload.get("name"))
+        except (ValueError, zipfile.BadZipFile, json.JSONDecodeError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            print(f"[ERROR] Grading request failed - {e}")
+            self.send_json(500, {"error": str(e)})
+            return
+        self.send_json(200, result)
+
+    def log_message(self, format, *args):
+        pass  # grade_directory already logs one line per request
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(service, host="127.0.0.1", port=8765, socket_path=None):
+    """Serves grading requests on localhost HTTP, or on a Unix socket when socket_path is given."""
+    GradingRequestHandler.service = service
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, GradingRequestHandler)
+        print(f"[INFO] Grading service listening on unix socket {socket_path}")
+    else:
+        server = ThreadingHTTPServer((host, port), GradingRequestHandler)
+        print(f"[INFO] Grading service listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[INFO] Grading service stopped.")
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local grading service with warm caches.")
+    parser.add_argument("--port", type=int, default=8765, help="Localhost port to listen on")
+    parser.add_argument("--socket", help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--max-resident", type=int, default=64, help="Parsed configs kept warm between requests")
+    args = parser.parse_args()
+    serve(GradingService(max_resident=args.max_resident), port=args.port, socket_path=args.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import time
+import multiprocessing
+
+try:
+    import resource  # POSIX only; on Windows groups still get a time limit but no memory limit
+except ImportError:
+    resource = None
+
+
+def isolated_worker(connection, answer_key, memory_limit_mb):
+    """Worker process loop: grades one group per request and streams each task result back as it finishes."""
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    from main import CaseStudyGrader  # Imported here so main.py can import this module
+    from configIndex import ConfigOutOfMemory
+    grader = CaseStudyGrader()
+    grader.config_cache.memory_errors_fatal = True
+    # Each extra thread reserves its own malloc arena against RLIMIT_AS; one group at a time runs its tasks in order
+    grader.task_workers = None
+    if answer_key is not None:
+        grader.load_answer_key(*answer_key)
+    connection.send(("ready",))
+
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        group, group_path = request
+        try:
+            results = grader.grade_group(group, group_path,
+                                         on_task=lambda task_name, result: connection.send(("task", task_name, result)))
+            connection.send(("done", results))
+        except (MemoryError, ConfigOutOfMemory):
+            connection.send(("error", f"went over the {memory_limit_mb} MB memory limit"))
+        except SystemExit:
+            # A grader calling exit() must fail this group, not kill the worker mid-request
+            connection.send(("error", "called exit() while grading"))
+        except Exception as e:
+            connection.send(("error", str(e)))
+        finally:
+            grader.config_cache.release_group(group_path)
+
+
+class IsolatedGroupRunner:
+    """Grades groups one at a time in a worker process that is killed if a group goes over its time or memory budget.
+
+    Tasks that finished before the budget ran out are kept; the rest are recorded as not graded.
+    """
+
+    def __init__(self, answer_key=None, time_limit=120.0, memory_limit_mb=2048):
+        self.answer_key = answer_key  # (answer key dir, key group number) to load in the worker, or None
+        self.time_limit = time_limit
+        self.memory_limit_mb = memory_limit_mb
+        # spawn behaves the same on Windows and Linux and doesn't copy the parent's Tk or SQLite handles
+        self.context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.connection = None
+
+    def start(self):
+        self.connection, child_connection = self.context.Pipe()
+        self.process = self.context.Process(target=isolated_worker, daemon=True,
+                                            args=(child_connection, self.answer_key, self.memory_limit_mb))
+        self.process.start()
+        child_connection.close()
+        self.connection.recv()  # Wait out the imports so they don't count against the first group's budget
+
+    def kill(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.connection.close()
+        self.process = None
+        self.connection = None
+
+    def close(self):
+        """Stops the worker once no more groups are coming."""
+        if self.process is not None:
+            try:
+                self.connection.send(None)
+                self.process.join(timeout=5)
+            except Exception:
+                pass
+            self.kill()
+
+    def grade(self, group, group_path, task_names):
+        """Returns (results, problem): problem is None, or why the group's missing tasks were not graded."""
+        if self.process is None or not self.process.is_alive():
+            self.start()
+        # The clock starts after the worker is up, so a restart doesn't eat into the group's budget
+        deadline = time.time() + self.time_limit
+        self.connection.send((group, group_path))
+
+        partial = {}
+        problem = None
+        while problem is None:
+            remaining = deadline - time.time()
+            if remaining <= 0 or not self.connection.poll(remaining):
+                problem = f"went over the {self.time_limit:g}s time limit"
+                break
+            try:
+                message = self.connection.recv()
+            except EOFError:
+                self.process.join(timeout=5)  # exitcode stays None until the process is joined
+                problem = f"worker exited with code {self.process.exitcode}"
+                break
+            if message[0] == "task":
+                partial[message[1]] = message[2]
+            elif message[0] == "done":
+                return message[1], None
+            else:
+                problem = message[1]
+
+        self.kill()  # Never reuse a worker that was interrupted mid-group; the next group gets a fresh one
+        for task_name in task_names:
+            if task_name not in partial:
+                partial[task_name] = {"grade": 0, "comments": f"Not graded: the group {problem}"}
+        return {task_name: partial[task_name] for task_name in task_names}, problem
@@ -0,0 +1,137 @@
+from functools import lru_cache
+from types import MappingProxyType
+
+
+def frozen(table):
+    """Read-only view of a (possibly nested) dict so a shared spec can't be changed by one of its users."""
+    return MappingProxyType({key: frozen(value) if isinstance(value, dict) else value for key, value in table.items()})
+
+
+class GroupSpec:
+    """Every value the checks expect for one group number: VLANs, addresses, HSRP groups, tunnel key, delay, cost.
+
+    Built once per group number by group_spec() and shared by every task and every group with that number.
+    """
+
+    __slots__ = ("number", "octet_1xx", "octet_2xx", "vlan_2xx", "vlan_3xx", "vlans", "svi_interfaces",
+                 "hsrp_10", "hsrp_2xx", "hsrp_3xx", "hsrp_groups", "stp_cost", "tunnel_key", "delay",
+                 "interface_addresses", "svi_subnets", "vlan_pruning", "internet_interfaces", "internet_ips",
+                 "tunnel_ips", "tunnel_network", "default_gateway", "static_default_route",
+                 "toronto_static_route", "eigrp_process_name")
+
+    def __init__(self, group_number):
+        g = group_number
+        values = {
+            "number": g,
+            "octet_1xx": 100 + g,
+            "octet_2xx": 200 + g,
+            "vlan_2xx": 200 + g,
+            "vlan_3xx": 300 + g,
+            "hsrp_10": (2 * g) + 10,
+            "hsrp_2xx": (2 * g) + 200 + g,
+            "hsrp_3xx": (2 * g) + 300 + g,
+            "stp_cost": (2 * g) + 10,
+            "tunnel_key": 3 * g,
+            "delay": (2 * g) + 20
+        }
+        values["vlans"] = (10, values["vlan_2xx"], values["vlan_3xx"])
+        values["svi_interfaces"] = tuple(f"Vlan{vlan}" for vlan in values["vlans"])
+        values["hsrp_groups"] = (values["hsrp_10"], values["hsrp_2xx"], values["hsrp_3xx"])
+
+        values["internet_ips"] = frozen({
+            "Toronto": f"199.212.32.{g}",
+            "Ottawa": f"209.165.200.{g}",
+            "Oshawa": f"198.51.100.{g}"
+        })
+        values["internet_interfaces"] = frozen({
+            "Toronto": {"interface": "GigabitEthernet0/0/1.100", "ip": values["internet_ips"]["Toronto"]},
+            "Ottawa": {"interface": "GigabitEthernet0/0/1", "ip": values["internet_ips"]["Ottawa"]},
+            "Oshawa": {"interface": "GigabitEthernet0/0/1", "ip": values["internet_ips"]["Oshawa"]}
+        })
+        values["tunnel_ips"] = frozen({"Toronto": f"10.1.{g}.1", "Ottawa": f"10.1.{g}.2", "Oshawa": f"10.1.{g}.3"})
+        values["tunnel_network"] = f"10.1.{g}.0"
+
+        values["interface_addresses"] = frozen({
+            "ISP": {
+                "GigabitEthernet0/0/0": "10.202.10.2/29",
+                "GigabitEthernet0/0/1": "10.202.20.2/29",
+                "Loopback1": "2.2.2.2/32"
+            },
+            "Toronto": {
+                "GigabitEthernet0/0/0": "10.202.10.1/29",
+                "GigabitEthernet0/0/1.10": f"172.16.{g}.1/24",
+                "GigabitEthernet0/0/1.100": f"199.212.32.{g}/24",
+                "Loopback1": "1.1.1.1/32",
+                "Tunnel1": f"10.1.{g}.1/24"
+            },
+            "Ottawa": {
+                "GigabitEthernet0/0/0": "10.202.20.3/29",
+                "GigabitEthernet0/0/1": f"209.165.200.{g}/24",
+                "Loopback1": "3.3.3.3/32",
+                "Loopback101": f"172.16.84.{g}/24",
+                "Loopback102": f"172.16.85.{g}/24",
+                "Loopback103": f"172.16.86.{g}/24",
+                "Tunnel1": f"10.1.{g}.2/24"
+            },
+            "Oshawa": {
+                "GigabitEthernet0/0/1": f"198.51.100.{g}/24",
+                "Loopback1": "4.4.4.4/32",
+                "Loopback101": f"172.16.87.{g}/24",
+                "Loopback102": f"172.16.88.{g}/24",
+                "Loopback103": f"172.16.89.{g}/24",
+                "Tunnel1": f"10.1.{g}.3/24"
+            },
+            "TOR-D2": {
+                "Vlan100": "199.212.32.254/24",
+                "Vlan300": "209.165.200.254/24",
+                "Vlan400": "198.51.100.254/24"
+            }
+        })
+        # SVIs on TOR-D1, TOR-A1 and TOR-A2 only need an address somewhere in their subnet
+        values["svi_subnets"] = frozen({
+            "Vlan10": f"172.16.{g}.0/24",
+            f"Vlan{values['vlan_2xx']}": f"172.16.{values['octet_1xx']}.0/24",
+            f"Vlan{values['vlan_3xx']}": f"172.16.{values['octet_2xx']}.0/24"
+        })
+
+        # Mandatory VLANs on each distribution switch's port-channels
+        uplink_vlans = ("10", "100", str(values["vlan_2xx"]), str(values["vlan_3xx"]))
+        downlink_vlans = ("10", str(values["vlan_2xx"]), str(values["vlan_3xx"]))
+        pruning = {"Port-channel1": uplink_vlans, "Port-channel2": downlink_vlans, "Port-channel3": downlink_vlans}
+        values["vlan_pruning"] = frozen({"TOR-D1": pruning, "TOR-D2": pruning})
+
+        values["default_gateway"] = f"172.16.{g}.254"
+        values["static_default_route"] = f"ip route 0.0.0.0 0.0.0.0 172.16.{g}.1"
+        values["toronto_static_route"] = f"ip route 172.16.0.0 255.255.0.0 172.16.{g}.254"
+        values["eigrp_process_name"] = rf"OntarioTech0?{g}"
+
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"GroupSpec is read-only ({name})")
+
+    def __repr__(self):
+        return f"GroupSpec({self.number})"
+
+    def values(self):
+        """The numbers answer keys re-number between groups, by family (see answerKey.SUBSTITUTION_RULES)."""
+        return {
+            "group": self.number,
+            "octet_1xx": self.octet_1xx,
+            "octet_2xx": self.octet_2xx,
+            "vlan_2xx": self.vlan_2xx,
+            "vlan_3xx": self.vlan_3xx,
+            "hsrp_10": self.hsrp_10,
+            "hsrp_2xx": self.hsrp_2xx,
+            "hsrp_3xx": self.hsrp_3xx,
+            "stp_cost": self.stp_cost,
+            "tunnel_key": self.tunnel_key,
+            "delay": self.delay
+        }
+
+
+@lru_cache(maxsize=None)
+def group_spec(group_number):
+    """The shared GroupSpec for a group number, built on first use."""
+    return GroupSpec(group_number)
@@ -0,0 +1,238 @@
+import re
+import threading
+from ipAddressing import parse_address, format_address
+
+STANDBY_LINE = re.compile(r"^standby (\d+) (\S+)(?: (\S+))?")
+NHRP_NHS = re.compile(r"^ip nhrp nhs (\S+)(?: nbma (\S+))?")
+NHRP_MAP = re.compile(r"^ip nhrp map (?!multicast )(\S+) (\S+)")
+NHRP_MULTICAST = re.compile(r"^ip nhrp map multicast (\S+)")
+
+
+class InterfaceNode:
+    """One interface of one device, with the facts the cross-device checks need."""
+    __slots__ = ("device", "name", "line", "children", "addresses", "mpls", "ldp", "vrf")
+
+    def __init__(self, device, name, line, addresses):
+        self.device = device
+        self.name = name
+        self.line = line
+        self.children = [child.text.strip() for child in line.children]
+        self.addresses = addresses  # (InterfaceAddress, ...) from ConfigIndex.addresses
+        self.mpls = "mpls ip" in self.children
+        self.ldp = "mpls label protocol ldp" in self.children
+        self.vrf = next((child.split()[2] for child in self.children if child.startswith("vrf forwarding ")), None)
+
+    @property
+    def address(self):
+        """The primary address as an integer, or None."""
+        return next((entry.address for entry in self.addresses if not entry.secondary), None)
+
+
+class TunnelNode:
+    """A tunnel interface's DMVPN settings; addresses are integers so they compare across devices."""
+    __slots__ = ("device", "name", "address", "source", "nhs", "maps", "multicast", "network_id")
+
+    def __init__(self, interface):
+        self.device = interface.device
+        self.name = interface.name
+        self.address = interface.address
+        self.source = next((child.split()[2] for child in interface.children if child.startswith("tunnel source ")),
+                           None)
+        self.nhs = []  # Next-hop server tunnel addresses
+        self.maps = {}  # Tunnel address -> NBMA (public) address
+        self.multicast = []  # NBMA addresses multicast is replicated to
+        self.network_id = None
+        for child in interface.children:
+            # Anything that isn't an address ('dynamic', a hostname) is left out
+            match = NHRP_NHS.match(child)
+            if match:
+                nhs, nbma = parse_address(match.group(1)), parse_address(match.group(2) or "")
+                if nhs is not None:
+                    self.nhs.append(nhs)
+                if nbma is not None:  # One-line form: ip nhrp nhs <tunnel> nbma <public> [multicast]
+                    if nhs is not None:
+                        self.maps[nhs] = nbma
+                    if child.endswith(" multicast"):
+                        self.multicast.append(nbma)
+                continue
+            match = NHRP_MAP.match(child)
+            if match:
+                address, nbma = parse_address(match.group(1)), parse_address(match.group(2))
+                if address is not None and nbma is not None:
+                    self.maps[address] = nbma
+                continue
+            match = NHRP_MULTICAST.match(child)
+            if match:
+                if parse_address(match.group(1)) is not None:
+                    self.multicast.append(parse_address(match.group(1)))
+            elif child.startswith("ip nhrp network-id "):
+                self.network_id = child.split()[3]
+
+
+class StandbyMember:
+    """One device's membership in an HSRP group."""
+    __slots__ = ("device", "interface", "group", "vip", "priority", "preempt", "tracked")
+
+    def __init__(self, device, interface, group):
+        self.device = device
+        self.interface = interface
+        self.group = group
+        self.vip = None
+        self.priority = None  # None when not configured (HSRP then uses 100)
+        self.preempt = False
+        self.tracked = False
+
+
+class GroupTopology:
+    """Devices, interfaces, subnets, adjacencies, DMVPN tunnels and HSRP groups of one group's configs.
+
+    Built once, on the first query, from the configs already parsed into the cache; tasks running on other
+    threads share the same graph. Devices whose config fails to load are left out (the tasks report them).
+    """
+
+    def __init__(self, device_files, config_cache):
+        self.device_files = device_files
+        self.config_cache = config_cache
+        self.lock = threading.Lock()
+        self.built = False
+        self.interfaces = {}  # (device, interface) -> InterfaceNode
+        self.subnets = {}  # (network, prefix) -> [InterfaceNode, ...]
+        self.adjacencies = {}  # device -> {neighbour device: [(network, prefix), ...]}
+        self.tunnels = {}  # (device, interface) -> TunnelNode
+        self.standby = {}  # HSRP group -> {device: StandbyMember}
+        self.findings = {}  # Area -> consistency findings, evaluated once
+
+    def build(self):
+        with self.lock:
+            if self.built:
+                return self
+            for device, filepath in self.device_files.items():
+                try:
+                    config = self.config_cache.load(filepath)
+                except Exception:
+                    continue
+                self.add_device(device, config)
+            self.link()
+            self.findings = {"mpls": self.check_mpls(), "dmvpn": self.check_dmvpn(), "hsrp": self.check_hsrp()}
+            self.built = True
+        return self
+
+    def add_device(self, device, config):
+        addresses = config.addresses
+        for name, line in config.interfaces.items():
+            interface = InterfaceNode(device, name, line, addresses.get(name, ()))
+            self.interfaces[(device, name)] = interface
+            for entry in interface.addresses:
+                self.subnets.setdefault((entry.network, entry.prefix), []).append(interface)
+            if name.startswith("Tunnel"):
+                self.tunnels[(device, name)] = TunnelNode(interface)
+            for child in interface.children:
+                match = STANDBY_LINE.match(child)
+                if not match:
+                    continue
+                group = int(match.group(1))
+                member = self.standby.setdefault(group, {}).setdefault(device, StandbyMember(device, name, group))
+                keyword, value = match.group(2), match.group(3)
+                if keyword == "ip" and value:
+                    member.vip = parse_address(value)
+                elif keyword == "priority" and value and value.isdigit():
+                    member.priority = int(value)
+                elif keyword == "preempt":
+                    member.preempt = True
+                elif keyword == "track":
+                    member.tracked = True
+
+    def link(self):
+        """Devices sharing a subnet are adjacent (tunnel subnets included)."""
+        for subnet, members in self.subnets.items():
+            devices = {interface.device for interface in members}
+            for device in devices:
+                neighbours = self.adjacencies.setdefault(device, {})
+                for other in devices - {device}:
+                    neighbours.setdefault(other, []).append(subnet)
+
+    # Queries
+
+    def interface(self, device, name):
+        return self.build().interfaces.get((device, name))
+
+    def links(self, first, second):
+        """Subnets shared by two devices."""
+        return self.build().adjacencies.get(first, {}).get(second, [])
+
+    def tunnel(self, device, name="Tunnel1"):
+        return self.build().tunnels.get((device, name))
+
+    def nbma_address(self, tunnel):
+        """The public address a tunnel is sourced from (tunnel source by interface name or by address)."""
+        if tunnel.source is None:
+            return None
+        source = self.interfaces.get((tunnel.device, tunnel.source))
+        return source.address if source is not None else parse_address(tunnel.source)
+
+    def standby_member(self, device, group):
+        """device's StandbyMember for an HSRP group, or None."""
+        return self.build().standby.get(group, {}).get(device)
+
+    def active_router(self, group):
+        """The device that wins the HSRP election for group (highest priority, then highest address)."""
+        members = self.build().standby.get(group, {})
+        if not members:
+            return None
+
+        def rank(member):
+            interface = self.interfaces.get((member.device, member.interface))
+            return (member.priority if member.priority is not None else 100, interface.address or 0)
+        return max(members.values(), key=rank).device
+
+    # Cross-device consistency, evaluated once in build()
+
+    def check_mpls(self):
+        findings = []
+        for (network, prefix), members in self.subnets.items():
+            enabled = [interface for interface in members if interface.mpls]
+            if enabled and len(enabled) < len(members):
+                missing = ", ".join(f"{interface.device} {interface.name}" for interface in members
+                                    if not interface.mpls)
+                findings.append(f"MPLS link {format_address(network)}/{prefix} is not enabled on {missing}")
+        return findings
+
+    def check_dmvpn(self):
+        findings = []
+        tunnel_owner = {tunnel.address: tunnel for tunnel in self.tunnels.values() if tunnel.address is not None}
+        for tunnel in self.tunnels.values():
+            for nhs in tunnel.nhs:
+                hub = tunnel_owner.get(nhs)
+                if hub is None:
+                    findings.append(f"{tunnel.device} NHS {format_address(nhs)} is not any device's tunnel address")
+                    continue
+                nbma = tunnel.maps.get(nhs)
+                if nbma is not None and nbma != self.nbma_address(hub):
+                    findings.append(f"{tunnel.device} maps {format_address(nhs)} to {format_address(nbma)}, "
+                                    f"but {hub.device} sources its tunnel from {self.describe(self.nbma_address(hub))}")
+                if self.nbma_address(hub) is not None and self.nbma_address(hub) not in tunnel.multicast:
+                    findings.append(f"{tunnel.device} does not send multicast to hub {hub.device}")
+        network_ids = {tunnel.network_id for tunnel in self.tunnels.values() if tunnel.network_id is not None}
+        if len(network_ids) > 1:
+            findings.append(f"Tunnels use different NHRP network-ids: {', '.join(sorted(network_ids))}")
+        return findings
+
+    def check_hsrp(self):
+        findings = []
+        for group, members in sorted(self.standby.items()):
+            vips = {member.vip for member in members.values() if member.vip is not None}
+            if len(vips) > 1:
+                listed = ", ".join(f"{member.device} {self.describe(member.vip)}" for member in members.values())
+                findings.append(f"HSRP group {group} members disagree on the virtual IP ({listed})")
+            if len(members) == 1:
+                device = next(iter(members))
+                findings.append(f"HSRP group {group} is only configured on {device}")
+        return findings
+
+    def describe(self, address):
+        return format_address(address) if address is not None else "nothing"
+
+    def report(self, area):
+        """Prints the cross-device findings for one area (mpls, dmvpn or hsrp)."""
+        for finding in self.build().findings.get(area, []):
+            print(f"[INFO] Topology: {finding}")
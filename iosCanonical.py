@@ -0,0 +1,172 @@
+import re
+
+# Command keyword paths the case study uses, plus common neighbours so their prefixes stay ambiguous like on IOS.
+# Each entry is one path through the command tree; shared leading keywords are merged.
+COMMAND_PATHS = [
+    "interface range", "hostname", "description", "shutdown", "no", "exit", "end", "name", "default",
+    "switchport mode trunk", "switchport mode access", "switchport mode dynamic desirable",
+    "switchport mode dynamic auto", "switchport nonegotiate", "switchport access vlan", "switchport voice vlan",
+    "switchport trunk allowed vlan add", "switchport trunk allowed vlan remove", "switchport trunk native vlan",
+    "switchport trunk encapsulation dot1q", "switchport port-security",
+    "channel-group mode active", "channel-group mode passive", "channel-group mode on", "channel-group mode desirable",
+    "channel-group mode auto", "channel-protocol lacp",
+    "spanning-tree mode rapid-pvst", "spanning-tree mode pvst", "spanning-tree mode mst",
+    "spanning-tree vlan priority", "spanning-tree vlan root primary", "spanning-tree vlan root secondary",
+    "spanning-tree portfast default", "spanning-tree portfast trunk", "spanning-tree bpduguard enable",
+    "spanning-tree bpdufilter enable", "spanning-tree guard root", "spanning-tree guard loop", "spanning-tree cost",
+    "spanning-tree port-priority", "spanning-tree link-type point-to-point",
+    "standby version", "standby ip", "standby priority", "standby preempt", "standby track decrement",
+    "standby timers", "standby authentication",
+    "ip address dhcp", "ip address secondary", "ip route", "ip default-gateway", "ip domain-name", "ip domain-lookup",
+    "ip routing", "ip helper-address", "ip nat inside", "ip nat outside", "ip ssh version",
+    "ip nhrp authentication", "ip nhrp map multicast dynamic", "ip nhrp map multicast", "ip nhrp network-id",
+    "ip nhrp nhs", "ip nhrp redirect", "ip nhrp shortcut", "ip mtu", "ip tcp adjust-mss",
+    "ipv6 address", "ipv6 unicast-routing",
+    "encapsulation dot1Q", "bandwidth", "delay", "duplex", "speed", "mtu", "vlan",
+    "mpls ip", "mpls label protocol ldp", "mpls ldp router-id", "mpls ldp autoconfig",
+    "vrf definition", "vrf forwarding", "rd", "route-target",
+    "address-family ipv4 unicast autonomous-system", "address-family ipv4 unicast", "address-family ipv6",
+    "exit-address-family", "af-interface default", "af-interface", "exit-af-interface", "topology base",
+    "exit-af-topology", "network", "eigrp router-id", "passive-interface", "summary-address",
+    "router eigrp", "router ospf", "router bgp",
+    "tunnel source", "tunnel destination", "tunnel mode gre multipoint", "tunnel mode gre ip",
+    "tunnel key", "tunnel protection ipsec profile",
+    "crypto isakmp policy", "crypto isakmp key", "crypto ipsec transform-set", "crypto ipsec profile",
+    "crypto key generate rsa", "encryption", "hash", "authentication pre-share", "group", "lifetime",
+    "mode transport", "mode tunnel", "set transform-set", "set pfs",
+    "ntp server", "ntp master", "ntp source", "clock timezone", "clock summer-time",
+    "line console", "line vty", "login local", "login", "password", "transport input ssh", "transport input all",
+    "enable secret", "enable password", "username", "service password-encryption", "banner motd",
+    "logging synchronous", "exec-timeout", "cdp run", "lldp run", "track interface line-protocol"
+]
+
+# Canonical interface type names; any unambiguous prefix of two or more letters expands to one of these
+INTERFACE_TYPES = [
+    "GigabitEthernet", "FastEthernet", "TenGigabitEthernet", "TwentyFiveGigE", "FortyGigabitEthernet",
+    "HundredGigE", "Ethernet", "Serial", "Port-channel", "Vlan", "Loopback", "Tunnel", "Null", "Dialer", "Virtual-Template"
+]
+
+# Everything after these keywords is free text and is never rewritten
+FREE_TEXT_KEYWORDS = {"description", "hostname", "name", "banner", "password", "secret", "key", "remark", "username"}
+
+# Keywords whose next token is an interface that may be written with a space ("interface gi 1/0/1")
+INTERFACE_ARGUMENT_KEYWORDS = {"interface", "range", "source", "router-id", "af-interface", "passive-interface"}
+
+ARGUMENT = re.compile(r"^[\d.,/:-]+$")  # Numbers, lists, ranges and addresses: keep walking the same command
+INTERFACE_TOKEN = re.compile(r"^(,?)([A-Za-z][A-Za-z-]*?)-?(\d[\d/.:-]*)(,?)$")
+
+
+def prefix_table(words, minimum=2):
+    """Maps every unambiguous prefix (and the full spelling) of words to its canonical word, case-insensitively."""
+    table = {}
+    counts = {}
+    for word in words:
+        for length in range(minimum, len(word) + 1):
+            prefix = word[:length].lower()
+            counts[prefix] = counts.get(prefix, 0) + 1
+            table[prefix] = word
+    for word in words:
+        table[word.lower()] = word  # A full keyword always wins over being another keyword's prefix
+    return {prefix: word for prefix, word in table.items() if counts[prefix] == 1 or prefix == word.lower()}
+
+
+class CommandNode:
+    """One keyword position in the command tree with the prefix table for the keywords that may follow it."""
+    __slots__ = ("children", "prefixes")
+
+    def __init__(self):
+        self.children = {}
+        self.prefixes = {}
+
+
+class IOSCanonicalizer:
+    """Expands abbreviated IOS keywords and interface names so graders can keep using exact string checks."""
+
+    def __init__(self, command_paths=COMMAND_PATHS, interface_types=INTERFACE_TYPES, max_memo=200000):
+        self.root = CommandNode()
+        for path in command_paths:
+            node = self.root
+            for keyword in path.split():
+                node = node.children.setdefault(keyword, CommandNode())
+        self.build_prefixes(self.root)
+        self.interface_prefixes = prefix_table(interface_types)
+        self.max_memo = max_memo
+        self.lines = {}  # raw line -> canonical line
+        self.interfaces = {}  # raw token -> canonical interface name, or None
+
+    def build_prefixes(self, node):
+        node.prefixes = prefix_table(list(node.children))
+        for child in node.children.values():
+            self.build_prefixes(child)
+
+    def interface_name(self, token):
+        """Returns the canonical spelling of an interface token like gi1/0/1, or None if it isn't one."""
+        if token in self.interfaces:
+            return self.interfaces[token]
+        canonical = None
+        match = INTERFACE_TOKEN.match(token)
+        if match:
+            interface_type = self.interface_prefixes.get(match.group(2).lower())
+            if interface_type:
+                canonical = match.group(1) + interface_type + match.group(3) + match.group(4)
+        if len(self.interfaces) >= self.max_memo:
+            self.interfaces.clear()
+        self.interfaces[token] = canonical
+        return canonical
+
+    def canonicalize(self, line):
+        """Returns line with keywords and interface names spelled out in full; memoized per distinct line."""
+        canonical = self.lines.get(line)
+        if canonical is not None:
+            return canonical
+
+        stripped = line.lstrip()
+        indent = line[:len(line) - len(stripped)]
+        tokens = stripped.split()
+        output = []
+        node = self.root
+        free_text = False
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            index += 1
+            if free_text:
+                output.append(token)
+                continue
+
+            keyword = node.prefixes.get(token.lower()) if node is not None else None
+            if keyword is not None:
+                output.append(keyword)
+                # "no" and "default" negate or reset any command, so start over from the top of the tree
+                node = self.root if keyword in ("no", "default") and node is self.root else node.children[keyword]
+                free_text = keyword in FREE_TEXT_KEYWORDS
+                if keyword in INTERFACE_ARGUMENT_KEYWORDS:
+                    index = self.merge_interface(tokens, index, output)
+                continue
+
+            interface = self.interface_name(token)
+            if interface is not None:
+                output.append(interface)
+            else:
+                output.append(token)
+            if not ARGUMENT.match(token):
+                node = None  # A free-form argument ends keyword expansion; interface names still get fixed
+
+        canonical = indent + " ".join(output)
+        if len(self.lines) >= self.max_memo:
+            self.lines.clear()
+        self.lines[line] = canonical
+        return canonical
+
+    def merge_interface(self, tokens, index, output):
+        """Joins a spaced interface argument ("gi 1/0/1") into one canonical token; returns the next index."""
+        if index + 1 < len(tokens) and tokens[index].isalpha() and ARGUMENT.match(tokens[index + 1]):
+            interface = self.interface_name(tokens[index] + tokens[index + 1])
+            if interface is not None:
+                output.append(interface)
+                return index + 2
+        return index
+
+
+# One shared instance so the memo tables are reused by every config in the process
+default_canonicalizer = IOSCanonicalizer()
@@ -0,0 +1,239 @@
+import io
+import os
+import re
+import csv
+import argparse
+import contextlib
+from functools import lru_cache
+
+ADDRESS_LINE = re.compile(r"^\s*ip address (\d+\.\d+\.\d+\.\d+)(?:/(\d+)|\s+(\d+\.\d+\.\d+\.\d+))(\s+secondary)?\s*$")
+FULL_MASK = 0xFFFFFFFF
+
+
+def parse_address(text):
+    """Dotted quad -> 32-bit integer, or None if it is not one."""
+    parts = text.split(".")
+    if len(parts) != 4:
+        return None
+    value = 0
+    for part in parts:
+        if not part.isdigit() or int(part) > 255:
+            return None
+        value = (value << 8) | int(part)
+    return value
+
+
+def format_address(value):
+    return ".".join(str((value >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+
+
+def netmask(prefix):
+    """Prefix length -> mask as an integer (0 for /0)."""
+    return (FULL_MASK << (32 - prefix)) & FULL_MASK
+
+
+def prefix_from_mask(text):
+    """Dotted-quad mask -> prefix length, or None if it isn't a contiguous mask."""
+    mask = parse_address(text)
+    if mask is None:
+        return None
+    prefix = 32 - ((~mask & FULL_MASK).bit_length())
+    return prefix if netmask(prefix) == mask else None
+
+
+def format_mask(prefix):
+    return format_address(netmask(prefix))
+
+
+@lru_cache(maxsize=None)
+def parse_cidr(cidr):
+    """'a.b.c.d/len' -> (address, prefix) as integers; only parsed once per distinct string."""
+    address, prefix = cidr.split("/")
+    return parse_address(address), int(prefix)
+
+
+def same_subnet(address, network, prefix):
+    """True if address falls inside network/prefix."""
+    mask = netmask(prefix)
+    return address & mask == network & mask
+
+
+class InterfaceAddress:
+    """One 'ip address' line of an interface as integers: address, prefix length and whether it is secondary."""
+    __slots__ = ("address", "prefix", "secondary")
+
+    def __init__(self, address, prefix, secondary=False):
+        self.address = address
+        self.prefix = prefix
+        self.secondary = secondary
+
+    @property
+    def network(self):
+        return self.address & netmask(self.prefix)
+
+    def matches(self, address, prefix):
+        return self.address == address and self.prefix == prefix
+
+    def in_subnet(self, network, prefix):
+        return same_subnet(self.address, network, prefix)
+
+    def __repr__(self):
+        kind = " secondary" if self.secondary else ""
+        return f"<InterfaceAddress {format_address(self.address)}/{self.prefix}{kind}>"
+
+
+def parse_address_line(text):
+    """An 'ip address' line in either mask notation -> InterfaceAddress, or None (dhcp, negotiated, bad mask)."""
+    match = ADDRESS_LINE.match(text)
+    if not match:
+        return None
+    address = parse_address(match.group(1))
+    prefix = int(match.group(2)) if match.group(2) else prefix_from_mask(match.group(3))
+    if address is None or prefix is None or prefix > 32:
+        return None
+    return InterfaceAddress(address, prefix, bool(match.group(4)))
+
+
+def interface_addresses(interfaces):
+    """{interface name: interface line} -> {interface name: (InterfaceAddress, ...)} for interfaces with any."""
+    addresses = {}
+    for name, line in interfaces.items():
+        entries = tuple(entry for entry in map(parse_address_line, (child.text for child in line.children)) if entry)
+        if entries:
+            addresses[name] = entries
+    return addresses
+
+
+class AddressingAudit:
+    """Collects every interface address of a cohort of groups and checks them all in one batch.
+
+    Finds addresses used twice within a group, subnets that partly overlap another subnet of the same group,
+    and addresses outside the subnet the group's spec expects for that interface.
+    """
+
+    def __init__(self):
+        # (group, device, interface, InterfaceAddress) for every address of every group
+        self.records = []
+        self.expected = {}  # (group, device, interface) -> (network, prefix) from the group's spec
+
+    def add_group(self, group, configs, spec):
+        """configs maps device -> ConfigIndex for one group; spec is that group's GroupSpec."""
+        for device, config in configs.items():
+            for interface, entries in config.addresses.items():
+                for entry in entries:
+                    self.records.append((group, device, interface, entry))
+        for device, table in spec.interface_addresses.items():
+            for interface, cidr in table.items():
+                self.expected[(group, device, interface)] = parse_cidr(cidr)
+        for device in ("TOR-D1", "TOR-D2", "TOR-A1", "TOR-A2"):
+            for interface, cidr in spec.svi_subnets.items():
+                self.expected[(group, device, interface)] = parse_cidr(cidr)
+
+    def duplicates(self):
+        """Addresses configured on more than one interface of the same group."""
+        findings = []
+        ordered = sorted(self.records, key=lambda record: (record[0], record[3].address))
+        start = 0
+        for index in range(1, len(ordered) + 1):
+            if index < len(ordered) and ordered[index][0] == ordered[start][0] \
+                    and ordered[index][3].address == ordered[start][3].address:
+                continue
+            if index - start > 1:
+                group, _, _, entry = ordered[start]
+                places = ", ".join(f"{device} {interface}" for _, device, interface, _ in ordered[start:index])
+                findings.append((group, "duplicate", f"{format_address(entry.address)} is on {places}"))
+            start = index
+        return findings
+
+    def overlaps(self):
+        """Subnets of one group that overlap without being the same subnet (or the same subnet twice on a device)."""
+        findings = []
+        subnets = {}  # (group, network, prefix) -> [(device, interface), ...]
+        for group, device, interface, entry in self.records:
+            subnets.setdefault((group, entry.network, entry.prefix), []).append((device, interface))
+
+        for (group, network, prefix), places in subnets.items():
+            devices = [device for device, _ in places]
+            for device in sorted(set(devices)):
+                if devices.count(device) > 1:
+                    interfaces = ", ".join(interface for other, interface in places if other == device)
+                    findings.append((group, "overlap",
+                                     f"{device} has {format_address(network)}/{prefix} on {interfaces}"))
+
+        # Sweep each group's subnets in address order; a subnet overlaps any open one that hasn't ended yet
+        ordered = sorted(subnets, key=lambda key: (key[0], key[1], key[2]))
+        open_subnets = []
+        current_group = None
+        for group, network, prefix in ordered:
+            if group != current_group:
+                open_subnets, current_group = [], group
+            end = network + (1 << (32 - prefix))
+            open_subnets = [item for item in open_subnets if item[0] > network]
+            for _, other_network, other_prefix in open_subnets:
+                first = ", ".join(f"{device} {interface}" for device, interface in
+                                  subnets[(group, other_network, other_prefix)])
+                second = ", ".join(f"{device} {interface}" for device, interface in subnets[(group, network, prefix)])
+                findings.append((group, "overlap", f"{format_address(other_network)}/{other_prefix} ({first}) "
+                                                   f"overlaps {format_address(network)}/{prefix} ({second})"))
+            open_subnets.append((end, network, prefix))
+        return findings
+
+    def wrong_subnets(self):
+        """Addresses outside the subnet (or with a different prefix) than the spec expects on that interface."""
+        findings = []
+        for group, device, interface, entry in self.records:
+            expected = self.expected.get((group, device, interface))
+            if expected is None or entry.secondary:
+                continue
+            network, prefix = expected
+            if entry.prefix != prefix or not entry.in_subnet(network, prefix):
+                findings.append((group, "wrong subnet",
+                                 f"{device} {interface} has {format_address(entry.address)}/{entry.prefix}, "
+                                 f"expected an address in {format_address(network & netmask(prefix))}/{prefix}"))
+        return findings
+
+    def run(self):
+        """Every finding as (group, kind, detail), sorted by group."""
+        return sorted(self.duplicates() + self.overlaps() + self.wrong_subnets(), key=lambda finding: finding[0])
+
+
+def main():
+    from main import CaseStudyGrader  # main.py imports this module
+    from groupSpec import group_spec
+
+    parser = argparse.ArgumentParser(description="Check every group's interface addressing for duplicates, "
+                                                 "overlapping subnets and addresses in the wrong subnet.")
+    parser.add_argument("submissions_dir", help="Folder containing one sub-folder per group")
+    parser.add_argument("--output", default="addressing_report.csv", help="CSV report to write")
+    args = parser.parse_args()
+
+    grader = CaseStudyGrader()
+    audit = AddressingAudit()
+    for group in sorted(os.listdir(args.submissions_dir)):
+        group_path = os.path.join(args.submissions_dir, group)
+        digits = "".join(filter(str.isdigit, group))
+        if not os.path.isdir(group_path) or not digits:
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            device_files = grader.map_files_to_devices(group_path)
+        configs = {}
+        for device, filepath in device_files.items():
+            try:
+                configs[device] = grader.config_cache.load(filepath)
+            except Exception as e:
+                print(f"[ERROR] Failed to load {filepath}: {e}")
+        audit.add_group(group, configs, group_spec(int(digits)))
+        grader.config_cache.release_group(group_path)
+
+    findings = audit.run()
+    for group, kind, detail in findings:
+        print(f"[WARNING] {group}: {kind}: {detail}")
+    with open(args.output, 'w', newline='') as csvfile:
+        csv_writer = csv.writer(csvfile)
+        csv_writer.writerow(["Group Name", "Finding", "Detail"])
+        csv_writer.writerows(findings)
+    print(f"[INFO] {len(audit.records)} addresses checked, {len(findings)} findings written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,36 +3,45 @@ import re
 import tkinter as tk
 from tkinter import filedialog
 import csv
-import subprocess
-from ciscoconfparse import CiscoConfParse
-from ipaddress import ip_address, ip_network
-
-
-def cidr_to_decimal(cidr):
-        """Converts CIDR notation to decimal subnet mask."""
-        mapping = {
-            '32': '255.255.255.255',
-            '31': '255.255.255.254',
-            '30': '255.255.255.252',
-            '29': '255.255.255.248',
-            '28': '255.255.255.240',
-            '27': '255.255.255.224',
-            '26': '255.255.255.192',
-            '25': '255.255.255.128',
-            '24': '255.255.255.0'
-        }
-        if '/' in cidr:
-            ip, mask = cidr.split('/')
-            return ip, mapping.get(mask, mask)
-        return cidr, None
+import queue
+import threading
+from configIndex import ConfigCache
+from configFilter import SectionFilter, uses_sections, declared_sections
+from configReader import find_hostname
+from answerKey import AnswerKey
+from checkOutcomes import TaskGrade, OutcomeStore
+from groupIsolation import IsolatedGroupRunner
+from groupSpec import group_spec
+from taskGraph import GroupScheduler, uses_devices
+from groupTopology import GroupTopology
+from canvasFetch import CanvasAPI, API_TOKEN, BASE_URL, select_course, select_assignment
+from canvasStore import CanvasStore
+from ipAddressing import parse_address, parse_cidr, format_address, format_mask
 
 
 class CaseStudyGrader:
     def __init__(self):
         self.submissions_dir = None
         self.answer_key_dir = None
+        self.answer_key = None  # Set by load_answer_key(); grades by comparison instead of grade_task_*
+        self.total_points = 139
         self.groups = []
         self.output_csv = "grading_results.csv"
+        self.outcome_store = OutcomeStore("check_outcomes.db")  # Per-check outcomes for checkOutcomes.py rescore
+        self.canvas_store_path = "canvas_metadata.db"  # Canvas metadata shared with canvasFetch.py and gradeUpload.py
+        self.canvas_api = None  # Created on first use by get_canvas_api()
+        self.canvas_target = None  # (course_id, assignment_id) the submissions were downloaded for
+        self.submission_manifest = None  # (group, group_path) for every group downloaded in this run
+        # Hard cap on parsed configs kept in memory; only the sections the grade_task_* methods read are parsed
+        self.config_cache = ConfigCache(max_resident=16, section_filter=SectionFilter(declared_sections(self)))
+        self.pipeline_source = None  # Yields (group, group_path) as downloads finish in pipeline mode
+        self.pipeline_queue_size = 4  # Downloaded groups allowed to wait for the grader before fetching pauses
+        self.group_time_limit = 120.0  # Seconds a group may take in its worker process; None grades in-process
+        self.group_memory_limit_mb = 2048  # Address-space cap for the worker process (POSIX only)
+        self.group_runner = None  # Started on the first isolated group
+        self.incomplete_groups = []  # (group, reason) for groups that went over their budget
+        self.task_workers = 8  # Threads that parse a group's devices and run its tasks; None runs them in order
+        self.scheduler = None  # Started on the first group graded with task_workers
         self.device_keywords = {
             "Toronto": ["toronto"],
             "ISP": ["isp"],
@@ -47,13 +56,17 @@ class CaseStudyGrader:
     def run(self):
         """Main execution flow."""
         self.check_submissions()
+        self.check_answer_key()
         self.initialize_csv()
-        self.grade_submissions()
+        if self.pipeline_source is not None:
+            self.grade_pipeline()
+        else:
+            self.grade_submissions()
 
     def check_submissions(self):
-        """Checks if submissions are already downloaded or calls canvasFetch.py to download them."""
+        """Checks if submissions are already downloaded or downloads them from Canvas in this process."""
         print("Do you already have the submissions downloaded?")
-        answer = input("Enter 'y' for yes or 'n' for no: ").strip().lower()
+        answer = input("Enter 'y' for yes, 'n' for no, or 'p' to download and grade at the same time: ").strip().lower()
 
         if answer == 'y':
             print("Select the directory containing submission folders...")
@@ -65,21 +78,75 @@ class CaseStudyGrader:
                 exit()
             print(f"[INFO] Selected submissions directory: {self.submissions_dir}")
         elif answer == 'n':
-            print("[INFO] Running canvasFetch.py to download submissions...")
-            subprocess.run(['python', 'canvasFetch.py'], check=True)
-            print("[INFO] Submissions downloaded successfully.")
-            print("Select the directory containing submission folders...")
-            root = tk.Tk()
-            root.withdraw()
-            self.submissions_dir = filedialog.askdirectory()
-            if not self.submissions_dir:
-                print("[ERROR] No directory selected. Exiting.")
-                exit()
-            print(f"[INFO] Selected submissions directory: {self.submissions_dir}")
+            course_id, assignment_id = self.select_canvas_target()
+            self.get_canvas_api().write_groups_to_csv(course_id)  # Same roster CSV canvasFetch.py leaves behind
+            print("[INFO] Downloading submissions...")
+            self.submission_manifest = list(
+                self.get_canvas_api().iter_group_downloads(course_id, assignment_id, self.submissions_dir))
+            print(f"[INFO] Downloaded {len(self.submission_manifest)} group submissions to {self.submissions_dir}")
+        elif answer == 'p':
+            print("[INFO] Pipeline mode: groups are graded as soon as their files finish downloading.")
+            course_id, assignment_id = self.select_canvas_target()
+            self.pipeline_source = self.get_canvas_api().iter_group_downloads(course_id, assignment_id,
+                                                                              self.submissions_dir)
         else:
             print("[ERROR] Invalid input. Exiting.")
             exit()
 
+    def get_canvas_api(self):
+        """The CanvasAPI every stage of the run shares: one HTTP session, roster cache and metadata store."""
+        if self.canvas_api is None:
+            self.canvas_api = CanvasAPI(API_TOKEN, BASE_URL, store=CanvasStore(self.canvas_store_path))
+        return self.canvas_api
+
+    def select_canvas_target(self):
+        """Asks for the course, assignment and download folder; returns (course_id, assignment_id)."""
+        canvas_api = self.get_canvas_api()
+        selected_course = select_course(canvas_api)
+        if not selected_course:
+            print("[ERROR] No course selected. Exiting.")
+            exit()
+        course_id = selected_course[0]
+        assignment_id = select_assignment(canvas_api, course_id)
+        print("Select a destination folder to save submissions...")
+        root = tk.Tk()
+        root.withdraw()
+        self.submissions_dir = filedialog.askdirectory()
+        if not self.submissions_dir:
+            print("[ERROR] No directory selected. Exiting.")
+            exit()
+        self.canvas_target = (course_id, assignment_id)
+        return course_id, assignment_id
+
+    def check_answer_key(self):
+        """Asks whether to grade by comparison against an answer key folder instead of the built-in checks."""
+        answer = input("Grade against an answer key folder instead of the built-in checks? (y/n): ").strip().lower()
+        if answer != 'y':
+            return
+        print("Select the directory containing the answer key configs...")
+        root = tk.Tk()
+        root.withdraw()
+        answer_key_dir = filedialog.askdirectory()
+        if not answer_key_dir:
+            print("[ERROR] No directory selected. Exiting.")
+            exit()
+        key_group_number = input("Enter the group number the answer key was written for: ").strip()
+        if not key_group_number.isdigit():
+            print(f"[ERROR] '{key_group_number}' is not a group number. Exiting.")
+            exit()
+        self.load_answer_key(answer_key_dir, int(key_group_number))
+
+    def load_answer_key(self, answer_key_dir, key_group_number):
+        """Loads an answer key so every group is graded by set difference against it."""
+        device_files = self.map_files_to_devices(answer_key_dir)
+        if not device_files:
+            print(f"[ERROR] Could not map the answer key files in {answer_key_dir} to devices. Exiting.")
+            exit()
+        self.answer_key_dir = answer_key_dir
+        self.answer_key = AnswerKey(answer_key_dir, key_group_number, device_files)
+        self.total_points = self.answer_key.total_points()
+        print(f"[INFO] Grading against the answer key in {answer_key_dir} ({self.total_points} points).")
+
     def initialize_csv(self):
         """Initializes the output CSV file."""
         with open(self.output_csv, 'w', newline='') as csvfile:
@@ -91,8 +158,15 @@ class CaseStudyGrader:
         """Grades submissions for each group."""
         print("[INFO] Grading submissions...")
         
-        # Find all groups in the submission directory
-        self.groups = [group for group in os.listdir(self.submissions_dir) if os.path.isdir(os.path.join(self.submissions_dir, group))]
+        # Find all groups in the submission directory (only the ones just downloaded, if we fetched them)
+        if self.submission_manifest is not None:
+            self.groups = [group for group, _ in self.submission_manifest]
+        else:
+            self.groups = [group for group in os.listdir(self.submissions_dir) if os.path.isdir(os.path.join(self.submissions_dir, group))]
+        for group in [group for group in self.groups if not any(character.isdigit() for character in group)]:
+            # extract_group_number would exit() on it and end the run (or kill the isolated worker)
+            print(f"[WARNING] Skipping {group}: no group number in the folder name.")
+            self.groups.remove(group)
         if not self.groups:
             print("[ERROR] No groups found. Exiting.")
             return
@@ -100,72 +174,14 @@ class CaseStudyGrader:
         # Iterate through each group for grading
         for i, group in enumerate(self.groups):
             print(f"[INFO] Grading submissions for {group}...")
-            group_number = self.extract_group_number(group)  # Extract group number
-            device_files = self.map_files_to_devices(os.path.join(self.submissions_dir, group))  # Map files to devices
+            results = self.grade_group_isolated(group, os.path.join(self.submissions_dir, group))
 
             # Handle insufficient files
-            if not device_files:
+            if results is None:
                 print(f"[WARNING] Skipping {group} due to insufficient files.")
                 continue
 
-            # Log detected files
-            print(f"[INFO] Detected files for group {group}:")
-            for device, filepath in device_files.items():
-                print(f"    {device}: {filepath}")
-
-            # Grade Task 1
-            print(f"[INFO] Starting grading for Task 1...")
-            task_1_results = self.grade_task_1(device_files, group_number)
-            self.write_to_csv(group, "Task 1", task_1_results["grade"], task_1_results["comments"])
-
-            # Grade Task 2
-            print(f"[INFO] Starting grading for Task 2...")
-            task_2_results = self.grade_task_2(device_files, group_number)
-            self.write_to_csv(group, "Task 2", task_2_results["grade"], task_2_results["comments"])
-
-            # Grade Task 3
-            print(f"[INFO] Starting grading for Task 3...")
-            task_3_results = self.grade_task_3(device_files, group_number)
-            self.write_to_csv(group, "Task 3", task_3_results["grade"], task_3_results["comments"])
-
-            # Grade Task 4
-            print(f"[INFO] Starting grading for Task 4...")
-            task_4_results = self.grade_task_4(device_files, group_number)
-            self.write_to_csv(group, "Task 4", task_4_results["grade"], task_4_results["comments"])
-
-            # Grade Task 5
-            print(f"[INFO] Starting grading for Task 5...")
-            task_5_results = self.grade_task_5(device_files, group_number)
-            self.write_to_csv(group, "Task 5", task_5_results["grade"], task_5_results["comments"])
-
-            # Grade Task 6
-            print(f"[INFO] Starting grading for Task 6...")
-            task_6_results = self.grade_task_6(device_files, group_number)
-            self.write_to_csv(group, "Task 6", task_6_results["grade"], task_6_results["comments"])
-
-            # Grade Task 7
-            print(f"[INFO] Starting grading for Task 7...")
-            task_7_results = self.grade_task_7(device_files, group_number)
-            self.write_to_csv(group, "Task 7", task_7_results["grade"], task_7_results["comments"])
-
-            # Grade Task 8
-            print(f"[INFO] Starting grading for Task 8...")
-            task_8_results = self.grade_task_8(device_files)
-            self.write_to_csv(group, "Task 8", task_8_results["grade"], task_8_results["comments"])
-
-            # Calculate total grade
-            total_grade = sum([
-                task_1_results["grade"],
-                task_2_results["grade"],
-                task_3_results["grade"],
-                task_4_results["grade"],
-                task_5_results["grade"],
-                task_6_results["grade"],
-                task_7_results["grade"],
-                task_8_results["grade"]
-            ])
-            print(f"[GRADE] Total grade for {group}: {total_grade}/139")
-            print(f"[GRADE] Percentage grade for {group}: {total_grade / 139 * 100:.2f}%")
+            self.record_group_results(group, os.path.join(self.submissions_dir, group), results)
 
             # Ask if the user wants to continue to the next group
             if i < len(self.groups) - 1:
@@ -175,6 +191,126 @@ class CaseStudyGrader:
                     print("[INFO] Grading process terminated by user.")
                     break
 
+        self.finish_grading()
+
+    def grade_pipeline(self):
+        """Grades groups while later groups are still downloading, through a bounded queue."""
+        print("[INFO] Grading submissions as they download...")
+        downloaded = queue.Queue(maxsize=self.pipeline_queue_size)
+
+        def fetch():
+            try:
+                for group, group_path in self.pipeline_source:
+                    downloaded.put((group, group_path))  # Blocks while the grader is behind
+            except Exception as e:
+                print(f"[ERROR] Download failed - {e}")
+            finally:
+                downloaded.put(None)
+
+        fetcher = threading.Thread(target=fetch, daemon=True)
+        fetcher.start()
+
+        while True:
+            item = downloaded.get()
+            if item is None:
+                break
+            group, group_path = item
+            print(f"[INFO] Grading submissions for {group}...")
+            results = self.grade_group_isolated(group, group_path)
+            if results is None:
+                print(f"[WARNING] Skipping {group} due to insufficient files.")
+                continue
+            self.record_group_results(group, group_path, results)
+
+        fetcher.join()
+        self.finish_grading()
+
+    def record_group_results(self, group, group_path, results):
+        """Writes a group's task rows, prints its total and releases its parsed configs."""
+        for task_name, task_results in results.items():
+            self.write_to_csv(group, task_name, task_results["grade"], task_results["comments"])
+        self.outcome_store.record_group(group, results)
+        self.config_cache.release_group(group_path)
+
+        # Calculate total grade
+        total_grade = sum(task_results["grade"] for task_results in results.values())
+        print(f"[GRADE] Total grade for {group}: {total_grade}/{self.total_points}")
+        print(f"[GRADE] Percentage grade for {group}: {total_grade / self.total_points * 100:.2f}%")
+
+    def grade_group(self, group, group_path, group_number=None, on_task=None):
+        """Grades every task for a single group folder and returns the results in rubric order."""
+        if group_number is None:
+            group_number = self.extract_group_number(group)  # Extract group number
+        device_files = self.map_files_to_devices(group_path)  # Map files to devices
+        if not device_files:
+            return None
+
+        # Log detected files
+        print(f"[INFO] Detected files for group {group}:")
+        for device, filepath in device_files.items():
+            print(f"    {device}: {filepath}")
+
+        if self.answer_key is not None:
+            print(f"[INFO] Comparing against the answer key for group {group_number}...")
+            return self.answer_key.grade(device_files, group_number)
+
+        spec = group_spec(group_number)  # Shared by every task and every group with this number
+        topology = GroupTopology(device_files, self.config_cache)  # Built once, by the first task that queries it
+        tasks = [
+            ("Task 1", self.grade_task_1, (device_files, spec)),
+            ("Task 2", self.grade_task_2, (device_files, spec)),
+            ("Task 3", self.grade_task_3, (device_files, spec)),
+            ("Task 4", self.grade_task_4, (device_files, spec, topology)),
+            ("Task 5", self.grade_task_5, (device_files, spec, topology)),
+            ("Task 6", self.grade_task_6, (device_files, spec, topology)),
+            ("Task 7", self.grade_task_7, (device_files, spec)),
+            ("Task 8", self.grade_task_8, (device_files,))
+        ]
+        if self.task_workers:
+            # Devices parse in parallel and each task starts once the devices it reads (@uses_devices) are ready
+            if self.scheduler is None:
+                self.scheduler = GroupScheduler(self.config_cache, self.task_workers)
+            return self.scheduler.run(device_files, tasks, on_task)
+
+        results = {}
+        for task_name, grade_task, args in tasks:
+            print(f"[INFO] Starting grading for {task_name}...")
+            results[task_name] = grade_task(*args)
+            if on_task is not None:
+                on_task(task_name, results[task_name])  # Lets an isolated worker hand back partial results
+        return results
+
+    def task_names(self):
+        """Task names in the order grade_group returns them."""
+        if self.answer_key is not None:
+            return list(dict.fromkeys(item["task"] for item in self.answer_key.rubric))
+        return [f"Task {number}" for number in range(1, 9)]
+
+    def grade_group_isolated(self, group, group_path):
+        """Grades a group in the worker process under the time and memory budget (in-process if there is none)."""
+        if self.group_time_limit is None:
+            return self.grade_group(group, group_path)
+        if self.group_runner is None:
+            answer_key = None
+            if self.answer_key is not None:
+                answer_key = (self.answer_key_dir, self.answer_key.key_group_number)
+            self.group_runner = IsolatedGroupRunner(answer_key, self.group_time_limit, self.group_memory_limit_mb)
+        results, problem = self.group_runner.grade(group, group_path, self.task_names())
+        if problem is not None:
+            print(f"[WARNING] {group} {problem}; recording the tasks that finished and marking the rest not graded.")
+            self.incomplete_groups.append((group, problem))
+        return results
+
+    def finish_grading(self):
+        """Stops the worker process and lists the groups that did not finish within their budget."""
+        if self.group_runner is not None:
+            self.group_runner.close()
+            self.group_runner = None
+        if self.canvas_api is not None:
+            self.canvas_api.close()  # Downloads are done; stop its download threads
+            self.canvas_api = None
+        for group, problem in self.incomplete_groups:
+            print(f"[WARNING] {group} {problem}; check its configs and regrade it by hand.")
         print("[INFO] Grading completed for all groups.")
 
     def extract_group_number(self, group_name):
@@ -241,150 +377,92 @@ class CaseStudyGrader:
     def extract_hostname(self, filepath):
         """Extracts hostname from a configuration file."""
         try:
-            with open(filepath, 'r') as file:
-                for line in file:
-                    match = re.match(r'^hostname (\S+)', line.strip(), re.IGNORECASE)
-                    if match:
-                        return match.group(1)  # Extract hostname directly
+            hostname = find_hostname(filepath)  # Searches the raw bytes, so big dumps are never decoded here
+            if hostname:
+                return hostname
             print(f"[WARNING] Hostname not found in: {filepath}")
             return None
         except Exception as e:
             print(f"[ERROR] Failed to open {filepath}: {e}")
             return None
 
-    def grade_task_1(self, device_files, group_number):
+    @uses_sections("interface")
+    @uses_devices("Toronto", "ISP", "Ottawa", "Oshawa", "TOR-A1", "TOR-A2", "TOR-D1", "TOR-D2")
+    def grade_task_1(self, device_files, spec):
         """
         Grades Task 1: Addressing.
         Validates IP addresses, interfaces, and VLANs using new rubric.
         """
-        comments = []
         grade = 3.5  # Start with full marks, deduct 0.5 per incorrect or missing configuration
-
-        # Dynamically adjust working configs for group number
-        expected_addresses = {
-            "ISP": {
-                "GigabitEthernet0/0/0": f"10.202.10.2/29",
-                "GigabitEthernet0/0/1": f"10.202.20.2/29",
-                "Loopback1": f"2.2.2.2/32"
-            },
-            "Toronto": {
-                "GigabitEthernet0/0/0": f"10.202.10.1/29",
-                "GigabitEthernet0/0/1.10": f"172.16.{group_number}.1/24",
-                "GigabitEthernet0/0/1.100": f"199.212.32.{group_number}/24",
-                "Loopback1": f"1.1.1.1/32",
-                "Tunnel1": f"10.1.{group_number}.1/24"
-            },
-            "Ottawa": {
-                "GigabitEthernet0/0/0": f"10.202.20.3/29",
-                "GigabitEthernet0/0/1": f"209.165.200.{group_number}/24",
-                "Loopback1": f"3.3.3.3/32",
-                "Loopback101": f"172.16.84.{group_number}/24",
-                "Loopback102": f"172.16.85.{group_number}/24",
-                "Loopback103": f"172.16.86.{group_number}/24",
-                "Tunnel1": f"10.1.{group_number}.2/24"
-            },
-            "Oshawa": {
-                "GigabitEthernet0/0/1": f"198.51.100.{group_number}/24",
-                "Loopback1": f"4.4.4.4/32",
-                "Loopback101": f"172.16.87.{group_number}/24",
-                "Loopback102": f"172.16.88.{group_number}/24",
-                "Loopback103": f"172.16.89.{group_number}/24",
-                "Tunnel1": f"10.1.{group_number}.3/24"
-            },
-            "TOR-D2": {
-                "Vlan100": f"199.212.32.254/24",
-                "Vlan300": f"209.165.200.254/24",
-                "Vlan400": f"198.51.100.254/24"
-            }
-        }
-
-        # SVIs for TOR-D1, TOR-A1 and TOR-A2 cz they be special
-        svi_addresses = {
-            "Vlan10": f"172.16.{group_number}.0/24",
-            f"Vlan{200 + group_number}": f"172.16.{100+group_number}.0/24",
-            f"Vlan{300 + group_number}": f"172.16.{200+group_number}.0/24"
-        }
-
-        def is_ip_in_subnet(ip, subnet):
-            """Helper function to check if an IP address is in a subnet."""
-            return ip_address(ip) in ip_network(subnet)
+        task = TaskGrade("Task 1", grade)  # Records each check's outcome under a stable check ID
 
         for device, filepath in device_files.items():
             print(f"[INFO] Grading file: {filepath}")
             try:
-                submission = CiscoConfParse(filepath)
+                submission = self.config_cache.load(filepath)
                 print(f"[INFO] Detected hostname: {device}")
 
                 # Check main device IP addresses
-                if device in expected_addresses:
-                    for interface, expected_ip_cidr in expected_addresses[device].items():
-                        ip, expected_mask = cidr_to_decimal(expected_ip_cidr)
+                if device in spec.interface_addresses:
+                    for interface, expected_ip_cidr in spec.interface_addresses[device].items():
+                        expected_address, expected_prefix = parse_cidr(expected_ip_cidr)
+                        ip, expected_mask = expected_ip_cidr.split("/")[0], format_mask(expected_prefix)  # For messages
                         print(f"[INFO] Checking {device} - Interface: {interface}")
 
-                        interface_obj = submission.find_objects(rf"^interface {interface}")
+                        interface_obj = submission.find_interface(interface)
+                        grade -= task.check("task1.interface_present", device, bool(interface_obj), 0.5,
+                                            f"{device} Missing interface {interface}")
                         if not interface_obj:
                             print(f"[WARNING] {device} - Missing interface {interface}")
-                            comments.append(f"{device} Missing interface {interface}")
-                            grade -= 0.5
                             continue
 
-                        found_ip = False
-                        for child in interface_obj[0].children:
-                            if "ip address" in child.text:
-                                parts = child.text.strip().split()
-                                actual_ip, actual_mask = parts[2], parts[3]
-                                if actual_ip == ip and actual_mask == expected_mask:
-                                    print(f"[INFO] {device} - Interface {interface}: Correct IP ({actual_ip}/{actual_mask})")
-                                    found_ip = True
-                                    break
-
-                        if not found_ip:
+                        # Primary or secondary, in either mask notation
+                        found_ip = any(entry.matches(expected_address, expected_prefix)
+                                       for entry in submission.addresses.get(interface, ()))
+                        if found_ip:
+                            print(f"[INFO] {device} - Interface {interface}: Correct IP ({ip}/{expected_mask})")
+                        else:
                             print(f"[WARNING] {device} - Interface {interface}: Expected {ip}/{expected_mask}, but not found")
-                            comments.append(f"{device} Incorrect IP on {interface} (Expected: {ip}/{expected_mask})")
-                            grade -= 0.5
+                        grade -= task.check("task1.interface_address", device, found_ip, 0.5,
+                                            f"{device} Incorrect IP on {interface} (Expected: {ip}/{expected_mask})")
 
                 # Check TOR-D1, TOR-A1 and TOR-A2 SVIs
                 if device in ["TOR-D1", "TOR-A1", "TOR-A2"]:
-                    for svi, expected_subnet in svi_addresses.items():
+                    for svi, expected_subnet in spec.svi_subnets.items():
                         print(f"[INFO] Checking {device} - SVI: {svi}")
 
-                        svi_obj = submission.find_objects(rf"^interface {svi}")
+                        svi_obj = submission.find_interface(svi)
+                        grade -= task.check("task1.svi_present", device, bool(svi_obj), 0.5, f"{device} Missing SVI {svi}")
                         if not svi_obj:
                             print(f"[WARNING] {device} - Missing SVI {svi}")
-                            comments.append(f"{device} Missing SVI {svi}")
-                            grade -= 0.5
                             continue
 
-                        found_ip = False
-                        for child in svi_obj[0].children:
-                            if "ip address" in child.text:
-                                parts = child.text.strip().split()
-                                actual_ip = parts[2]
-                                if is_ip_in_subnet(actual_ip, expected_subnet):
-                                    print(f"[INFO] {device} - SVI {svi}: Correct IP in range {expected_subnet}")
-                                    found_ip = True
-                                    break
-
-                        if not found_ip:
+                        network, prefix = parse_cidr(expected_subnet)
+                        found_ip = any(entry.in_subnet(network, prefix) for entry in submission.addresses.get(svi, ()))
+                        if found_ip:
+                            print(f"[INFO] {device} - SVI {svi}: Correct IP in range {expected_subnet}")
+                        else:
                             print(f"[WARNING] {device} - SVI {svi}: Expected IP in range {expected_subnet}, but not found")
-                            comments.append(f"{device} Incorrect IP on SVI {svi} (Expected: {expected_subnet})")
-                            grade -= 0.5
+                        grade -= task.check("task1.svi_address", device, found_ip, 0.5,
+                                            f"{device} Incorrect IP on SVI {svi} (Expected: {expected_subnet})")
 
             except Exception as e:
                 print(f"[ERROR] {device}: Failed to parse configuration - {e}")
-                comments.append(f"{device} Parse error")
+                task.note("task1.config_parsed", device, f"{device} Parse error")
 
 
         grade = max(0, grade)  # Ensure grade doesn't drop below 0
-        return {"grade": grade, "comments": " | ".join(comments)}
+        return task.result(grade)
     
-    def grade_task_2(self, device_files, group_number):
+    @uses_sections("interface")
+    @uses_devices("TOR-D1", "TOR-D2", "TOR-A1", "TOR-A2")
+    def grade_task_2(self, device_files, spec):
         """
         Grades Task 2: Switch Configuration.
         Validates trunk links, EtherChannels, and SVIs according to the rubric.
         """
-        comments = []
         grade = 31.0  # Start with full marks, deduct for issues found.
+        task = TaskGrade("Task 2", grade)
 
         # Define switches and exclude routers
         switch_devices = ["TOR-D1", "TOR-D2", "TOR-A1", "TOR-A2"]
@@ -413,7 +491,7 @@ class CaseStudyGrader:
                     "Port-channel3": ["GigabitEthernet1/0/3", "GigabitEthernet1/0/4"]}
         }
 
-        svi_interfaces = [f"Vlan10", f"Vlan{group_number + 200}", f"Vlan{group_number + 300}"]  # Adjust SVIs dynamically based on group number
+        svi_interfaces = spec.svi_interfaces
 
         # Unused interfaces - spot check a few ports, and make sure they're shutdown and set to VLAN 999
         unused_interfaces = {
@@ -441,57 +519,47 @@ class CaseStudyGrader:
 
             print(f"[INFO] Grading file: {filepath}")
             try:
-                submission = CiscoConfParse(filepath)
+                submission = self.config_cache.load(filepath)
 
                 # Task 2.3: Validate Static Trunk Links and Disable DTP
                 all_nonegotiate = True
                 if device in trunk_interfaces:
                     print(f"[INFO] Validating trunk links for {device}...")
                     for interface in trunk_interfaces[device]:
-                        interface_obj = submission.find_objects(rf"^interface {interface}")
+                        interface_obj = submission.find_interface(interface)
+                        # Split 1 point across switches
+                        grade -= task.check("task2.trunk_present", device, bool(interface_obj), 1.0 / len(trunk_interfaces),
+                                            f"{device} Missing trunk interface {interface}", weight=1.0)
                         if not interface_obj:
                             print(f"[WARNING] {device} - Missing trunk interface {interface}.")
-                            comments.append(f"{device} Missing trunk interface {interface}")
-                            grade -= 1.0 / len(trunk_interfaces)  # Split 1 point across switches
                             continue
 
                         children = [child.text.strip() for child in interface_obj[0].children]
                         if "switchport mode trunk" not in children:
                             print(f"[WARNING] {device} - Interface {interface} is not a trunk.")
-                            comments.append(f"{device} Interface {interface} is not a trunk")
-                            grade -= 1.0 / len(trunk_interfaces)
+                        grade -= task.check("task2.trunk_mode", device, "switchport mode trunk" in children,
+                                            1.0 / len(trunk_interfaces), f"{device} Interface {interface} is not a trunk",
+                                            weight=1.0)
                         if "switchport nonegotiate" not in children:
                             all_nonegotiate = False
 
                 # Give bonus 1 point if all trunk links have nonegotiate
                 if all_nonegotiate:
                     print(f"[INFO] Awarding 1 bonus point for nonegotiate on all trunk links.")
-                    grade += 1.0
+                grade += task.bonus("task2.trunk_nonegotiate", device, all_nonegotiate, 1.0)
                 
                 # Task 2.4: Validate VLAN Pruning
                 print(f"[INFO] Validating VLAN pruning for {device}...")
-                vlan_pruning = {
-                    "TOR-D1": {
-                        "Port-channel1": "10,100," + str(group_number + 200) + "," + str(group_number + 300),
-                        "Port-channel2": "10," + str(group_number + 200) + "," + str(group_number + 300),
-                        "Port-channel3": "10," + str(group_number + 200) + "," + str(group_number + 300)
-                    },
-                    "TOR-D2": {
-                        "Port-channel1": "10,100," + str(group_number + 200) + "," + str(group_number + 300),
-                        "Port-channel2": "10," + str(group_number + 200) + "," + str(group_number + 300),
-                        "Port-channel3": "10," + str(group_number + 200) + "," + str(group_number + 300)
-                    }
-                }
-
                 # Iterate over each Port-channel interface and validate mandatory VLANs
-                for pc_interface, vlan_list in vlan_pruning.get(device, {}).items():
-                    mandatory_vlans = vlan_list.split(",")
+                vlan_pruning = spec.vlan_pruning
+                for pc_interface, mandatory_vlans in vlan_pruning.get(device, {}).items():
                     # Locate the Port-channel interface
-                    pc_obj = submission.find_objects(rf"^interface {pc_interface}")
+                    pc_obj = submission.find_interface(pc_interface)
+                    grade -= task.check("task2.pruned_port_channel_present", device, bool(pc_obj),
+                                        points_distribution["vlan_pruning"] / len(vlan_pruning[device]),
+                                        f"{device} Missing {pc_interface}", weight=points_distribution["vlan_pruning"])
                     if not pc_obj:
                         print(f"[WARNING] {device} - Missing {pc_interface}.")
-                        comments.append(f"{device} Missing {pc_interface}")
-                        grade -= points_distribution["vlan_pruning"] / len(vlan_pruning[device])
                         continue
 
                     # Check VLAN pruning configuration on the Port-channel
@@ -503,60 +571,72 @@ class CaseStudyGrader:
 
                     # Validate mandatory VLANs
                     for vlan in mandatory_vlans:
-                        if allowed_vlans and vlan not in allowed_vlans:
+                        vlan_allowed = not allowed_vlans or vlan in allowed_vlans  # No allowed list means every VLAN
+                        if not vlan_allowed:
                             print(f"[WARNING] {device} - Missing mandatory VLAN {vlan} on {pc_interface}.")
-                            comments.append(f"{device} Missing mandatory VLAN {vlan} on {pc_interface}")
-                            grade -= points_distribution["vlan_pruning"] / len(mandatory_vlans)
+                        grade -= task.check("task2.mandatory_vlan_allowed", device, vlan_allowed,
+                                            points_distribution["vlan_pruning"] / len(mandatory_vlans),
+                                            f"{device} Missing mandatory VLAN {vlan} on {pc_interface}",
+                                            weight=points_distribution["vlan_pruning"])
 
                 # Task 2.5: TOR-D1 G1/0/11 Configuration
                 print(f"[INFO] Validating TOR-D1 G1/0/11 configuration...")
                 if device == "TOR-D1":
-                    interface_obj = submission.find_objects(r"^interface GigabitEthernet1/0/11")
+                    interface_obj = submission.find_interface("GigabitEthernet1/0/11")
                     if not interface_obj:
                         print(f"[WARNING] {device} - Missing interface G1/0/11.")
-                        comments.append(f"{device} Missing interface G1/0/11")
-                        grade -= points_distribution["tor_d1_g1_0_11"]
+                    grade -= task.check("task2.tor_d1_g1_0_11_present", device, bool(interface_obj),
+                                        points_distribution["tor_d1_g1_0_11"], f"{device} Missing interface G1/0/11")
 
                 # Task 2.6: Validate TOR-D2 Access Ports
                 print(f"[INFO] Validating TOR-D2 access ports configuration...")
                 if device == "TOR-D2":
                     for interface, vlan in {"GigabitEthernet1/0/11": 300, "GigabitEthernet1/0/12": 400}.items():
-                        interface_obj = submission.find_objects(rf"^interface {interface}")
+                        interface_obj = submission.find_interface(interface)
+                        access_points = points_distribution["tor_d2_access_ports"]  # Split between both interfaces
+                        grade -= task.check("task2.tor_d2_access_port_present", device, bool(interface_obj),
+                                            access_points / 2, f"{device} Missing interface {interface}",
+                                            weight=access_points)
                         if not interface_obj:
                             print(f"[WARNING] {device} - Missing interface {interface}.")
-                            comments.append(f"{device} Missing interface {interface}")
-                            grade -= points_distribution["tor_d2_access_ports"] / 2  # Split between both interfaces
                             continue
 
                         children = [child.text.strip() for child in interface_obj[0].children]
                         if f"switchport access vlan {vlan}" not in children:
                             print(f"[WARNING] {device} - Interface {interface} not assigned to VLAN {vlan}.")
-                            comments.append(f"{device} Interface {interface} not assigned to VLAN {vlan}")
-                            grade -= points_distribution["tor_d2_access_ports"] / 2
+                        grade -= task.check("task2.tor_d2_access_vlan", device, f"switchport access vlan {vlan}" in children,
+                                            access_points / 2, f"{device} Interface {interface} not assigned to VLAN {vlan}",
+                                            weight=access_points)
                         if "switchport mode access" not in children:
                             print(f"[WARNING] {device} - Interface {interface} is not configured as an access port.")
-                            comments.append(f"{device} Interface {interface} is not configured as an access port")
-                            grade -= points_distribution["tor_d2_access_ports"] / 2
+                        grade -= task.check("task2.tor_d2_access_mode", device, "switchport mode access" in children,
+                                            access_points / 2,
+                                            f"{device} Interface {interface} is not configured as an access port",
+                                            weight=access_points)
 
                 # Task 2.7: Validate Unused Ports
                 print(f"[INFO] Validating unused ports for {device}...")
                 for unused_port in unused_interfaces.get(device, []):
-                    interface_obj = submission.find_objects(rf"^interface {unused_port}")
+                    interface_obj = submission.find_interface(unused_port)
+                    port_points = points_distribution["unused_ports"] / len(unused_interfaces[device])  # Split across ports
+                    grade -= task.check("task2.unused_port_present", device, bool(interface_obj), port_points,
+                                        f"{device} Missing configuration for unused port {unused_port}",
+                                        weight=points_distribution["unused_ports"])
                     if not interface_obj:
                         print(f"[WARNING] {device} - Missing configuration for unused port {unused_port}.")
-                        comments.append(f"{device} Missing configuration for unused port {unused_port}")
-                        grade -= points_distribution["unused_ports"] / len(unused_interfaces[device])  # Split points across unused ports
                         continue
 
                     children = [child.text.strip() for child in interface_obj[0].children]
                     if "switchport access vlan 999" not in children:
                         print(f"[WARNING] {device} - Unused port {unused_port} not assigned to VLAN 999.")
-                        comments.append(f"{device} Unused port {unused_port} not assigned to VLAN 999")
-                        grade -= points_distribution["unused_ports"] / len(unused_interfaces[device])
+                    grade -= task.check("task2.unused_port_vlan_999", device, "switchport access vlan 999" in children,
+                                        port_points, f"{device} Unused port {unused_port} not assigned to VLAN 999",
+                                        weight=points_distribution["unused_ports"])
                     if "shutdown" not in children:
                         print(f"[WARNING] {device} - Unused port {unused_port} is not shut down.")
-                        comments.append(f"{device} Unused port {unused_port} is not shut down")
-                        grade -= points_distribution["unused_ports"] / len(unused_interfaces[device])
+                    grade -= task.check("task2.unused_port_shutdown", device, "shutdown" in children, port_points,
+                                        f"{device} Unused port {unused_port} is not shut down",
+                                        weight=points_distribution["unused_ports"])
 
                 # Task 2.8: Validate EtherChannels
                 print(f"[INFO] Validating EtherChannels for {device}...")
@@ -564,11 +644,13 @@ class CaseStudyGrader:
                 if device in etherchannel_interfaces:
                     for port_channel, member_interfaces in etherchannel_interfaces[device].items():
                         # Locate the Port-channel interface
-                        pc_obj = submission.find_objects(rf"^interface {port_channel}")
+                        pc_obj = submission.find_interface(port_channel)
+                        channel_points = points_distribution["etherchannels"] / len(etherchannel_interfaces[device])
+                        grade -= task.check("task2.etherchannel_present", device, bool(pc_obj), channel_points,
+                                            f"{device} Missing EtherChannel {port_channel}",
+                                            weight=points_distribution["etherchannels"])
                         if not pc_obj:
                             print(f"[WARNING] {device} - {port_channel} is missing.")
-                            comments.append(f"{device} Missing EtherChannel {port_channel}")
-                            grade -= points_distribution["etherchannels"] / len(etherchannel_interfaces[device])
                             continue
 
                         # Expected protocol for the Port-channel
@@ -583,11 +665,13 @@ class CaseStudyGrader:
                         # Detect protocol from member interfaces
                         detected_protocol = None
                         for interface in member_interfaces:
-                            int_obj = submission.find_objects(rf"^interface {interface}")
+                            int_obj = submission.find_interface(interface)
+                            grade -= task.check("task2.etherchannel_member", device, bool(int_obj),
+                                                channel_points / len(member_interfaces),
+                                                f"{device} Missing interface {interface} in {port_channel}",
+                                                weight=points_distribution["etherchannels"])
                             if not int_obj:
                                 print(f"[WARNING] {device} - Missing interface {interface} in {port_channel}.")
-                                comments.append(f"{device} Missing interface {interface} in {port_channel}")
-                                grade -= (points_distribution["etherchannels"] / len(etherchannel_interfaces[device])) / len(member_interfaces)
                                 continue
 
                             # Parse channel-group mode for protocol detection
@@ -607,45 +691,49 @@ class CaseStudyGrader:
                         # Compare detected protocol with expected protocol
                         if detected_protocol != expected_protocol:
                             print(f"[WARNING] {device} - {port_channel} missing or incorrect protocol (Expected: {expected_protocol}, Detected: {detected_protocol}).")
-                            comments.append(f"{device} {port_channel} missing or incorrect protocol (Expected: {expected_protocol})")
-                            grade -= points_distribution["etherchannels"] / len(etherchannel_interfaces[device])
                         else:
                             print(f"[INFO] {device} - {port_channel} protocol is correctly configured as {detected_protocol}.")
+                        grade -= task.check("task2.etherchannel_protocol", device, detected_protocol == expected_protocol,
+                                            channel_points,
+                                            f"{device} {port_channel} missing or incorrect protocol (Expected: {expected_protocol})",
+                                            weight=points_distribution["etherchannels"])
 
                 # Task 2.9: Validate SVIs
                 print(f"[INFO] Validating SVIs for {device}...")
 
                 # Award points if the SVIs exist for the switch
                 for svi in svi_interfaces:
-                    svi_obj = submission.find_objects(rf"^interface {svi}")
+                    svi_obj = submission.find_interface(svi)
                     if not svi_obj:
                         print(f"[WARNING] {device} - Missing SVI {svi}.")
-                        comments.append(f"{device} Missing SVI {svi}")
-                        grade -= points_distribution["svis"] / len(svi_interfaces)
                     else:
                         print(f"[INFO] {device} - SVI {svi} exists. Awarding marks.")
+                    grade -= task.check("task2.svi_present", device, bool(svi_obj),
+                                        points_distribution["svis"] / len(svi_interfaces), f"{device} Missing SVI {svi}",
+                                        weight=points_distribution["svis"])
 
             except Exception as e:
                 print(f"[ERROR] {device}: Failed to parse configuration - {e}")
-                comments.append(f"{device} Parse error")
+                task.note("task2.config_parsed", device, f"{device} Parse error")
 
         grade = max(0, grade)
-        return {"grade": grade, "comments": " | ".join(comments)}
+        return task.result(grade)
 
-    def grade_task_3(self, device_files, group_number):
+    @uses_sections("spanning-tree", "interface")
+    @uses_devices("TOR-D1", "TOR-D2", "TOR-A1", "TOR-A2")
+    def grade_task_3(self, device_files, spec):
         """
         Grades Task 3: Configure Spanning Tree.
         Validates root bridge priorities, port costs, and other spanning tree configurations.
         """
-        comments = []
         grade = 9.0  # Total points for Task 3
+        task = TaskGrade("Task 3", grade)
 
         # Define switches and exclude routers
         switch_devices = ["TOR-D1", "TOR-D2", "TOR-A1", "TOR-A2"]
 
-        # Dynamic VLAN IDs based on group number
-        vlan_2xx = group_number + 200
-        vlan_3xx = group_number + 300
+        vlan_2xx = spec.vlan_2xx
+        vlan_3xx = spec.vlan_3xx
 
         # Iterate through detected files for switch devices
         for device, filepath in device_files.items():
@@ -655,15 +743,11 @@ class CaseStudyGrader:
 
             print(f"[INFO] Grading file: {filepath}")
             try:
-                submission = CiscoConfParse(filepath)
+                submission = self.config_cache.load(filepath)
 
                 # Task 3.1: Validate Root Bridge Configuration
                 if device in ["TOR-D1", "TOR-D2"]:
                     print(f"[INFO] Validating root bridge priorities for {device}...")
-                    
-                    # Calculate dynamic VLAN IDs
-                    vlan_2xx = 200 + group_number
-                    vlan_3xx = 300 + group_number
 
                     def get_priority(vlan):
                         """Fetches priority for a specific VLAN."""
@@ -683,35 +767,38 @@ class CaseStudyGrader:
 
                     # Validate TOR-D1 priorities
                     if device == "TOR-D1":
-                        if vlan_10_priority and vlan_3xx_priority and vlan_2xx_priority and vlan_10_priority < vlan_2xx_priority and vlan_3xx_priority < vlan_2xx_priority:
+                        root_priorities = (vlan_10_priority and vlan_3xx_priority and vlan_2xx_priority and
+                                           vlan_10_priority < vlan_2xx_priority and vlan_3xx_priority < vlan_2xx_priority)
+                        if root_priorities:
                             print(f"[INFO] {device} - VLAN 10 and 3xx priorities ({vlan_10_priority}, {vlan_3xx_priority}) are lower than VLAN 2xx ({vlan_2xx_priority}).")
                         else:
                             print(f"[WARNING] {device} - VLAN 10 or 3xx priority is not lower than VLAN 2xx.")
-                            comments.append(f"{device} Incorrect priority relationship for VLAN 10/3xx vs 2xx")
-                            grade -= 1.0 / 2.0 # Deduct 1 point for each incorrect priority
+                        grade -= task.check("task3.root_bridge_priorities", device, root_priorities, 1.0 / 2.0,
+                                            f"{device} Incorrect priority relationship for VLAN 10/3xx vs 2xx", weight=1.0)
 
                     # Validate TOR-D2 priorities
                     if device == "TOR-D2":
-                        if vlan_2xx_priority and vlan_10_priority and vlan_3xx_priority and vlan_2xx_priority < vlan_10_priority and vlan_2xx_priority < vlan_3xx_priority:
+                        root_priorities = (vlan_2xx_priority and vlan_10_priority and vlan_3xx_priority and
+                                           vlan_2xx_priority < vlan_10_priority and vlan_2xx_priority < vlan_3xx_priority)
+                        if root_priorities:
                             print(f"[INFO] {device} - VLAN 2xx priority ({vlan_2xx_priority}) is lower than VLAN 10 and 3xx ({vlan_10_priority}, {vlan_3xx_priority}).")
                         else:
                             print(f"[WARNING] {device} - VLAN 2xx priority is not lower than VLAN 10 or 3xx.")
-                            comments.append(f"{device} Incorrect priority relationship for VLAN 2xx vs 10/3xx")
-                            grade -= 1.0 / 2.0 # Deduct 1 point for each incorrect priority
+                        grade -= task.check("task3.root_bridge_priorities", device, root_priorities, 1.0 / 2.0,
+                                            f"{device} Incorrect priority relationship for VLAN 2xx vs 10/3xx", weight=1.0)
 
                 # Task 3.2: Validate Spanning Tree Port Costs
                 if device == "TOR-A1":
                     print(f"[INFO] Validating spanning-tree port costs on {device}...")
 
                     # Locate Port-channel2 interface
-                    po2_interface = submission.find_objects(r"^interface Port-channel2")
+                    po2_interface = submission.find_interface("Port-channel2")
                     if po2_interface:
                         po2_children = [child.text.strip() for child in po2_interface[0].children]
                         print(f"[DEBUG] {device} Port-channel2 Children: {po2_children}")
 
-                        # Dynamically calculate expected cost
-                        expected_cost = (2 * group_number) + 10
-                        cost_detected = False
+                        expected_cost = spec.stp_cost
+                        actual_cost = None
 
                         # Check for any 'spanning-tree vlan <vlan_id> cost <value>' command
                         for line in po2_children:
@@ -720,83 +807,82 @@ class CaseStudyGrader:
                                 actual_cost = int(match.group(1))
                                 if actual_cost == expected_cost:
                                     print(f"[INFO] {device} - Port-channel2 cost is correctly set to {expected_cost}.")
-                                    cost_detected = True
-                                    break
                                 else:
                                     print(f"[WARNING] {device} - Port-channel2 cost exists but is set to {actual_cost} instead of {expected_cost}.")
-                                    comments.append(f"{device} Incorrect spanning-tree cost (Expected: {expected_cost}, Found: {actual_cost})")
-                                    grade -= 1.0
-                                    cost_detected = True
-                                    break
-                        
+                                break
+
                         # If no cost command is found
-                        if not cost_detected:
+                        if actual_cost is None:
                             print(f"[WARNING] {device} - Port-channel2 cost command is missing.")
-                            comments.append(f"{device} Missing spanning-tree cost command")
-                            grade -= 1.0
+                        grade -= task.check("task3.stp_cost_configured", device, actual_cost is not None, 1.0,
+                                            f"{device} Missing spanning-tree cost command")
+                        if actual_cost is not None:
+                            grade -= task.check("task3.stp_cost_value", device, actual_cost == expected_cost, 1.0,
+                                                f"{device} Incorrect spanning-tree cost (Expected: {expected_cost}, Found: {actual_cost})")
 
                 # Task 3.3: Validate PortFast and BPDU Guard
                 if device in ["TOR-A1", "TOR-A2"]:
                     print(f"[INFO] Validating PortFast and BPDU Guard on access ports for {device}...")
                     access_ports = [f"GigabitEthernet1/0/{i}" for i in range(12, 25)]
                     for port in access_ports:
-                        port_obj = submission.find_objects(rf"^interface {port}")
+                        port_obj = submission.find_interface(port)
+                        grade -= task.check("task3.access_port_present", device, bool(port_obj), 2.0 / len(access_ports),
+                                            f"{device} Missing configuration for access port {port}", weight=2.0)
                         if not port_obj:
                             print(f"[WARNING] {device} - Access port {port} is missing.")
-                            comments.append(f"{device} Missing configuration for access port {port}")
-                            grade -= 2.0 / len(access_ports) 
                             continue
 
                         children = [child.text.strip() for child in port_obj[0].children]
                         if "spanning-tree portfast" not in children:
                             print(f"[WARNING] {device} - PortFast is not enabled on {port}.")
-                            comments.append(f"{device} PortFast not enabled on {port}")
-                            grade -= 1.0 / len(access_ports)
+                        grade -= task.check("task3.portfast", device, "spanning-tree portfast" in children,
+                                            1.0 / len(access_ports), f"{device} PortFast not enabled on {port}", weight=1.0)
                         if "spanning-tree bpduguard enable" not in children:
                             print(f"[WARNING] {device} - BPDU Guard is not enabled on {port}.")
-                            comments.append(f"{device} BPDU Guard not enabled on {port}")
-                            grade -= 1.0 / len(access_ports)
+                        grade -= task.check("task3.bpdu_guard", device, "spanning-tree bpduguard enable" in children,
+                                            1.0 / len(access_ports), f"{device} BPDU Guard not enabled on {port}", weight=1.0)
 
                 # Task 3.4: Validate Root Guard
                 if device in ["TOR-D1", "TOR-D2"]:
                     print(f"[INFO] Validating Root Guard configuration on {device}...")
                     root_guard_ports = ["GigabitEthernet1/0/5", "GigabitEthernet1/0/6"]
                     for port in root_guard_ports:
-                        port_obj = submission.find_objects(rf"^interface {port}")
+                        port_obj = submission.find_interface(port)
+                        grade -= task.check("task3.root_guard_port_present", device, bool(port_obj),
+                                            2.0 / len(root_guard_ports), f"{device} Missing Root Guard port {port}", weight=2.0)
                         if not port_obj:
                             print(f"[WARNING] {device} - Root Guard port {port} is missing.")
-                            comments.append(f"{device} Missing Root Guard port {port}")
-                            grade -= 2.0 / len(root_guard_ports)
                             continue
 
                         children = [child.text.strip() for child in port_obj[0].children]
                         if "spanning-tree guard root" not in children:
                             print(f"[WARNING] {device} - Root Guard is not enabled on {port}.")
-                            comments.append(f"{device} Root Guard not enabled on {port}")
-                            grade -= 2.0 / len(root_guard_ports)
+                        grade -= task.check("task3.root_guard", device, "spanning-tree guard root" in children,
+                                            2.0 / len(root_guard_ports), f"{device} Root Guard not enabled on {port}",
+                                            weight=2.0)
 
             except Exception as e:
                 print(f"[ERROR] {device}: Failed to parse configuration - {e}")
-                comments.append(f"{device} Parse error")
+                task.note("task3.config_parsed", device, f"{device} Parse error")
 
         # Final Grade
         grade = max(0, grade)  # Ensure grade does not go below 0
-        return {"grade": grade, "comments": " | ".join(comments)}
+        return task.result(grade)
 
-    def grade_task_4(self, device_files, group_number):
+    # The topology reads every device, so this task waits for all of them (and never parses one itself)
+    @uses_sections("interface", "ip default-gateway")
+    @uses_devices("Toronto", "ISP", "Ottawa", "Oshawa", "TOR-A1", "TOR-A2", "TOR-D1", "TOR-D2")
+    def grade_task_4(self, device_files, spec, topology):
         """
         Grades Task 4: Configure First Hop Redundancy.
         Validates HSRPv2, primary gateways, preemption, virtual IPs, object tracking, and default gateway configuration.
         """
-        comments = []
         grade = 17.0  # Total points for Task 4 based on rubric
+        task = TaskGrade("Task 4", grade)
 
-        # Calculate dynamic VLAN numbers and HSRP group numbers
-        vlan_2xx = 200 + group_number
-        vlan_3xx = 300 + group_number
-        hsrp_group_10 = (2 * group_number) + 10
-        hsrp_group_2xx = (2 * group_number) + vlan_2xx
-        hsrp_group_3xx = (2 * group_number) + vlan_3xx
+        vlan_2xx = spec.vlan_2xx
+        vlan_3xx = spec.vlan_3xx
+        hsrp_group_2xx = spec.hsrp_2xx
 
         # Iterate through device files
         for device, filepath in device_files.items():
@@ -806,22 +892,24 @@ class CaseStudyGrader:
 
             print(f"[INFO] Grading file: {filepath}")
             try:
-                submission = CiscoConfParse(filepath)
+                submission = self.config_cache.load(filepath)
 
                 # Validation logic for TOR-D1 and TOR-D2
                 if device in ["TOR-D1", "TOR-D2"]:
                     print(f"[INFO] Validating HSRPv2 configuration on {device}...")
                     
                     # Define VLANs and HSRP groups for TOR-D1 and TOR-D2
-                    vlans = [10, vlan_2xx, vlan_3xx]
-                    hsrp_groups = [hsrp_group_10, hsrp_group_2xx, hsrp_group_3xx]
+                    vlans = spec.vlans
+                    hsrp_groups = spec.hsrp_groups
                     priorities = {}
 
                     for vlan, group in zip(vlans, hsrp_groups):
-                        vlan_interface = submission.find_objects(rf"^interface Vlan{vlan}")
+                        vlan_interface = submission.find_interface(f"Vlan{vlan}")
+                        # No points of its own: the HSRP checks on this SVI are all lost with it
+                        grade -= task.check("task4.hsrp_svi_present", device, bool(vlan_interface), 0.0,
+                                            f"{device} Missing interface Vlan{vlan}")
                         if not vlan_interface:
                             print(f"[WARNING] {device} - Missing interface Vlan{vlan} for HSRP.")
-                            comments.append(f"{device} Missing interface Vlan{vlan}")
                             continue
 
                         children = [child.text.strip() for child in vlan_interface[0].children]
@@ -829,19 +917,19 @@ class CaseStudyGrader:
                         # Validate HSRPv2
                         if f"standby version 2" not in children:
                             print(f"[WARNING] {device} - HSRPv2 not enabled for VLAN {vlan}.")
-                            comments.append(f"{device} Missing HSRPv2 for VLAN {vlan}")
-                            grade -= 0.5
+                        grade -= task.check("task4.hsrp_version_2", device, "standby version 2" in children, 0.5,
+                                            f"{device} Missing HSRPv2 for VLAN {vlan}")
 
                         # Validate HSRP group number
                         if f"standby {group} " not in " ".join(children):
                             print(f"[WARNING] {device} - Incorrect HSRP group for VLAN {vlan}.")
-                            comments.append(f"{device} Incorrect HSRP group for VLAN {vlan}")
-                            grade -= 0.5
+                        grade -= task.check("task4.hsrp_group", device, f"standby {group} " in " ".join(children), 0.5,
+                                            f"{device} Incorrect HSRP group for VLAN {vlan}")
 
                         # Extract priority
-                        priority_line = [line for line in children if f"standby {group} priority" in line]
-                        if priority_line:
-                            priorities[vlan] = int(priority_line[0].split()[-1])
+                        member = topology.standby_member(device, group)
+                        if member is not None and member.interface == f"Vlan{vlan}" and member.priority is not None:
+                            priorities[vlan] = member.priority
                         else:
                             print(f"[WARNING] {device} - Priority configuration missing for VLAN {vlan}.")
                             priorities[vlan] = 100  # Assume default priority for missing priorities
@@ -851,87 +939,105 @@ class CaseStudyGrader:
                         if priorities.get(10) and priorities.get(vlan_3xx) and priorities.get(vlan_2xx):
                             if priorities[10] <= priorities[vlan_2xx]:
                                 print(f"[WARNING] {device} - Priority for VLAN 10 is not higher than VLAN 2xx.")
-                                comments.append(f"{device} Priority for VLAN 10 not higher than VLAN 2xx")
-                                grade -= 0.75
+                            grade -= task.check("task4.primary_vlan_10", device, priorities[10] > priorities[vlan_2xx], 0.75,
+                                                f"{device} Priority for VLAN 10 not higher than VLAN 2xx")
                             if priorities[vlan_3xx] <= priorities[vlan_2xx]:
                                 print(f"[WARNING] {device} - Priority for VLAN 3xx is not higher than VLAN 2xx.")
-                                comments.append(f"{device} Priority for VLAN 3xx not higher than VLAN 2xx")
-                                grade -= 0.75
+                            grade -= task.check("task4.primary_vlan_3xx", device,
+                                                priorities[vlan_3xx] > priorities[vlan_2xx], 0.75,
+                                                f"{device} Priority for VLAN 3xx not higher than VLAN 2xx")
 
                     if device == "TOR-D2":
                         if priorities.get(10) and priorities.get(vlan_3xx) and priorities.get(vlan_2xx):
                             if priorities[vlan_2xx] <= priorities[10]:
                                 print(f"[WARNING] {device} - Priority for VLAN 2xx is not higher than VLAN 10.")
-                                comments.append(f"{device} Priority for VLAN 2xx not higher than VLAN 10")
-                                grade -= 0.75
+                            grade -= task.check("task4.primary_vlan_2xx_over_10", device,
+                                                priorities[vlan_2xx] > priorities[10], 0.75,
+                                                f"{device} Priority for VLAN 2xx not higher than VLAN 10")
                             if priorities[vlan_2xx] <= priorities[vlan_3xx]:
                                 print(f"[WARNING] {device} - Priority for VLAN 2xx is not higher than VLAN 3xx.")
-                                comments.append(f"{device} Priority for VLAN 2xx not higher than VLAN 3xx")
-                                grade -= 0.75
+                            grade -= task.check("task4.primary_vlan_2xx_over_3xx", device,
+                                                priorities[vlan_2xx] > priorities[vlan_3xx], 0.75,
+                                                f"{device} Priority for VLAN 2xx not higher than VLAN 3xx")
 
                     # Preemption Validation
                     for vlan, group in zip(vlans, hsrp_groups):
-                        vlan_interface = submission.find_objects(rf"^interface Vlan{vlan}")
+                        vlan_interface = submission.find_interface(f"Vlan{vlan}")
                         if vlan_interface:
                             children = [child.text.strip() for child in vlan_interface[0].children]
-                            if f"standby {group} preempt" not in " ".join(children):
+                            preempt = f"standby {group} preempt" in " ".join(children)
+                            if not preempt:
                                 print(f"[WARNING] {device} - Preemption not enabled for VLAN {vlan}.")
-                                comments.append(f"{device} Missing preemption for VLAN {vlan}")
-                                grade -= 1.5 / len(vlans)
+                            grade -= task.check("task4.hsrp_preempt", device, preempt, 1.5 / len(vlans),
+                                                f"{device} Missing preemption for VLAN {vlan}", weight=1.5)
 
                     # Virtual IP Validation
                     for vlan, group in zip(vlans, hsrp_groups):
-                        vlan_interface = submission.find_objects(rf"^interface Vlan{vlan}")
+                        vlan_interface = submission.find_interface(f"Vlan{vlan}")
                         if vlan_interface:
                             children = [child.text.strip() for child in vlan_interface[0].children]
-                            if f"standby {group} ip" not in " ".join(children):
+                            virtual_ip = f"standby {group} ip" in " ".join(children)
+                            if not virtual_ip:
                                 print(f"[WARNING] {device} - Virtual IP missing for VLAN {vlan}.")
-                                comments.append(f"{device} Missing virtual IP for VLAN {vlan}")
-                                grade -= 1.0 / len(vlans)
+                            grade -= task.check("task4.hsrp_virtual_ip", device, virtual_ip, 1.0 / len(vlans),
+                                                f"{device} Missing virtual IP for VLAN {vlan}", weight=1.0)
 
                     # Object Tracking Validation for TOR-D2
                     if device == "TOR-D2":
-                        vlan_interface = submission.find_objects(rf"^interface Vlan{vlan_2xx}")
+                        vlan_interface = submission.find_interface(f"Vlan{vlan_2xx}")
                         if vlan_interface:
                             children = [child.text.strip() for child in vlan_interface[0].children]
 
                             # Validate standby tracking configuration
-                            if f"standby {hsrp_group_2xx} track {hsrp_group_2xx}" not in " ".join(children):
+                            tracked = f"standby {hsrp_group_2xx} track {hsrp_group_2xx}" in " ".join(children)
+                            if not tracked:
                                 print(f"[WARNING] {device} - Object tracking not configured for VLAN {vlan_2xx}.")
-                                comments.append(f"{device} Missing object tracking for VLAN {vlan_2xx}")
-                                grade -= 1.0
+                            grade -= task.check("task4.object_tracking", device, tracked, 1.0,
+                                                f"{device} Missing object tracking for VLAN {vlan_2xx}")
 
                             # Validate decrement tracking for Port-channel2
                             if "decrement" not in " ".join(children):
                                 print(f"[WARNING] {device} - Missing decrement tracking for VLAN {vlan_2xx}.")
-                                comments.append(f"{device} Missing decrement tracking for VLAN {vlan_2xx}")
-                                grade -= 1.0
+                            grade -= task.check("task4.tracking_decrement", device, "decrement" in " ".join(children), 1.0,
+                                                f"{device} Missing decrement tracking for VLAN {vlan_2xx}")
 
                 # Default Gateway Validation for TOR-A1 and TOR-A2
                 if device in ["TOR-A1", "TOR-A2"]:
                     print(f"[INFO] Validating default gateway configuration on {device}...")
                     default_gateway_obj = submission.find_objects(r"^ip default-gateway")
-                    expected_gateway = f"172.16.{group_number}.254"
-                    if not default_gateway_obj or expected_gateway not in default_gateway_obj[0].text:
+                    expected_gateway = spec.default_gateway
+                    gateway_correct = bool(default_gateway_obj) and expected_gateway in default_gateway_obj[0].text
+                    if not gateway_correct:
                         print(f"[WARNING] {device} - Default gateway not configured correctly for VLAN 10.")
-                        grade -= 1.0
-                        comments.append(f"{device} Missing default gateway for VLAN 10")
+                    grade -= task.check("task4.default_gateway", device, gateway_correct, 1.0,
+                                        f"{device} Missing default gateway for VLAN 10")
 
             except Exception as e:
                 print(f"[ERROR] {device}: Failed to parse configuration - {e}")
-                comments.append(f"{device} Parse error")
+                task.note("task4.config_parsed", device, f"{device} Parse error")
+
+        # Which distribution switch wins each election, across both switches' configs
+        try:
+            for vlan, group in zip(spec.vlans, spec.hsrp_groups):
+                print(f"[INFO] VLAN {vlan} HSRP group {group} active router: {topology.active_router(group)}")
+            topology.report("hsrp")
+        except Exception as e:
+            print(f"[ERROR] Could not build the group topology - {e}")
 
         # Final Grade
         grade = max(0, grade)  # Ensure grade doesn't go below 0
-        return {"grade": grade, "comments": " | ".join(comments)}
+        return task.result(grade)
 
-    def grade_task_5(self, device_files, group_number):
+    # The topology reads every device, so this task waits for all of them (and never parses one itself)
+    @uses_sections("interface", "mpls")
+    @uses_devices("Toronto", "ISP", "Ottawa", "Oshawa", "TOR-A1", "TOR-A2", "TOR-D1", "TOR-D2")
+    def grade_task_5(self, device_files, spec, topology):
         """
         Grades Task 5: Configure MPLS.
         Validates MPLS on specific links, label protocol, and LDP router ID configuration.
         """
-        comments = []
         grade = 10.0  # Total points for Task 5
+        task = TaskGrade("Task 5", grade)
 
         # Interface mapping for MPLS links
         interfaces = {
@@ -949,7 +1055,7 @@ class CaseStudyGrader:
 
             print(f"[INFO] Grading file: {filepath}")
             try:
-                submission = CiscoConfParse(filepath)
+                submission = self.config_cache.load(filepath)
 
                 # Validate MPLS on specific interfaces
                 if device in ["Toronto", "ISP", "Ottawa"]:
@@ -959,82 +1065,81 @@ class CaseStudyGrader:
                         print(f"[DEBUG] Validating ISP interfaces: {isp_interfaces}")
                         for interface in isp_interfaces:
                             print(f"[DEBUG] Checking interface: {interface}")
-                            interface_obj = submission.find_objects(rf"^interface {interface}")
-                            if not interface_obj:
+                            node = topology.interface(device, interface)
+                            # Missing interfaces and ISP-side MPLS are noted without a deduction of their own
+                            grade -= task.check("task5.mpls_interface_present", device, node is not None, 0.0,
+                                                f"{device} Missing interface {interface}")
+                            if node is None:
                                 print(f"[WARNING] {device} - Interface {interface} not found.")
-                                comments.append(f"{device} Missing interface {interface}")
                                 continue
-                            children = [child.text.strip() for child in interface_obj[0].children]
-                            if "mpls ip" not in children:
+                            if not node.mpls:
                                 print(f"[WARNING] {device} - MPLS not enabled on {interface}.")
-                                comments.append(f"{device} MPLS missing on {interface}")
-                            if "mpls label protocol ldp" not in children:
+                            grade -= task.check("task5.isp_mpls_enabled", device, node.mpls, 0.0,
+                                                f"{device} MPLS missing on {interface}")
+                            if not node.ldp:
                                 print(f"[WARNING] {device} - MPLS label protocol LDP not configured on {interface}.")
-                                comments.append(f"{device} Missing label protocol LDP on {interface}")
-                                grade -= 1.0
+                            grade -= task.check("task5.ldp_label_protocol", device, node.ldp, 1.0,
+                                                f"{device} Missing label protocol LDP on {interface}")
                     else:
                         interface = interfaces[device]
-                        interface_obj = submission.find_objects(rf"^interface {interface}")
-                        if not interface_obj:
+                        node = topology.interface(device, interface)
+                        grade -= task.check("task5.mpls_interface_present", device, node is not None, 0.0,
+                                            f"{device} Missing interface {interface}")
+                        if node is None:
                             print(f"[WARNING] {device} - Interface {interface} not found.")
-                            comments.append(f"{device} Missing interface {interface}")
                             continue
-                        children = [child.text.strip() for child in interface_obj[0].children]
-                        if "mpls ip" not in children:
+                        if not node.mpls:
                             print(f"[WARNING] {device} - MPLS not enabled on {interface}.")
-                            comments.append(f"{device} MPLS missing on {interface}")
-                            grade -= 1.0  # Deduct 1 point for missing MPLS
-                        if "mpls label protocol ldp" not in children:
-                                print(f"[WARNING] {device} - MPLS label protocol LDP not configured on {interface}.")
-                                comments.append(f"{device} Missing label protocol LDP on {interface}")
-                                grade -= 1.0
+                        grade -= task.check("task5.mpls_enabled", device, node.mpls, 1.0,
+                                            f"{device} MPLS missing on {interface}")
+                        if not node.ldp:
+                            print(f"[WARNING] {device} - MPLS label protocol LDP not configured on {interface}.")
+                        grade -= task.check("task5.ldp_label_protocol", device, node.ldp, 1.0,
+                                            f"{device} Missing label protocol LDP on {interface}")
 
                 # Validate LDP Router ID
                 print(f"[INFO] Validating LDP Router ID configuration on {device}...")
-                if not submission.find_objects(r"^mpls ldp router-id Loopback1"):
+                ldp_router_id = bool(submission.find_objects(r"^mpls ldp router-id Loopback1"))
+                if not ldp_router_id:
                     print(f"[WARNING] {device} - LDP Router ID not set to Loopback1.")
-                    comments.append(f"{device} Missing LDP Router ID configuration")
-                    grade -= 1.0   # Deduct 1 point if LDP Router ID is missing or incorrect
+                grade -= task.check("task5.ldp_router_id", device, ldp_router_id, 1.0,
+                                    f"{device} Missing LDP Router ID configuration")
 
             except Exception as e:
                 print(f"[ERROR] {device}: Failed to parse configuration - {e}")
-                comments.append(f"{device} Parse error")
+                task.note("task5.config_parsed", device, f"{device} Parse error")
+
+        # The provider links as the addressing actually wires them
+        try:
+            for site in ["Toronto", "Ottawa"]:
+                links = ", ".join(f"{format_address(network)}/{prefix}" for network, prefix in topology.links(site, "ISP"))
+                print(f"[INFO] {site} <-> ISP links: {links or 'none'}")
+            topology.report("mpls")
+        except Exception as e:
+            print(f"[ERROR] Could not build the group topology - {e}")
 
         # Final Grade
         grade = max(0, grade)  # Ensure grade does not go below 0
-        return {"grade": grade, "comments": " | ".join(comments)}
+        return task.result(grade)
 
-    def grade_task_6(self, device_files, group_number):
+    # The topology reads every device, so this task waits for all of them (and never parses one itself)
+    @uses_sections("vrf definition", "interface", "crypto isakmp", "crypto ipsec")
+    @uses_devices("Toronto", "ISP", "Ottawa", "Oshawa", "TOR-A1", "TOR-A2", "TOR-D1", "TOR-D2")
+    def grade_task_6(self, device_files, spec, topology):
         """
         Grades Task 6: Configure DMVPN Phase 3.
         Validates tunnel interfaces, NHRP, and IPsec configurations. Confirms VRF-INET exists on D2.
         Includes debug print statements for all detected configurations.
         """
-        comments = []
         grade = 38.0  # Total points for Task 6
+        task = TaskGrade("Task 6", grade)
 
         # Devices restricted to Toronto, Ottawa, and Oshawa
         valid_devices = ["Toronto", "Ottawa", "Oshawa", "TOR-D2"]
 
-        # Internet-facing interfaces and their IP addresses
-        internet_interfaces = {
-            "Toronto": {"interface": "GigabitEthernet0/0/1.100", "ip": f"199.212.32.{group_number}"},
-            "Ottawa": {"interface": "GigabitEthernet0/0/1", "ip": f"209.165.200.{group_number}"},
-            "Oshawa": {"interface": "GigabitEthernet0/0/1", "ip": f"198.51.100.{group_number}"}
-        }
-
-        # Tunnel IP addresses based on group number
-        tunnel_ips = {
-            "Toronto": f"10.1.{group_number}.1",
-            "Ottawa": f"10.1.{group_number}.2",
-            "Oshawa": f"10.1.{group_number}.3"
-        }
-
-        internet_ips = {
-            "Toronto": f"199.212.32.{group_number}",
-            "Ottawa": f"209.165.200.{group_number}",
-            "Oshawa": f"198.51.100.{group_number}"
-        }
+        internet_interfaces = spec.internet_interfaces  # Internet-facing interfaces and their IP addresses
+        tunnel_ips = spec.tunnel_ips
+        internet_ips = spec.internet_ips
 
         # Check each device
         for device, filepath in device_files.items():
@@ -1044,7 +1149,7 @@ class CaseStudyGrader:
 
             print(f"[INFO] Grading file: {filepath}")
             try:
-                submission = CiscoConfParse(filepath)
+                submission = self.config_cache.load(filepath)
 
                 # validate VRF configuration on TOR-D2
                 if device == "TOR-D2":
@@ -1055,38 +1160,40 @@ class CaseStudyGrader:
                     print(f"[DEBUG] {device} VRF Definition INET Detected: {bool(vrf_detected)}")
                     if not vrf_detected:
                         print(f"[WARNING] {device} - VRF definition INET not found.")
-                        comments.append(f"{device} Missing VRF definition INET")
-                        grade -= 2.0
                     else:
                         print(f"[INFO] {device} - VRF definition INET exists.")
+                    grade -= task.check("task6.vrf_inet_defined", device, bool(vrf_detected), 2.0,
+                                        f"{device} Missing VRF definition INET")
 
                     # Check for 'vrf forwarding INET' on specific VLAN interfaces
                     for vlan in ["Vlan100", "Vlan300", "Vlan400"]:
-                        vlan_interface = submission.find_objects(rf"^interface {vlan}")
+                        vlan_interface = submission.find_interface(vlan)
                         print(f"[DEBUG] {device} {vlan} Interface Detected: {bool(vlan_interface)}")
+                        grade -= task.check("task6.inet_svi_present", device, bool(vlan_interface), 1.0,
+                                            f"{device} Missing interface {vlan}")
                         if vlan_interface:
                             children = [child.text.strip() for child in vlan_interface[0].children]
                             print(f"[DEBUG] {device} {vlan} Children: {children}")
                             if "vrf forwarding INET" not in children:
                                 print(f"[WARNING] {device} - {vlan} missing 'vrf forwarding INET'.")
-                                comments.append(f"{device} {vlan} missing 'vrf forwarding INET'")
-                                grade -= 1.0
                             else:
                                 print(f"[INFO] {device} - 'vrf forwarding INET' configured on {vlan}.")
+                            grade -= task.check("task6.vrf_forwarding_inet", device, "vrf forwarding INET" in children, 1.0,
+                                                f"{device} {vlan} missing 'vrf forwarding INET'")
                         else:
                             print(f"[WARNING] {device} - Interface {vlan} not found.")
-                            comments.append(f"{device} Missing interface {vlan}")
-                            grade -= 1.0
 
                 # Skip Tunnel1-related checks for TOR-D2
                 elif device in ["Toronto", "Ottawa", "Oshawa"]:
                     
                     # Tunnel Interface Validation
                     print(f"[INFO] Validating Tunnel1 configuration on {device}...")
-                    tunnel_interface = submission.find_objects(r"^interface Tunnel1")
+                    tunnel_interface = submission.find_interface("Tunnel1")
+                    # No points of its own: every tunnel, NHRP and IPSec check below is lost with it
+                    grade -= task.check("task6.tunnel_present", device, bool(tunnel_interface), 0.0,
+                                        f"{device} Missing Tunnel1 interface")
                     if not tunnel_interface:
                         print(f"[WARNING] {device} - Tunnel1 interface not found.")
-                        comments.append(f"{device} Missing Tunnel1 interface")
                         continue
 
                     children = [child.text.strip() for child in tunnel_interface[0].children]
@@ -1095,8 +1202,8 @@ class CaseStudyGrader:
                     # Check multipoint GRE
                     if "tunnel mode gre multipoint" not in children:
                         print(f"[WARNING] {device} - Multipoint GRE not configured on Tunnel1.")
-                        comments.append(f"{device} Missing multipoint GRE")
-                        grade -= 0.5
+                    grade -= task.check("task6.tunnel_mode_mgre", device, "tunnel mode gre multipoint" in children, 0.5,
+                                        f"{device} Missing multipoint GRE")
 
                     # Check tunnel source
                     expected_source_interface = internet_interfaces[device]["interface"]
@@ -1108,52 +1215,49 @@ class CaseStudyGrader:
                     print(f"[DEBUG] {device} Tunnel Source Detected: {tunnel_source_detected}")
                     if not tunnel_source_detected:
                         print(f"[WARNING] {device} - Tunnel source not correctly configured.")
-                        comments.append(f"{device} Incorrect tunnel source")
-                        grade -= 0.5
+                    grade -= task.check("task6.tunnel_source", device, tunnel_source_detected, 0.5,
+                                        f"{device} Incorrect tunnel source")
 
                     # Check tunnel key
-                    expected_key = 3 * group_number
+                    expected_key = spec.tunnel_key
                     tunnel_key_detected = f"tunnel key {expected_key}" in children
                     print(f"[DEBUG] {device} Tunnel Key Detected: {tunnel_key_detected}")
                     if not tunnel_key_detected:
                         print(f"[WARNING] {device} - Tunnel key not correctly configured.")
-                        comments.append(f"{device} Incorrect tunnel key")
-                        grade -= 0.5
+                    grade -= task.check("task6.tunnel_key", device, tunnel_key_detected, 0.5, f"{device} Incorrect tunnel key")
 
                     # Check Tunnel IP address
-                    expected_ip = tunnel_ips[device]
-                    ip_address_detected = any(
-                        f"ip address {expected_ip}" in line for line in children
-                    )
+                    expected_ip = parse_address(tunnel_ips[device])
+                    ip_address_detected = any(entry.address == expected_ip
+                                              for entry in submission.addresses.get("Tunnel1", ()))
                     print(f"[DEBUG] {device} Tunnel IP Address Detected: {ip_address_detected}")
                     if not ip_address_detected:
                         print(f"[WARNING] {device} - Tunnel IP address not correctly configured.")
-                        comments.append(f"{device} Incorrect Tunnel IP address")
-                        grade -= 0.5
+                    grade -= task.check("task6.tunnel_address", device, ip_address_detected, 0.5,
+                                        f"{device} Incorrect Tunnel IP address")
 
                     # Check bandwidth and delay
                     bandwidth_detected = "bandwidth 1000000" in children
                     print(f"[DEBUG] {device} Bandwidth Detected: {bandwidth_detected}")
                     if not bandwidth_detected:
                         print(f"[WARNING] {device} - Bandwidth not correctly configured.")
-                        comments.append(f"{device} Missing bandwidth setting")
-                        grade -= 0.5
-                    expected_delay = 2 * group_number + 20
+                    grade -= task.check("task6.tunnel_bandwidth", device, bandwidth_detected, 0.5,
+                                        f"{device} Missing bandwidth setting")
+                    expected_delay = spec.delay
                     delay_detected = f"delay {expected_delay}" in children
                     print(f"[DEBUG] {device} Delay Detected: {delay_detected}")
                     if not delay_detected:
                         print(f"[WARNING] {device} - Delay not correctly configured.")
-                        comments.append(f"{device} Missing delay setting")
-                        grade -= 0.5
+                    grade -= task.check("task6.tunnel_delay", device, delay_detected, 0.5, f"{device} Missing delay setting")
 
                     # NHRP Validation
                     print(f"[INFO] Validating NHRP configuration on {device}...")
-                    nhrp_network_detected = f"ip nhrp network-id {group_number}" in children
+                    nhrp_network_detected = f"ip nhrp network-id {spec.number}" in children
                     print(f"[DEBUG] {device} NHRP Network-ID Detected: {nhrp_network_detected}")
                     if not nhrp_network_detected:
                         print(f"[WARNING] {device} - NHRP network ID not correctly configured.")
-                        comments.append(f"{device} Missing NHRP network ID")
-                        grade -= 0.5
+                    grade -= task.check("task6.nhrp_network_id", device, nhrp_network_detected, 0.5,
+                                        f"{device} Missing NHRP network ID")
 
                     nhrp_authentication_detected = any(
                         "ip nhrp authentication" in line for line in children
@@ -1161,8 +1265,8 @@ class CaseStudyGrader:
                     print(f"[DEBUG] {device} NHRP Authentication Detected: {nhrp_authentication_detected}")
                     if not nhrp_authentication_detected:
                         print(f"[WARNING] {device} - NHRP authentication not configured.")
-                        comments.append(f"{device} Missing NHRP authentication")
-                        grade -= 0.5
+                    grade -= task.check("task6.nhrp_authentication", device, nhrp_authentication_detected, 0.5,
+                                        f"{device} Missing NHRP authentication")
 
                     # Check for 'ip nhrp redirect' in Toronto
                     if device == "Toronto":
@@ -1172,41 +1276,37 @@ class CaseStudyGrader:
                         print(f"[DEBUG] {device} NHRP Redirect Detected: {nhrp_redirect_detected}")
                         if not nhrp_redirect_detected:
                             print(f"[WARNING] {device} - NHRP redirect not configured.")
-                            comments.append(f"{device} Missing NHRP redirect")
-                            grade -= 1.0
+                        grade -= task.check("task6.nhrp_redirect", device, nhrp_redirect_detected, 1.0,
+                                            f"{device} Missing NHRP redirect")
 
                     # check for ip nhrp nhs on Ottawa and Oshawa, set to Toronto's tunnel IP
+                    hub_tunnel_ip, hub_public_ip = parse_address(tunnel_ips['Toronto']), parse_address(internet_ips['Toronto'])
+                    tunnel_node = topology.tunnel(device)
                     if device in ["Ottawa", "Oshawa"]:
-                        nhrp_nhs_detected = any(
-                            f"ip nhrp nhs {tunnel_ips['Toronto']}" in line for line in children
-                        )
+                        nhrp_nhs_detected = hub_tunnel_ip in tunnel_node.nhs
                         print(f"[DEBUG] {device} NHRP NHS Detected: {nhrp_nhs_detected}")
                         if not nhrp_nhs_detected:
                             print(f"[WARNING] {device} - NHRP NHS not configured to Toronto's tunnel IP.")
-                            comments.append(f"{device} Incorrect NHRP NHS configuration")
-                            grade -= 1.0
+                        grade -= task.check("task6.nhrp_nhs", device, nhrp_nhs_detected, 1.0,
+                                            f"{device} Incorrect NHRP NHS configuration")
 
                     # check for static mapping of toronto's tunnel IP to its public IP on Ottawa and Oshawa
                     if device in ["Ottawa", "Oshawa"]:
-                        nhrp_static_mapping_detected = any(
-                            f"ip nhrp map {tunnel_ips['Toronto']} {internet_ips['Toronto']}" in line for line in children
-                        )
+                        nhrp_static_mapping_detected = tunnel_node.maps.get(hub_tunnel_ip) == hub_public_ip
                         print(f"[DEBUG] {device} NHRP Static Mapping Detected: {nhrp_static_mapping_detected}")
                         if not nhrp_static_mapping_detected:
                             print(f"[WARNING] {device} - NHRP static mapping not configured for Toronto's tunnel IP.")
-                            comments.append(f"{device} Missing NHRP static mapping for Toronto's tunnel IP")
-                            grade -= 1.0
+                        grade -= task.check("task6.nhrp_hub_mapping", device, nhrp_static_mapping_detected, 1.0,
+                                            f"{device} Missing NHRP static mapping for Toronto's tunnel IP")
 
                     # check for static mapping of multicast to toronto's tunnel IP on Ottawa and Oshawa
                     if device in ["Ottawa", "Oshawa"]:
-                        nhrp_multicast_mapping_detected = any(
-                            f"ip nhrp map multicast {internet_ips['Toronto']}" in line for line in children
-                        )
+                        nhrp_multicast_mapping_detected = hub_public_ip in tunnel_node.multicast
                         print(f"[DEBUG] {device} NHRP Multicast Mapping Detected: {nhrp_multicast_mapping_detected}")
                         if not nhrp_multicast_mapping_detected:
                             print(f"[WARNING] {device} - NHRP multicast mapping not configured for Toronto's tunnel IP.")
-                            comments.append(f"{device} Missing NHRP multicast mapping for Toronto's tunnel IP")
-                            grade -= 1.0
+                        grade -= task.check("task6.nhrp_hub_multicast", device, nhrp_multicast_mapping_detected, 1.0,
+                                            f"{device} Missing NHRP multicast mapping for Toronto's tunnel IP")
 
                     # IPSec Validation
                     print(f"[INFO] Validating IPSec configuration on {device}...")
@@ -1216,95 +1316,102 @@ class CaseStudyGrader:
                     print(f"[DEBUG] {device} ISAKMP Key Detected: {isakmp_detected}")
                     if not isakmp_detected:
                         print(f"[WARNING] {device} - ISAKMP key not correctly configured.")
-                        comments.append(f"{device} Missing ISAKMP key")
-                        grade -= 0.5
+                    grade -= task.check("task6.isakmp_key", device, bool(isakmp_detected), 0.5, f"{device} Missing ISAKMP key")
 
                     # 2. Validate IKE Policy and Child Commands
-                    ike_policy_obj = submission.find_objects(rf"^crypto isakmp policy {group_number}")
+                    ike_policy_obj = submission.find_objects(rf"^crypto isakmp policy {spec.number}")
                     print(f"[DEBUG] {device} IKE Policy Detected: {ike_policy_obj}")
+                    grade -= task.check("task6.ike_policy_present", device, bool(ike_policy_obj), 0.5,
+                                        f"{device} Missing IKE policy {spec.number}")
                     if not ike_policy_obj:
-                        print(f"[WARNING] {device} - IKE policy {group_number} not found.")
-                        comments.append(f"{device} Missing IKE policy {group_number}")
-                        grade -= 0.5
+                        print(f"[WARNING] {device} - IKE policy {spec.number} not found.")
                     else:
                         ike_policy_children = [child.text.strip() for child in ike_policy_obj[0].children]
                         print(f"[DEBUG] {device} IKE Policy Children: {ike_policy_children}")
                         for setting in ["sha512", "aes 256", "pre-share", "group 14"]:
                             if setting not in " ".join(ike_policy_children):
                                 print(f"[WARNING] {device} - IKE policy missing required attribute: {setting}.")
-                                comments.append(f"{device} Incorrect IKE policy {setting}")
-                                grade -= 1.5
+                            grade -= task.check("task6.ike_policy_setting", device, setting in " ".join(ike_policy_children),
+                                                1.5, f"{device} Incorrect IKE policy {setting}")
 
                     # 3. Validate IPSec Transform Set
                     transform_set_obj = submission.find_objects(r"^crypto ipsec transform-set .*_TRANS")
                     print(f"[DEBUG] {device} IPSec Transform Set Detected: {transform_set_obj}")
+                    grade -= task.check("task6.transform_set_present", device, bool(transform_set_obj), 0.5,
+                                        f"{device} Missing IPSec transform set")
                     if not transform_set_obj:
                         print(f"[WARNING] {device} - IPSec transform set not correctly configured.")
-                        comments.append(f"{device} Missing IPSec transform set")
-                        grade -= 0.5
                     else:
                         # Parse the parent line for encryption and hash
                         transform_set_line = transform_set_obj[0].text.strip()
                         print(f"[DEBUG] {device} Transform Set Parent Line: {transform_set_line}")
                         if "esp-aes 256" not in transform_set_line:
                             print(f"[WARNING] {device} - IPSec transform set missing encryption esp-aes 256.")
-                            comments.append(f"{device} Incorrect IPSec transform set encryption")
-                            grade -= 0.5
+                        grade -= task.check("task6.transform_set_encryption", device, "esp-aes 256" in transform_set_line,
+                                            0.5, f"{device} Incorrect IPSec transform set encryption")
                         if "esp-sha512-hmac" not in transform_set_line:
                             print(f"[WARNING] {device} - IPSec transform set missing hash esp-sha512-hmac.")
-                            comments.append(f"{device} Incorrect IPSec transform set hash")
-                            grade -= 0.5
+                        grade -= task.check("task6.transform_set_hash", device, "esp-sha512-hmac" in transform_set_line,
+                                            0.5, f"{device} Incorrect IPSec transform set hash")
 
                         # Parse child lines for mode transport
                         transform_set_children = [child.text.strip() for child in transform_set_obj[0].children]
                         print(f"[DEBUG] {device} Transform Set Children: {transform_set_children}")
                         if "mode transport" not in transform_set_children:
                             print(f"[WARNING] {device} - IPSec transform set missing mode transport.")
-                            comments.append(f"{device} Incorrect IPSec transform set mode")
-                            grade -= 0.5
+                        grade -= task.check("task6.transform_set_mode", device, "mode transport" in transform_set_children,
+                                            0.5, f"{device} Incorrect IPSec transform set mode")
 
                     # 4. Validate IPSec Profile
                     profile_obj = submission.find_objects(r"^crypto ipsec profile .*_PROFILE")
                     print(f"[DEBUG] {device} IPSec Profile Detected: {profile_obj}")
+                    grade -= task.check("task6.ipsec_profile_present", device, bool(profile_obj), 0.5,
+                                        f"{device} Missing IPSec profile")
                     if not profile_obj:
                         print(f"[WARNING] {device} - IPSec profile not correctly configured.")
-                        comments.append(f"{device} Missing IPSec profile")
-                        grade -= 0.5
                     else:
                         profile_children = [child.text.strip() for child in profile_obj[0].children]
                         print(f"[DEBUG] {device} IPSec Profile Children: {profile_children}")
                         if f"set transform-set" not in " ".join(profile_children):
                             print(f"[WARNING] {device} - IPSec profile does not reference correct transform set.")
-                            comments.append(f"{device} Missing IPSec profile transform-set reference")
-                            grade -= 0.5
+                        grade -= task.check("task6.ipsec_profile_transform_set", device,
+                                            "set transform-set" in " ".join(profile_children), 0.5,
+                                            f"{device} Missing IPSec profile transform-set reference")
 
                     # 5. Check if IPSec Profile Applied to Tunnel1
-                    tunnel_interface = submission.find_objects(r"^interface Tunnel1")
+                    tunnel_interface = submission.find_interface("Tunnel1")
                     children = [child.text.strip() for child in tunnel_interface[0].children]
                     print(f"[DEBUG] {device} Tunnel1 Children: {children}")
                     profile_applied = f"tunnel protection ipsec profile" in " ".join(children)
                     print(f"[DEBUG] {device} Tunnel Protection Applied: {profile_applied}")
                     if not profile_applied:
                         print(f"[WARNING] {device} - Tunnel protection not correctly configured.")
-                        comments.append(f"{device} Missing tunnel protection for IPSec profile")
-                        grade -= 0.5
+                    grade -= task.check("task6.tunnel_protection", device, profile_applied, 0.5,
+                                        f"{device} Missing tunnel protection for IPSec profile")
 
             except Exception as e:
                 print(f"[ERROR] {device}: Failed to parse configuration - {e}")
-                comments.append(f"{device} Parse error")
+                task.note("task6.config_parsed", device, f"{device} Parse error")
+
+        try:
+            topology.report("dmvpn")
+        except Exception as e:
+            print(f"[ERROR] Could not build the group topology - {e}")
 
         # Final Grade
         grade = max(0, grade)  # Ensure grade doesn't go below 0
-        return {"grade": grade, "comments": " | ".join(comments)}
+        return task.result(grade)
 
-    def grade_task_7(self, device_files, group_number):
+    @uses_sections("router eigrp", "ip route")
+    @uses_devices("Toronto", "ISP", "Ottawa", "Oshawa", "TOR-D1", "TOR-D2")
+    def grade_task_7(self, device_files, spec):
         """
         Grades Task 7: Configure Routing.
         Dynamically parses EIGRP address-family ipv4 for network commands and router ID validation.
         Excludes EIGRP checks for TOR-D1 and TOR-D2, validating only static routes for these devices.
         """
-        comments = []
         grade = 18.0  # Total points for Task 7
+        task = TaskGrade("Task 7", grade)
 
         # Devices restricted to Toronto, ISP, Ottawa, Oshawa, TOR-D1, and TOR-D2
         valid_devices = ["Toronto", "ISP", "Ottawa", "Oshawa", "TOR-D1", "TOR-D2"]
@@ -1318,17 +1425,13 @@ class CaseStudyGrader:
         }
 
         # Forbidden Internet/Underlay Networks
-        forbidden_networks = {
-            "Toronto": "199.212.32.xx",
-            "Ottawa": "209.165.200.xx",
-            "Oshawa": "198.51.100.xx"
-        }
+        forbidden_networks = spec.internet_ips
 
         # Required network prefixes
         tunnel_prefixes = {
-            "Toronto": ["10.1.xx.0"],
-            "Ottawa": ["10.1.xx.0"],
-            "Oshawa": ["10.1.xx.0"]
+            "Toronto": [spec.tunnel_network],
+            "Ottawa": [spec.tunnel_network],
+            "Oshawa": [spec.tunnel_network]
         }
 
         mpls_prefixes = {
@@ -1344,14 +1447,9 @@ class CaseStudyGrader:
             "Oshawa": ["4.4.4.4", "172.16.87.0", "172.16.88.0", "172.16.89.0"]
         }
 
-        # Static routes for TOR-D1 and TOR-D2
-        static_default_route = f"ip route 0.0.0.0 0.0.0.0 172.16.{group_number}.1"
-
-        # Static route for Toronto
-        toronto_static_route = f"ip route 172.16.0.0 255.255.0.0 172.16.{group_number}.254"
-
-        # Regex for dynamic EIGRP process name
-        eigrp_process_name = rf"OntarioTech0?{group_number}"
+        static_default_route = spec.static_default_route  # TOR-D1 and TOR-D2
+        toronto_static_route = spec.toronto_static_route
+        eigrp_process_name = spec.eigrp_process_name  # Regex
 
         # Check each device
         for device, filepath in device_files.items():
@@ -1361,33 +1459,33 @@ class CaseStudyGrader:
 
             print(f"[INFO] Grading file: {filepath}")
             try:
-                submission = CiscoConfParse(filepath)
+                submission = self.config_cache.load(filepath)
 
                 # Static Routes Validation for TOR-D1 and TOR-D2
                 if device in ["TOR-D1", "TOR-D2"]:
                     print(f"[INFO] Validating static default route on {device}...")
                     if static_default_route not in submission.ioscfg:
                         print(f"[WARNING] {device} - Missing static default route {static_default_route}.")
-                        comments.append(f"{device} Missing static default route {static_default_route}")
-                        grade -= 1.0
+                    grade -= task.check("task7.static_default_route", device, static_default_route in submission.ioscfg,
+                                        1.0, f"{device} Missing static default route {static_default_route}")
                     continue  # Skip EIGRP checks for TOR-D1 and TOR-D2
 
                 # EIGRP Configuration Validation (Remaining Devices)
                 print(f"[INFO] Validating EIGRP configuration on {device}...")
                 eigrp_obj = submission.find_objects(rf"^router eigrp {eigrp_process_name}")
                 print(f"[DEBUG] {device} EIGRP Process Detected: {eigrp_obj}")
+                grade -= task.check("task7.eigrp_process", device, bool(eigrp_obj), 0.5,
+                                    f"{device} Missing or incorrect EIGRP process")
                 if not eigrp_obj:
                     print(f"[WARNING] {device} - EIGRP process {eigrp_process_name} not found.")
-                    comments.append(f"{device} Missing or incorrect EIGRP process")
-                    grade -= 0.5
                 else:
                     # Address Family Validation
-                    address_family_obj = eigrp_obj[0].re_search_children(rf"^ address-family ipv4 unicast autonomous-system {group_number}")
+                    address_family_obj = eigrp_obj[0].re_search_children(rf"^ address-family ipv4 unicast autonomous-system {spec.number}")
                     print(f"[DEBUG] {device} Address Family Detected: {address_family_obj}")
+                    grade -= task.check("task7.eigrp_address_family", device, bool(address_family_obj), 1.0,
+                                        f"{device} Missing EIGRP address-family configuration")
                     if not address_family_obj:
-                        print(f"[WARNING] {device} - EIGRP address-family for AS {group_number} not found.")
-                        comments.append(f"{device} Missing EIGRP address-family configuration")
-                        grade -= 1.0
+                        print(f"[WARNING] {device} - EIGRP address-family for AS {spec.number} not found.")
                     else:
                         # Parse all children of address-family ipv4
                         address_family_children = [child.text.strip() for child in address_family_obj[0].children]
@@ -1397,16 +1495,14 @@ class CaseStudyGrader:
                         # check if toronto, ottawa, oshawa have network command for tunnel prefixes
                         if device in ["Toronto", "Ottawa", "Oshawa"]:
                             print(f"[INFO] Validating tunnel prefixes for {device}...")
-                            for prefix in tunnel_prefixes[device]:
-                                # Replace 'xx' with the group number in the prefix
-                                formatted_prefix = prefix.replace("xx", str(group_number))
-                                
+                            for formatted_prefix in tunnel_prefixes[device]:
                                 # Regex to match the "network <prefix>" part, ignoring any masks
                                 regex = rf"^network\s+{re.escape(formatted_prefix)}"
-                                if not any(re.match(regex, line) for line in address_family_children):
+                                advertised = any(re.match(regex, line) for line in address_family_children)
+                                if not advertised:
                                     print(f"[WARNING] {device} - Missing network command for prefix {formatted_prefix}.")
-                                    comments.append(f"{device} Missing network command for prefix {formatted_prefix}")
-                                    grade -= 1.0
+                                grade -= task.check("task7.tunnel_network", device, advertised, 1.0,
+                                                    f"{device} Missing network command for prefix {formatted_prefix}")
 
                         # check if toronto, isp, ottawa have network command for mpls prefixes
                         if device in ["Toronto", "ISP", "Ottawa"]:
@@ -1414,10 +1510,11 @@ class CaseStudyGrader:
                             for prefix in mpls_prefixes[device]:
                                 # Regex to match the "network <prefix>" part, ignoring any masks
                                 regex = rf"^network\s+{re.escape(prefix)}"
-                                if not any(re.match(regex, line) for line in address_family_children):
+                                advertised = any(re.match(regex, line) for line in address_family_children)
+                                if not advertised:
                                     print(f"[WARNING] {device} - Missing network command for prefix {prefix}.")
-                                    comments.append(f"{device} Missing network command for prefix {prefix}")
-                                    grade -= 1.0
+                                grade -= task.check("task7.mpls_network", device, advertised, 1.0,
+                                                    f"{device} Missing network command for prefix {prefix}")
 
                         # check if toronto, isp, ottawa, oshawa have network command for loopback prefixes
                         if device in ["Toronto", "ISP", "Ottawa", "Oshawa"]:
@@ -1425,47 +1522,53 @@ class CaseStudyGrader:
                             for prefix in loopback_prefixes[device]:
                                 # Regex to match the "network <prefix>" part, ignoring any masks
                                 regex = rf"^network\s+{re.escape(prefix)}"
-                                if not any(re.match(regex, line) for line in address_family_children):
+                                advertised = any(re.match(regex, line) for line in address_family_children)
+                                if not advertised:
                                     print(f"[WARNING] {device} - Missing network command for prefix {prefix}.")
-                                    comments.append(f"{device} Missing network command for prefix {prefix}")
-                                    grade -= 0.5
+                                grade -= task.check("task7.loopback_network", device, advertised, 0.5,
+                                                    f"{device} Missing network command for prefix {prefix}")
 
                         # Forbidden Network Validation
-                        forbidden_network = forbidden_networks.get(device, "").replace("xx", str(group_number))
-                        if forbidden_network and forbidden_network in [child.split()[1] for child in address_family_children if child.startswith("network")]:
-                            print(f"[WARNING] {device} - Forbidden network command found for prefix {forbidden_network}.")
-                            comments.append(f"{device} Forbidden network command for prefix {forbidden_network}")
-                            grade -= 1.0
+                        forbidden_network = forbidden_networks.get(device, "")
+                        if forbidden_network:
+                            networks = [child.split()[1] for child in address_family_children if child.startswith("network")]
+                            if forbidden_network in networks:
+                                print(f"[WARNING] {device} - Forbidden network command found for prefix {forbidden_network}.")
+                            grade -= task.check("task7.no_internet_network", device, forbidden_network not in networks, 1.0,
+                                                f"{device} Forbidden network command for prefix {forbidden_network}")
 
                         # Router-ID Validation
-                        if f"eigrp router-id {router_ids[device]}" not in address_family_children:
+                        router_id = f"eigrp router-id {router_ids[device]}" in address_family_children
+                        if not router_id:
                             print(f"[WARNING] {device} - Router-ID {router_ids[device]} not configured under address-family ipv4.")
-                            comments.append(f"{device} Missing Router-ID {router_ids[device]} under address-family ipv4")
-                            grade -= 0.5
+                        grade -= task.check("task7.eigrp_router_id", device, router_id, 0.5,
+                                            f"{device} Missing Router-ID {router_ids[device]} under address-family ipv4")
 
                     # Static Route Validation for Toronto
                     if device == "Toronto":
                         print(f"[INFO] Validating static route on Toronto...")
                         if toronto_static_route not in submission.ioscfg:
                             print(f"[WARNING] Toronto - Missing static route {toronto_static_route}.")
-                            comments.append(f"Toronto Missing static route {toronto_static_route}")
-                            grade -= 1.0
+                        grade -= task.check("task7.toronto_static_route", device, toronto_static_route in submission.ioscfg,
+                                            1.0, f"Toronto Missing static route {toronto_static_route}")
 
             except Exception as e:
                 print(f"[ERROR] {device}: Failed to parse configuration - {e}")
-                comments.append(f"{device} Parse error")
+                task.note("task7.config_parsed", device, f"{device} Parse error")
 
         # Final Grade
         grade = max(0, grade)  # Ensure grade doesn't go below 0
-        return {"grade": grade, "comments": " | ".join(comments)}
+        return task.result(grade)
 
+    @uses_sections("clock", "ntp")
+    @uses_devices("Toronto", "ISP", "Ottawa", "Oshawa", "TOR-A1", "TOR-A2", "TOR-D1", "TOR-D2")
     def grade_task_8(self, device_files):
         """
         Grades Task 8: Configure IP Services.
         Validates time zone, NTP server configuration, and time synchronization across devices.
         """
-        comments = []
         grade = 12.5  # Total points for Task 8
+        task = TaskGrade("Task 8", grade)
 
         # NTP server IP addresses
         isp_loopback1_ip = "2.2.2.2"  # ISP's Loopback1 IP
@@ -1480,7 +1583,7 @@ class CaseStudyGrader:
             print(f"[INFO] Grading file: {filepath}")
 
             try:
-                submission = CiscoConfParse(filepath)
+                submission = self.config_cache.load(filepath)
 
                 # 1. Time Zone and Daylight Savings Validation
                 print(f"[INFO] Validating time zone settings on {device}...")
@@ -1491,12 +1594,12 @@ class CaseStudyGrader:
 
                 if not timezone_detected:
                     print(f"[WARNING] {device} - Time zone not correctly configured.")
-                    comments.append(f"{device} Missing or incorrect time zone configuration")
-                    grade -= 0.5
+                grade -= task.check("task8.clock_timezone", device, bool(timezone_detected), 0.5,
+                                    f"{device} Missing or incorrect time zone configuration")
                 if not summertime_detected:
                     print(f"[WARNING] {device} - Daylight savings time not correctly configured.")
-                    comments.append(f"{device} Missing or incorrect daylight savings time configuration")
-                    grade -= 0.5
+                grade -= task.check("task8.clock_summer_time", device, bool(summertime_detected), 0.5,
+                                    f"{device} Missing or incorrect daylight savings time configuration")
 
                 # 2. ISP as Stratum 2 NTP Server
                 if device == "ISP":
@@ -1506,8 +1609,8 @@ class CaseStudyGrader:
 
                     if not ntp_master_detected:
                         print(f"[WARNING] ISP - NTP master configuration missing or incorrect.")
-                        comments.append("ISP Missing or incorrect NTP master configuration")
-                        grade -= 1.0
+                    grade -= task.check("task8.ntp_master", device, bool(ntp_master_detected), 1.0,
+                                        "ISP Missing or incorrect NTP master configuration")
 
                 # 3. Synchronization for Toronto, Ottawa, Oshawa
                 if device in ntp_synchronize_isp:
@@ -1517,8 +1620,8 @@ class CaseStudyGrader:
 
                     if not ntp_server_detected:
                         print(f"[WARNING] {device} - NTP synchronization with ISP missing or incorrect.")
-                        comments.append(f"{device} Missing or incorrect NTP synchronization with ISP")
-                        grade -= 0.5
+                    grade -= task.check("task8.ntp_server_isp", device, bool(ntp_server_detected), 0.5,
+                                        f"{device} Missing or incorrect NTP synchronization with ISP")
 
                 # 4. Synchronization for TOR-D1, TOR-D2, TOR-A1, TOR-A2
                 if device in ntp_synchronize_toronto:
@@ -1528,16 +1631,16 @@ class CaseStudyGrader:
 
                     if not ntp_server_detected:
                         print(f"[WARNING] {device} - NTP synchronization with Toronto missing or incorrect.")
-                        comments.append(f"{device} Missing or incorrect NTP synchronization with Toronto")
-                        grade -= 0.5
+                    grade -= task.check("task8.ntp_server_toronto", device, bool(ntp_server_detected), 0.5,
+                                        f"{device} Missing or incorrect NTP synchronization with Toronto")
 
             except Exception as e:
                 print(f"[ERROR] {device}: Failed to parse configuration - {e}")
-                comments.append(f"{device} Parse error")
+                task.note("task8.config_parsed", device, f"{device} Parse error")
 
         # Final Grade
         grade = max(0, grade)  # Ensure grade doesn't go below 0
-        return {"grade": grade, "comments": " | ".join(comments)}
+        return task.result(grade)
 
     def write_to_csv(self, group_name, task_name, grade, comments):
         """Writes group task grade and summary comments to CSV, task by task."""
@@ -1554,6 +1657,34 @@ class CaseStudyGrader:
             # Write the task details row
             csv_writer.writerow([group_name, task_name, grade, comments])
 
+    def update_group_rows(self, group_name, results):
+        """Replaces a group's task rows in the output CSV in place, or appends them for a new group."""
+        rows = []
+        if os.path.isfile(self.output_csv):
+            with open(self.output_csv, newline='') as csvfile:
+                rows = list(csv.reader(csvfile))
+        header = rows[0] if rows else ["Group Name", "Task Name", "Grade", "Comments"]
+        new_rows = [[group_name, task_name, task_results["grade"], task_results["comments"]]
+                    for task_name, task_results in results.items()]
+
+        updated = [header]
+        inserted = False
+        for row in rows[1:]:
+            if row and row[0] == group_name:
+                if not inserted:
+                    updated.extend(new_rows)  # Keep the group where it already was in the file
+                    inserted = True
+                continue
+            updated.append(row)
+        if not inserted:
+            updated.extend(new_rows)
+
+        # Write next to the output and swap it in so readers never see a half-written file
+        temp_path = f"{self.output_csv}.tmp"
+        with open(temp_path, 'w', newline='') as csvfile:
+            csv.writer(csvfile).writerows(updated)
+        os.replace(temp_path, self.output_csv)
+
 # Entry point of the program
 if __name__ == "__main__":
     grader = CaseStudyGrader()
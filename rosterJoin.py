@@ -0,0 +1,125 @@
+import re
+import csv
+import argparse
+from canvasFetch import CanvasAPI, API_TOKEN, BASE_URL
+from canvasStore import CanvasStore
+
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+
+def load_results(results_csv):
+    """Reads grading_results.csv into {group name: [(task name, grade, comments), ...]} in file order."""
+    results = {}
+    with open(results_csv, newline='') as csvfile:
+        for row in csv.DictReader(csvfile):
+            results.setdefault(row["Group Name"], []).append((row["Task Name"], float(row["Grade"]), row["Comments"]))
+    return results
+
+
+def normalize_group_name(name):
+    """Lowercases a group or folder name and drops spaces and punctuation ('Group_10 ' -> 'group10')."""
+    return NON_ALPHANUMERIC.sub("", name.lower())
+
+
+def group_number_of(name):
+    """Every digit in the name read as one number, like CaseStudyGrader.extract_group_number; None if none."""
+    digits = "".join(filter(str.isdigit, name))
+    return int(digits) if digits else None
+
+
+class RosterIndex:
+    """Hash indexes over a roster's groups so submission folders can be matched in one pass.
+
+    A folder matches a group with the same normalized name, or failing that the only group with its number.
+    """
+
+    def __init__(self, roster):
+        self.student_names, self.group_names, self.group_members = roster
+        self.by_name = {}
+        self.by_number = {}
+        for group_id, name in self.group_names.items():
+            self.by_name.setdefault(normalize_group_name(name), group_id)
+            number = group_number_of(name)
+            if number is not None:
+                # A number shared by two groups can't identify either; keep None so it never matches
+                self.by_number[number] = None if number in self.by_number else group_id
+
+    def match(self, folder):
+        """Returns the group ID for a submission folder name, or None."""
+        group_id = self.by_name.get(normalize_group_name(folder))
+        if group_id is None:
+            number = group_number_of(folder)
+            group_id = self.by_number.get(number) if number is not None else None
+        return group_id
+
+    def join(self, folders):
+        """Matches every folder; returns ({folder: group ID}, unmatched folders). Warns about every kind of miss.
+
+        Folders that match the same group are all left unmatched: there is no telling which one to grade it by.
+        """
+        unmatched = []
+        claimed = {}  # Group ID -> [folder, ...]
+        for folder in folders:
+            group_id = self.match(folder)
+            if group_id is None:
+                unmatched.append(folder)
+                print(f"[WARNING] Folder {folder} does not match any group in the roster.")
+                continue
+            claimed.setdefault(group_id, []).append(folder)
+
+        matched = {}
+        for group_id, claimants in claimed.items():
+            if len(claimants) > 1:
+                print(f"[WARNING] Folders {', '.join(claimants)} all match {self.group_names[group_id]}; "
+                      f"none of them is used. Rename or remove the extra folders.")
+                unmatched.extend(claimants)
+                continue
+            matched[claimants[0]] = group_id
+        for group_id, name in self.group_names.items():
+            if group_id not in claimed:
+                print(f"[WARNING] {name} has no graded submission folder.")
+        return matched, unmatched
+
+
+def export_student_grades(results, roster, output_csv):
+    """Writes one row per student with their group's task grades and total; returns the unmatched folders."""
+    index = RosterIndex(roster)
+    matched, unmatched = index.join(results)
+    task_names = list(dict.fromkeys(task_name for tasks in results.values() for task_name, _, _ in tasks))
+    rows = 0
+    with open(output_csv, 'w', newline='') as csvfile:
+        csv_writer = csv.writer(csvfile)
+        csv_writer.writerow(["Student ID", "Student Name", "Group Name", "Submission Folder"] + task_names + ["Total"])
+        for folder, group_id in matched.items():
+            grades = {task_name: grade for task_name, grade, _ in results[folder]}
+            breakdown = [grades.get(task_name, "") for task_name in task_names]
+            total = sum(grades.values())
+            for student_id in index.group_members[group_id]:
+                csv_writer.writerow([student_id, index.student_names.get(student_id, ""), index.group_names[group_id],
+                                     folder] + breakdown + [total])
+                rows += 1
+        for folder in unmatched:
+            csv_writer.writerow(["", "UNMATCHED", "", folder] + [""] * len(task_names) + [""])
+    print(f"[INFO] Wrote {rows} student rows to {output_csv} ({len(unmatched)} unmatched folders)")
+    return unmatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write per-student grades by joining grading results to the roster.")
+    parser.add_argument("--results", default="grading_results.csv", help="Results CSV written by the grader")
+    parser.add_argument("--roster", default="groups_and_members.csv", help="Roster written by canvasFetch.py")
+    parser.add_argument("--course", type=int, help="Read this course's roster from the metadata store instead")
+    parser.add_argument("--store", default="canvas_metadata.db", help="Canvas metadata store")
+    parser.add_argument("--output", default="student_grades.csv", help="Per-student CSV to write")
+    args = parser.parse_args()
+
+    if args.course is not None:
+        roster = CanvasStore(args.store).roster(args.course)
+    else:
+        with CanvasAPI(API_TOKEN, BASE_URL) as canvas_api:
+            roster = canvas_api.load_names_from_csv(args.roster)
+    export_student_grades(load_results(args.results), roster, args.output)
+
+
+if __name__ == '__main__':
+    main()
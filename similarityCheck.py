@@ -0,0 +1,142 @@
+import os
+import io
+import csv
+import time
+import random
+import argparse
+import contextlib
+from main import CaseStudyGrader
+from configIndex import ConfigCache
+from answerKey import IGNORED_LINES, group_values, substitute_line
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 61) - 1
+
+# Placeholders every group's own values are rewritten to, so two groups' configs compare as if they had one number
+PLACEHOLDERS = {family: f"<{family}>" for family in group_values(0)}
+
+
+class SimilarityDetector:
+    """Finds groups whose configs share unusually many lines, using MinHash signatures and LSH banding."""
+
+    def __init__(self, submissions_dir, bands=32, rows=4, threshold=0.5, common_fraction=0.2, seed=1, grader=None):
+        self.submissions_dir = submissions_dir
+        self.bands = bands
+        self.rows = rows  # bands * rows MinHash values per group; candidates share all rows of some band
+        self.threshold = threshold  # Verified Jaccard similarity needed to report a pair
+        self.common_fraction = common_fraction  # Lines found in more groups than this are case-study boilerplate
+        self.grader = grader or CaseStudyGrader()
+        self.config_cache = ConfigCache(max_resident=16)  # Unfiltered: copied banners and ACLs are evidence too
+        rng = random.Random(seed)
+        self.permutations = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                             for _ in range(bands * rows)]
+
+    def group_shingles(self, group, group_path):
+        """Returns the set of (device, previous line, line) shingles of one group, group values normalized."""
+        digits = "".join(filter(str.isdigit, group))
+        values = group_values(int(digits)) if digits else None
+        with contextlib.redirect_stdout(io.StringIO()):
+            device_files = self.grader.map_files_to_devices(group_path)
+
+        shingles = set()
+        for device, filepath in device_files.items():
+            try:
+                config = self.config_cache.load(filepath)
+            except Exception as e:
+                print(f"[ERROR] Failed to load {filepath}: {e}")
+                continue
+            previous = ""
+            for line in config.lines:
+                text = line.text.strip()
+                if not text or IGNORED_LINES.match(text):
+                    continue
+                if values is not None:
+                    text = substitute_line(text, values, PLACEHOLDERS)
+                shingles.add((device, previous, text))
+                previous = text
+        self.config_cache.release_group(group_path)
+        return shingles
+
+    def signature(self, hashes):
+        """MinHash signature of a set of integer hashes: the minimum of each permutation over the set."""
+        return tuple(min((a * value + b) % MERSENNE_PRIME for value in hashes) for a, b in self.permutations)
+
+    def run(self):
+        """Returns suspicious pairs as (similarity, group a, group b, shared shingles), most similar first."""
+        started = time.time()
+        groups = sorted(group for group in os.listdir(self.submissions_dir)
+                        if os.path.isdir(os.path.join(self.submissions_dir, group)))
+        print(f"[INFO] Shingling {len(groups)} groups...")
+        shingles = {}
+        for group in groups:
+            group_shingles = self.group_shingles(group, os.path.join(self.submissions_dir, group))
+            if group_shingles:
+                shingles[group] = group_shingles
+
+        # Every correct submission shares most of the case study; only compare what few groups have in common
+        frequency = {}
+        for group_shingles in shingles.values():
+            for shingle in group_shingles:
+                frequency[shingle] = frequency.get(shingle, 0) + 1
+        limit = max(2, int(self.common_fraction * len(shingles)))
+        rare = {group: {shingle for shingle in group_shingles if frequency[shingle] <= limit}
+                for group, group_shingles in shingles.items()}
+        rare = {group: group_shingles for group, group_shingles in rare.items() if group_shingles}
+        print(f"[INFO] {len(rare)} groups have lines shared by at most {limit} groups.")
+
+        buckets = {}
+        for group, group_shingles in rare.items():
+            signature = self.signature([hash(shingle) & MAX_HASH for shingle in group_shingles])
+            for band in range(self.bands):
+                key = (band, signature[band * self.rows:(band + 1) * self.rows])
+                buckets.setdefault(key, []).append(group)
+
+        candidates = set()
+        for members in buckets.values():
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    candidates.add((first, second))
+
+        pairs = []
+        for first, second in candidates:
+            shared = rare[first] & rare[second]
+            similarity = len(shared) / len(rare[first] | rare[second])
+            if similarity >= self.threshold:
+                pairs.append((similarity, first, second, shared))
+        pairs.sort(key=lambda pair: (-pair[0], pair[1], pair[2]))
+        print(f"[INFO] Verified {len(candidates)} candidate pairs; {len(pairs)} at or above {self.threshold:.2f} "
+              f"({time.time() - started:.2f}s).")
+        return pairs
+
+    def write_report(self, pairs, output_csv):
+        """Writes the ranked pairs with a sample of the lines they share."""
+        with open(output_csv, 'w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(["Rank", "Group A", "Group B", "Similarity", "Shared Lines", "Sample"])
+            for rank, (similarity, first, second, shared) in enumerate(pairs, start=1):
+                sample = " | ".join(f"{device}: {text}" for device, _, text in sorted(shared)[:5])
+                csv_writer.writerow([rank, first, second, f"{similarity:.3f}", len(shared), sample])
+        print(f"[INFO] Wrote similarity report: {output_csv}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank group pairs whose configs look copied from each other.")
+    parser.add_argument("submissions_dir", help="Folder containing one sub-folder per group")
+    parser.add_argument("--output", default="similarity_report.csv", help="CSV report to write")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Similarity needed to report a pair")
+    parser.add_argument("--bands", type=int, default=32, help="LSH bands")
+    parser.add_argument("--rows", type=int, default=4, help="MinHash rows per band")
+    parser.add_argument("--common-fraction", type=float, default=0.2,
+                        help="Ignore lines found in more than this fraction of groups")
+    args = parser.parse_args()
+
+    detector = SimilarityDetector(args.submissions_dir, bands=args.bands, rows=args.rows, threshold=args.threshold,
+                                  common_fraction=args.common_fraction)
+    pairs = detector.run()
+    for rank, (similarity, first, second, shared) in enumerate(pairs[:10], start=1):
+        print(f"[RESULT] {rank}. {first} <-> {second}: {similarity:.3f} ({len(shared)} shared lines)")
+    detector.write_report(pairs, args.output)
+
+
+if __name__ == '__main__':
+    main()
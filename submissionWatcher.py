@@ -0,0 +1,216 @@
+import os
+import csv
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+import argparse
+from main import CaseStudyGrader
+
+# inotify event flags (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Reports group folders under submissions_dir that changed, using Linux inotify through libc."""
+
+    def __init__(self, submissions_dir):
+        self.submissions_dir = submissions_dir
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}  # watch descriptor -> group name ('' for the submissions folder itself)
+        self.add_watch(submissions_dir, "")
+        for group in os.listdir(submissions_dir):
+            if os.path.isdir(os.path.join(submissions_dir, group)):
+                self.add_watch(os.path.join(submissions_dir, group), group)
+
+    def add_watch(self, path, group):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            print(f"[WARNING] Could not watch {path} (errno {ctypes.get_errno()})")
+            return
+        self.watches[wd] = group
+
+    def poll(self, timeout):
+        """Waits up to timeout seconds and returns the set of group names that changed."""
+        changed = set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return changed
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+
+            group = self.watches.get(wd)
+            if group is None:
+                continue
+            if group == "":
+                # Something appeared or changed directly under the submissions folder
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_watch(os.path.join(self.submissions_dir, name), name)
+                if mask & IN_ISDIR:
+                    changed.add(name)
+            else:
+                changed.add(group)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback watcher that compares folder and file modification times on every poll."""
+
+    def __init__(self, submissions_dir, interval=0.25):
+        self.submissions_dir = submissions_dir
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        snapshot = {}
+        for group in os.listdir(self.submissions_dir):
+            group_path = os.path.join(self.submissions_dir, group)
+            if not os.path.isdir(group_path):
+                continue
+            try:
+                entries = [(entry.name, entry.stat().st_mtime_ns, entry.stat().st_size) for entry in os.scandir(group_path)]
+            except FileNotFoundError:
+                continue
+            snapshot[group] = (os.stat(group_path).st_mtime_ns, tuple(sorted(entries)))
+        return snapshot
+
+    def poll(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = self.scan()
+        changed = {group for group, state in current.items() if self.snapshot.get(group) != state}
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class SubmissionWatcher:
+    """Regrades a group shortly after its folder stops changing and updates its rows in the output CSV."""
+
+    def __init__(self, submissions_dir, debounce=0.3, grader=None):
+        self.submissions_dir = submissions_dir
+        self.debounce = debounce  # Seconds of quiet before a burst of writes is considered finished
+        self.grader = grader or CaseStudyGrader()
+        self.grader.submissions_dir = submissions_dir
+        self.pending = {}  # group -> time of the latest change
+
+        try:
+            self.watcher = InotifyWatcher(submissions_dir)
+            print("[INFO] Watching submissions with inotify.")
+        except (OSError, AttributeError) as e:
+            print(f"[WARNING] inotify unavailable ({e}); falling back to polling.")
+            self.watcher = PollingWatcher(submissions_dir)
+
+    def graded_groups(self):
+        """Returns the groups that already have rows in the output CSV."""
+        if not os.path.isfile(self.grader.output_csv):
+            return set()
+        with open(self.grader.output_csv, newline='') as csvfile:
+            return {row["Group Name"] for row in csv.DictReader(csvfile)}
+
+    def regrade(self, group):
+        group_path = os.path.join(self.submissions_dir, group)
+        if not os.path.isdir(group_path):
+            print(f"[INFO] {group} was removed; leaving its rows untouched.")
+            return
+        digits = "".join(filter(str.isdigit, group))
+        if not digits:
+            # extract_group_number would exit() on it and stop the watcher
+            print(f"[WARNING] Skipping {group}: no group number in the folder name.")
+            return
+        started = time.time()
+        try:
+            results = self.grader.grade_group(group, group_path, group_number=int(digits))
+            if results is not None:
+                self.grader.update_group_rows(group, results)
+                self.grader.outcome_store.record_group(group, results)
+        except Exception as e:
+            # One bad drop shouldn't stop the watcher; the group is retried on its next change
+            print(f"[ERROR] Failed to grade {group} - {e}")
+            return
+        finally:
+            # The files have changed under us, so never keep their parsed configs around
+            self.grader.config_cache.release_group(group_path)
+        if results is None:
+            print(f"[WARNING] Skipping {group} due to insufficient files.")
+            return
+        total_grade = sum(task_results["grade"] for task_results in results.values())
+        print(f"[GRADE] {group}: {total_grade}/{self.grader.total_points} (updated in {time.time() - started:.2f}s)")
+
+    def run(self):
+        """Grades anything not yet in the output, then regrades groups as their folders change."""
+        if not os.path.isfile(self.grader.output_csv):
+            self.grader.initialize_csv()
+        graded = self.graded_groups()
+        for group in sorted(os.listdir(self.submissions_dir)):
+            if group not in graded and os.path.isdir(os.path.join(self.submissions_dir, group)):
+                self.regrade(group)
+
+        print(f"[INFO] Watching {self.submissions_dir} for new or changed submissions (Ctrl+C to stop)...")
+        try:
+            while True:
+                now = time.time()
+                if self.pending:
+                    timeout = max(0.0, min(self.pending.values()) + self.debounce - now)
+                else:
+                    timeout = 1.0
+                for group in self.watcher.poll(timeout):
+                    self.pending[group] = time.time()
+
+                now = time.time()
+                for group in [group for group, changed_at in self.pending.items() if now - changed_at >= self.debounce]:
+                    del self.pending[group]
+                    print(f"[INFO] Change detected in {group}; regrading...")
+                    self.regrade(group)
+        except KeyboardInterrupt:
+            print("[INFO] Stopped watching.")
+        finally:
+            self.watcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regrade groups as their submissions land.")
+    parser.add_argument("submissions_dir", help="Folder containing one sub-folder per group")
+    parser.add_argument("--debounce", type=float, default=0.3, help="Seconds of quiet before regrading a group")
+    parser.add_argument("--poll", action="store_true", help="Use mtime polling instead of inotify")
+    args = parser.parse_args()
+
+    watcher = SubmissionWatcher(args.submissions_dir, debounce=args.debounce)
+    if args.poll:
+        watcher.watcher.close()
+        watcher.watcher = PollingWatcher(args.submissions_dir)
+    watcher.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import os
+import re
+import csv
+import random
+import argparse
+import io
+import contextlib
+from main import CaseStudyGrader
+from answerKey import AnswerKey
+
+
+# Group numbers handed out in the course. 172.16.(200 + xx).0/24 caps this at 55.
+GROUP_NUMBER_RANGE = range(1, 56)
+
+WRONG_MASKS = ["255.255.255.0", "255.255.255.128", "255.255.255.192", "255.255.255.224",
+               "255.255.255.240", "255.255.255.248", "255.255.255.252", "255.255.0.0"]
+
+MUTATIONS = ["missing_interface", "wrong_mask", "missing_crypto_line"]
+
+
+class SyntheticCorpusGenerator:
+    def __init__(self, answer_key_dir, key_group_number, seed=None):
+        self.answer_key_dir = answer_key_dir
+        self.key_group_number = key_group_number
+        self.rng = random.Random(seed)
+        self.grader = CaseStudyGrader()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            key_files = self.grader.map_files_to_devices(answer_key_dir)
+        if not key_files:
+            raise ValueError(f"Could not map the answer key files in {answer_key_dir} to devices")
+        self.answer_key = AnswerKey(answer_key_dir, key_group_number, key_files)
+        self.key_configs = self.answer_key.key_configs
+
+    def mutate(self, lines):
+        """Applies one random mutation to a config and returns (mutation, detail), or None if none applies."""
+        for mutation in self.rng.sample(MUTATIONS, len(MUTATIONS)):
+            if mutation == "missing_interface":
+                candidates = [i for i, line in enumerate(lines) if line.startswith("interface ")]
+                if candidates:
+                    start = self.rng.choice(candidates)
+                    end = start + 1
+                    while end < len(lines) and lines[end].startswith(" "):
+                        end += 1
+                    detail = lines[start]
+                    del lines[start:end]
+                    return mutation, detail
+
+            elif mutation == "wrong_mask":
+                candidates = [i for i, line in enumerate(lines)
+                              if re.match(r"^\s+ip address \S+ \d+\.\d+\.\d+\.\d+", line)]
+                if candidates:
+                    index = self.rng.choice(candidates)
+                    parts = lines[index].split(" ")
+                    wrong_mask = self.rng.choice([mask for mask in WRONG_MASKS if mask != parts[-1]])
+                    detail = f"{lines[index].strip()} -> {wrong_mask}"
+                    lines[index] = " ".join(parts[:-1] + [wrong_mask])
+                    return mutation, detail
+
+            elif mutation == "missing_crypto_line":
+                candidates = []
+                in_crypto = False
+                for i, line in enumerate(lines):
+                    if not line.startswith(" "):
+                        in_crypto = line.startswith("crypto ")
+                    if in_crypto:
+                        candidates.append(i)
+                if candidates:
+                    index = self.rng.choice(candidates)
+                    end = index + 1
+                    if not lines[index].startswith(" "):
+                        while end < len(lines) and lines[end].startswith(" "):
+                            end += 1
+                    detail = lines[index].strip()
+                    del lines[index:end]
+                    return mutation, detail
+        return None
+
+    def group_name(self, group_number, index):
+        """Builds a unique folder name that extract_group_number still resolves to group_number."""
+        suffix = ""
+        index += 1
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            suffix = chr(ord('a') + remainder) + suffix
+        return f"Group {group_number} {suffix}"
+
+    def generate(self, output_dir, num_groups, max_mutations=3, clean_fraction=0.2, score=True):
+        """Writes num_groups synthetic group folders, a mutation manifest and the expected scores."""
+        os.makedirs(output_dir, exist_ok=True)
+        manifest_path = os.path.join(output_dir, "mutations.csv")
+        scores_path = os.path.join(output_dir, "expected_scores.csv")
+
+        with open(manifest_path, 'w', newline='') as manifest_file, open(scores_path, 'w', newline='') as scores_file:
+            manifest = csv.writer(manifest_file)
+            manifest.writerow(["Group Name", "Device", "Mutation", "Detail"])
+            scores = csv.writer(scores_file)
+            scores.writerow(["Group Name", "Task Name", "Grade", "Comments"])
+
+            for index in range(num_groups):
+                group_number = self.rng.choice(GROUP_NUMBER_RANGE)
+                group = self.group_name(group_number, index)
+                group_path = os.path.join(output_dir, group)
+                os.makedirs(group_path, exist_ok=True)
+
+                configs = self.answer_key.substitute(group_number)
+
+                if self.rng.random() >= clean_fraction:
+                    for _ in range(self.rng.randint(1, max_mutations)):
+                        device = self.rng.choice(sorted(configs))
+                        applied = self.mutate(configs[device])
+                        if applied:
+                            manifest.writerow([group, device, applied[0], applied[1]])
+
+                for device, lines in configs.items():
+                    with open(os.path.join(group_path, f"{device}.txt"), 'w') as file:
+                        file.write("\n".join(lines) + "\n")
+
+                if score:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        results = self.grader.grade_group(group, group_path)
+                    for task_name, task_results in (results or {}).items():
+                        scores.writerow([group, task_name, task_results["grade"], task_results["comments"]])
+                    self.grader.config_cache.release_group(group_path)
+
+                if (index + 1) % 100 == 0:
+                    print(f"[INFO] Generated {index + 1}/{num_groups} groups...")
+
+        print(f"[INFO] Wrote {num_groups} synthetic groups to {output_dir}")
+        print(f"[INFO] Mutation manifest: {manifest_path}")
+        if score:
+            print(f"[INFO] Expected scores: {scores_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic submission corpus from an answer key.")
+    parser.add_argument("answer_key_dir", help="Folder with one answer-key config per device")
+    parser.add_argument("output_dir", help="Folder to write the synthetic group folders into")
+    parser.add_argument("--key-group", type=int, required=True, help="Group number the answer key was written for")
+    parser.add_argument("--groups", type=int, default=100, help="Number of synthetic groups to generate")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible corpora")
+    parser.add_argument("--max-mutations", type=int, default=3, help="Maximum mutations applied to a group")
+    parser.add_argument("--clean-fraction", type=float, default=0.2, help="Fraction of groups left unmutated")
+    parser.add_argument("--no-score", action="store_true", help="Skip grading the corpus for expected scores")
+    args = parser.parse_args()
+
+    generator = SyntheticCorpusGenerator(args.answer_key_dir, args.key_group, seed=args.seed)
+    generator.generate(args.output_dir, args.groups, max_mutations=args.max_mutations,
+                       clean_fraction=args.clean_fraction, score=not args.no_score)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+
+ALL_DEVICES = ("Toronto", "ISP", "Ottawa", "Oshawa", "TOR-A1", "TOR-A2", "TOR-D1", "TOR-D2")
+
+# sys.stdout is process-wide, so only one scheduler at a time may stand in for it (see GroupScheduler.run)
+STDOUT_LOCK = threading.Lock()
+
+
+def uses_devices(*devices):
+    """Decorator for a grading method: declares the devices whose configs it reads (like uses_sections)."""
+    def decorate(method):
+        method.devices = tuple(devices)
+        return method
+    return decorate
+
+
+class JobOutput:
+    """Stands in for sys.stdout; prints from a thread running a job (or a capture) go to that job's buffer.
+
+    Anything printed by other threads goes straight to the stream it replaced, so their output is never lost
+    or mixed into a job's log.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+        self.logs = {}
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer if buffer is not None else self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def run(self, job, function):
+        """Runs function() with this thread's prints collected under job."""
+        self.local.buffer = self.logs[job] = io.StringIO()
+        self.local.job = job
+        try:
+            return function()
+        finally:
+            self.local.buffer = self.local.job = None
+
+    def capture(self, function):
+        """Runs function() and returns (its result, what this thread printed meanwhile); not kept in logs."""
+        previous = getattr(self.local, "buffer", None)
+        self.local.buffer = buffer = io.StringIO()
+        try:
+            return function(), buffer.getvalue()
+        finally:
+            self.local.buffer = previous
+
+    def current_job(self):
+        return getattr(self.local, "job", None)
+
+    def emit(self, job):
+        self.stream.write(self.logs.pop(job).getvalue())
+
+
+class GroupScheduler:
+    """Grades one group as a small dependency graph instead of a fixed sequence.
+
+    Every device config is parsed as its own job, each task starts as soon as the devices it reads are parsed,
+    and results and logs come back in rubric order. Failed parses are left for the tasks to report, as before.
+
+    The log reads the same as a sequential run: what a device's parse prints is held back and written into the
+    log of the first task (in rubric order) that reads the device, where that task loads it.
+    """
+
+    def __init__(self, config_cache, max_workers=8):
+        self.config_cache = config_cache
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="grade")
+
+    def parse(self, output, filepath, parse_logs):
+        """Parses one device's config, keeping what it prints for the task that first reads it."""
+        def load():
+            try:
+                self.config_cache.load(filepath)
+                return True
+            except Exception:
+                return False  # Each task that reads this device loads it again and notes the parse error
+
+        parsed, log = output.capture(load)
+        if parsed:
+            parse_logs[filepath] = log  # A failed parse is printed again by the tasks that retry it
+
+    def when_ready(self, dependencies, start):
+        """Calls start() once every dependency future is done (straight away if there are none)."""
+        remaining = [len(dependencies)]
+        lock = threading.Lock()
+
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                ready = remaining[0] == 0
+            if ready:
+                start()
+
+        if not dependencies:
+            start()
+        for dependency in dependencies:
+            dependency.add_done_callback(done)
+
+    def start_task(self, output, task_name, grade_task, dependencies, result, flush_parse_logs):
+        """Submits the task once its devices are parsed and copies its outcome into result."""
+        def run():
+            print(f"[INFO] Starting grading for {task_name}...")
+            try:
+                return grade_task()
+            finally:
+                flush_parse_logs(task_name)  # Parse logs of devices this task declared but never loaded
+
+        def start():
+            for dependency in dependencies:
+                error = dependency.exception()
+                if error is not None:
+                    result.set_exception(error)  # Only errors that should fail the whole group get this far
+                    return
+            future = self.pool.submit(output.run, task_name, run)
+            future.add_done_callback(lambda f: result.set_exception(f.exception()) if f.exception() is not None
+                                     else result.set_result(f.result()))
+
+        self.when_ready(dependencies, start)
+
+    def run(self, device_files, tasks, on_task=None):
+        """Grades tasks, a list of (task name, grading method, its arguments) in rubric order.
+
+        A method's devices come from @uses_devices; an undeclared method waits for every device.
+
+        on_task(task name, result) is called from this thread as each task finishes. Returns the results in
+        rubric order; if a task raised, its error is raised once every other job has finished.
+
+        sys.stdout is swapped for a JobOutput for the duration. Prints from threads outside this run still reach
+        the stream that was current when it started; runs on different threads take turns (STDOUT_LOCK).
+        """
+        owners = {}  # filepath -> the first task in rubric order that reads it
+        for task_name, method, _ in tasks:
+            for device in getattr(method, "devices", ALL_DEVICES):
+                if device in device_files:
+                    owners.setdefault(device_files[device], task_name)
+        parse_logs = {}  # filepath -> what its parse printed, until its owner task writes it
+        parse_logs_lock = threading.Lock()
+
+        def write_parse_log(filepath, resident):
+            if owners.get(filepath) is None or owners[filepath] != output.current_job():
+                return
+            with parse_logs_lock:
+                log = parse_logs.pop(filepath, None)
+            if log and resident:  # A config that had to be parsed again printed its own log just now
+                output.write(log)
+
+        def flush_parse_logs(task_name):
+            for filepath in [filepath for filepath, owner in owners.items() if owner == task_name]:
+                write_parse_log(filepath, True)
+
+        with STDOUT_LOCK:
+            output = JobOutput(sys.stdout)
+            sys.stdout = output
+            self.config_cache.on_load = write_parse_log
+            try:
+                results, error = self.schedule(output, device_files, tasks, on_task, parse_logs, flush_parse_logs)
+            finally:
+                self.config_cache.on_load = None
+                sys.stdout = output.stream
+
+        if error is not None:
+            raise error
+        return {task_name: results[task_name] for task_name, _, _ in tasks}
+
+    def schedule(self, output, device_files, tasks, on_task, parse_logs, flush_parse_logs):
+        """Submits every job and writes task logs in rubric order as they finish; returns (results, first error)."""
+        parsed = {device: self.pool.submit(self.parse, output, filepath, parse_logs)
+                  for device, filepath in device_files.items()}
+        pending = {}
+        for task_name, method, args in tasks:
+            devices = getattr(method, "devices", ALL_DEVICES)
+            dependencies = [parsed[device] for device in devices if device in parsed]
+            pending[task_name] = Future()
+            self.start_task(output, task_name, lambda method=method, args=args: method(*args), dependencies,
+                            pending[task_name], flush_parse_logs)
+
+        # Each task's log is written as soon as it and every task before it are done
+        log_order = [task_name for task_name, _, _ in tasks]
+        results = {}
+        jobs = dict(pending)
+        error = None
+        while log_order:
+            head = jobs[log_order[0]]
+            if not head.done():
+                wait([head] + list(pending.values()), return_when=FIRST_COMPLETED)
+            for task_name in [name for name, future in pending.items() if future.done()]:
+                future = pending.pop(task_name)
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                results[task_name] = future.result()
+                if on_task is not None:
+                    on_task(task_name, results[task_name])
+            while log_order and jobs[log_order[0]].done():
+                if log_order[0] in output.logs:
+                    output.emit(log_order[0])
+                log_order.pop(0)
+        wait(parsed.values())  # A parse nobody waited on (its device is read by no task) must not outlive the run
+        return results, error
+
+    def close(self):
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,236 @@
+import os
+import io
+import csv
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+import contextlib
+from main import CaseStudyGrader
+from checkOutcomes import OutcomeStore
+
+
+class WorkQueue:
+    """Groups to grade, kept in one SQLite file that workers on several machines share.
+
+    A worker leases a group for lease_seconds and keeps extending the lease while it grades. If the worker
+    dies, the lease runs out and another worker picks the group up again.
+    """
+
+    def __init__(self, db_path, lease_seconds=60.0, max_attempts=3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts  # A group that kills this many workers is marked failed
+        self.connection = self.connect()
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS jobs (
+                group_name TEXT PRIMARY KEY, state TEXT NOT NULL DEFAULT 'pending', owner TEXT,
+                lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0, results TEXT, error TEXT);
+            CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+        """)
+
+    def connect(self):
+        # Autocommit mode so claims can take the write lock up front with BEGIN IMMEDIATE.
+        # Network filesystems don't support WAL, so the default rollback journal is kept.
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+
+    def enqueue(self, submissions_dir):
+        """Adds every group folder under submissions_dir; groups already queued keep their state."""
+        groups = []
+        for group in sorted(os.listdir(submissions_dir)):
+            if not os.path.isdir(os.path.join(submissions_dir, group)):
+                continue
+            if not any(character.isdigit() for character in group):
+                # extract_group_number exits on these, which would take down every worker that claims one
+                print(f"[WARNING] Skipping {group}: no group number in the folder name.")
+                continue
+            groups.append(group)
+        with self.transaction() as connection:
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('submissions_dir', ?)",
+                               (os.path.abspath(submissions_dir),))
+            connection.executemany("INSERT OR IGNORE INTO jobs (group_name) VALUES (?)", [(group,) for group in groups])
+        print(f"[INFO] Queued {len(groups)} groups from {submissions_dir} in {self.db_path}")
+
+    @contextlib.contextmanager
+    def transaction(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connection
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def submissions_dir(self):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'submissions_dir'").fetchone()
+        return row[0] if row else None
+
+    def claim(self, worker_id):
+        """Leases the next pending (or abandoned) group to worker_id; returns its name or None."""
+        now = time.time()
+        with self.transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET state = 'failed', error = 'Lease expired too many times' "
+                "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?", (now, self.max_attempts))
+            row = connection.execute(
+                "SELECT group_name FROM jobs WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+                "ORDER BY attempts, rowid LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE jobs SET state = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE group_name = ?", (worker_id, now + self.lease_seconds, row[0]))
+        return row[0]
+
+    def heartbeat(self, connection, group, worker_id):
+        """Extends worker_id's lease on group; returns False if the lease was lost to another worker."""
+        cursor = connection.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE group_name = ? AND owner = ? AND state = 'leased'",
+            (time.time() + self.lease_seconds, group, worker_id))
+        return cursor.rowcount == 1
+
+    def complete(self, group, worker_id, results=None, error=None):
+        """Stores a group's results (or error); ignored if worker_id no longer holds the lease."""
+        state = "done" if error is None else "failed"
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET state = ?, results = ?, error = ?, lease_expires = NULL "
+                "WHERE group_name = ? AND owner = ? AND state = 'leased'",
+                (state, json.dumps(results) if results is not None else None, error, group, worker_id))
+        return cursor.rowcount == 1
+
+    def next_expiry(self):
+        """Seconds until the earliest live lease runs out, or None if no group is leased."""
+        row = self.connection.execute("SELECT MIN(lease_expires) FROM jobs WHERE state = 'leased'").fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def counts(self):
+        return dict(self.connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+    def merge(self, output_csv, outcome_store=None):
+        """Writes every finished group's rows to output_csv in group order (and their outcomes to the store)."""
+        rows = self.connection.execute(
+            "SELECT group_name, state, results, error FROM jobs ORDER BY group_name").fetchall()
+        written = 0
+        with open(output_csv, 'w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(["Group Name", "Task Name", "Grade", "Comments"])
+            for group, state, results, error in rows:
+                if state != "done":
+                    print(f"[WARNING] {group} is {state}{f' ({error})' if error else ''}; not in the output.")
+                    continue
+                results = json.loads(results)
+                if results is None:
+                    continue  # Skipped for insufficient files, same as a local run
+                for task_name, task_results in results.items():
+                    csv_writer.writerow([group, task_name, task_results["grade"], task_results["comments"]])
+                if outcome_store is not None:
+                    outcome_store.record_group(group, results)
+                written += 1
+        print(f"[INFO] Merged {written} groups into {output_csv}")
+
+
+class QueueWorker:
+    """Claims groups from a WorkQueue and grades them until nothing is left to claim."""
+
+    def __init__(self, work_queue, worker_id=None, submissions_dir=None):
+        self.queue = work_queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        # Nodes can mount the shared submissions folder at different paths
+        self.submissions_dir = submissions_dir or work_queue.submissions_dir()
+        self.grader = CaseStudyGrader()
+
+    def grade(self, group):
+        """Grades one claimed group while a background thread keeps its lease alive."""
+        stop = threading.Event()
+        lease_lost = threading.Event()
+
+        def keep_alive():
+            connection = self.queue.connect()
+            try:
+                while not stop.wait(self.queue.lease_seconds / 3):
+                    if not self.queue.heartbeat(connection, group, self.worker_id):
+                        lease_lost.set()
+                        return
+            finally:
+                connection.close()
+
+        heartbeat = threading.Thread(target=keep_alive, daemon=True)
+        heartbeat.start()
+        group_path = os.path.join(self.submissions_dir, group)
+        started = time.time()
+        results, error = None, None
+        digits = "".join(filter(str.isdigit, group))
+        try:
+            if not digits:
+                raise ValueError(f"Could not extract group number from {group}")
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = self.grader.grade_group(group, group_path, group_number=int(digits))
+        except SystemExit:
+            # A grader calling exit() must fail this group, not the worker (and the next one)
+            error = "called exit() while grading"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            stop.set()
+            heartbeat.join()
+            self.grader.config_cache.release_group(group_path)
+
+        if lease_lost.is_set() or not self.queue.complete(group, self.worker_id, results, error):
+            print(f"[WARNING] Lost the lease on {group}; another worker will finish it.")
+        elif error:
+            print(f"[ERROR] {group} failed - {error}")
+        elif results is None:
+            print(f"[WARNING] Skipping {group} due to insufficient files.")
+        else:
+            total_grade = sum(task_results["grade"] for task_results in results.values())
+            print(f"[GRADE] {group}: {total_grade}/{self.grader.total_points} ({time.time() - started:.2f}s)")
+
+    def run(self):
+        graded = 0
+        print(f"[INFO] Worker {self.worker_id} grading from {self.queue.db_path}")
+        while True:
+            group = self.queue.claim(self.worker_id)
+            if group is None:
+                wait = self.queue.next_expiry()
+                if wait is None:
+                    break  # Nothing pending and nobody else is holding a lease
+                time.sleep(min(wait + 0.1, self.queue.lease_seconds))  # Another worker may still drop its group
+                continue
+            self.grade(group)
+            graded += 1
+        print(f"[INFO] Worker {self.worker_id} finished after grading {graded} groups.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a grading run across machines through a shared SQLite queue.")
+    parser.add_argument("db", help="Queue file on storage every worker can reach")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    init_parser = subparsers.add_parser("init", help="Queue every group folder in a submissions directory")
+    init_parser.add_argument("submissions_dir")
+    work_parser = subparsers.add_parser("work", help="Claim and grade groups until the queue is empty")
+    work_parser.add_argument("--worker-id", help="Name shown in the queue (default host:pid)")
+    work_parser.add_argument("--lease", type=float, default=60.0, help="Seconds a claim lasts without a heartbeat")
+    work_parser.add_argument("--submissions-dir", help="Where this node mounts the submissions folder")
+    subparsers.add_parser("status", help="Show how many groups are in each state")
+    merge_parser = subparsers.add_parser("merge", help="Write the finished groups to the results CSV")
+    merge_parser.add_argument("--output", default="grading_results.csv", help="CSV to write")
+    merge_parser.add_argument("--outcomes", default="check_outcomes.db", help="Outcome store for rescoring")
+    args = parser.parse_args()
+
+    if args.command == "init":
+        WorkQueue(args.db).enqueue(args.submissions_dir)
+    elif args.command == "work":
+        QueueWorker(WorkQueue(args.db, lease_seconds=args.lease), args.worker_id, args.submissions_dir).run()
+    elif args.command == "status":
+        for state, count in sorted(WorkQueue(args.db).counts().items()):
+            print(f"[INFO] {state}: {count}")
+    else:
+        WorkQueue(args.db).merge(args.output, OutcomeStore(args.outcomes))
+
+
+if __name__ == '__main__':
+    main()